@@ -0,0 +1,41 @@
+import random
+import re
+import time
+from src.python.matcher import CompiledDFA
+from src.python.fixtures import abb_nfa, ab_plus_dfa
+
+# Throughput of CompiledDFA compared to Python's re on the same patterns
+
+
+def throughput(func, data, repeat=3) -> float:
+    """ Best of repeat runs in MB/s """
+    best = float('inf')
+    for _ in range(repeat):
+        t = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - t)
+    return len(data) / best / 1e6
+
+
+if __name__ == "__main__":
+    rng = random.Random(0)
+    size = 1 << 20
+    patterns = [
+        ("(a|b)*abb", abb_nfa().to_DFA(verbose=False), b'ab'),
+        ("ab+", ab_plus_dfa(), b'abc'),
+    ]
+
+    print(f"{'pattern':<12}{'operation':<12}{'dfa MB/s':>12}{'re MB/s':>14}")
+    for pattern, dfa, symbols in patterns:
+        matcher = CompiledDFA(dfa.minimize(verbose=False))
+        regex = re.compile(pattern.encode())
+        data = bytes(rng.choice(symbols) for _ in range(size))
+        runs = [
+            ("fullmatch", matcher.fullmatch, regex.fullmatch),
+            ("finditer", lambda d: sum(1 for _ in matcher.finditer(d)),
+             lambda d: sum(1 for _ in regex.finditer(d))),
+        ]
+        for operation, dfa_func, re_func in runs:
+            print(f"{pattern:<12}{operation:<12}"
+                  f"{throughput(dfa_func, data):>12.2f}"
+                  f"{throughput(re_func, data):>14.2f}")
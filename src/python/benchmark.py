@@ -0,0 +1,269 @@
+import argparse
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, List
+from src.python.charset import CharSet
+from src.python.states import StateCollection, State
+from src.python.finite_automaton import FiniteAutomaton, NFA, DFA
+from src.python.matcher import CompiledDFA
+from src.python.bitset_nfa import NFASimulator
+from src.python.regex import compile
+from src.python.fixtures import nth_from_last_nfa, random_dfa
+
+# Benchmark harness for construction, minimization and matching
+#
+# Run:      python -m src.python.benchmark -o new.json
+# Compare:  python -m src.python.benchmark --compare old.json new.json
+#
+# Results are JSON: wall time (best of --repeat runs), peak memory
+# (tracemalloc, separate run) and the size of the produced automaton.
+
+FORMAT_VERSION = 1
+
+
+# -- automaton families ---------------------------------------------------- #
+def random_nfa(n: int, seed: int) -> NFA:
+    """ Random NFA with ten edges per state: eight characters, an epsilon
+    and a digit range (object graph construction) """
+    rng = random.Random(seed)
+    states = [State(f"q{i}", acc=i % 10 == 0) for i in range(n)]
+    for state in states:
+        for c in 'abcdefgh':
+            state.add_transition(states[rng.randrange(n)], c)
+        state.add_transition(states[rng.randrange(n)])
+        state.add_transition(states[rng.randrange(n)],
+                             CharSet([(ord('0'), ord('9'))]))
+    return NFA(list('abcdefgh'), states[0], StateCollection(states))
+
+
+def changed_words_dfa(n: int, seed: int) -> DFA:
+    """ Minimal DFA of n random words, then a transition to a new state """
+    rng = random.Random(seed)
+    words = {''.join(rng.choice('abcdefgh') for _ in range(rng.randint(3, 12)))
+             for _ in range(n)}
+    dfa = compile('|'.join(sorted(words))).to_DFA(verbose=False).minimize(
+        verbose=False)
+    state = dfa.start
+    while all(state.get_label_transitions(c) for c in 'abcdefgh'):
+        state = state.get_label_transitions('a')[0]
+    new_state = State("new", acc=True)
+    dfa.sc.add(new_state)
+    state.add_transition(new_state, next(
+        c for c in 'abcdefgh' if not state.get_label_transitions(c)))
+    return dfa
+
+
+def byte_alphabet() -> List[str]:
+    return [chr(i) for i in range(256)]
+
+
+def size_of(fa: FiniteAutomaton) -> dict:
+    edges = sum(len(transitions) for state in fa.sc
+                for _, transitions in state.transitions.tbl.items())
+    return dict(states=len(fa.sc.states_by_name), edges=edges)
+
+
+# -- measuring ------------------------------------------------------------- #
+def measure(name: str, setup: Callable, run: Callable, repeat: int,
+            memory: bool, input_bytes: int = 0) -> dict:
+    """ Time run(setup()) and return a result record
+
+    Construction benchmarks record the size of the automaton run returns,
+    matching benchmarks the throughput over input_bytes.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        arg = setup()
+        t = time.perf_counter()
+        res = run(arg)
+        best = min(best, time.perf_counter() - t)
+    record = dict(name=name, seconds=best)
+    if isinstance(res, FiniteAutomaton):
+        record.update(size_of(res))
+    if input_bytes:
+        record.update(input_bytes=input_bytes,
+                      mb_per_s=input_bytes / best / 1e6 if best else None)
+
+    if memory:
+        arg = setup()
+        tracemalloc.start()
+        run(arg)
+        record['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return record
+
+
+def suite(scale: int):
+    """ (name, setup, run, input_bytes) per benchmark; scale 0 to 2 """
+    nth = [4, 8, 10, 12, 14][:3 + scale]
+    sizes = [10 ** e for e in range(2, 4 + scale + (scale == 2))]
+
+    # object graph (State, Transition) construction
+    yield (f"build/random_nfa/states={sizes[-1] * 10}",
+           lambda: None,
+           lambda _: random_nfa(sizes[-1] * 10, seed=7))
+
+    for n in nth:
+        yield (f"to_DFA/nth_from_last/n={n}",
+               lambda n=n: nth_from_last_nfa(n),
+               lambda nfa: nfa.to_DFA(verbose=False))
+    yield (f"to_DFA/parallel/nth_from_last/n={nth[-1]}",
+           lambda: nth_from_last_nfa(nth[-1]),
+           lambda nfa: nfa.to_DFA(verbose=False, workers=4))
+
+    for n in sizes:
+        yield (f"minimize/random/states={n}",
+               lambda n=n: random_dfa(random.Random(n), n, ['a', 'b']),
+               lambda dfa: dfa.minimize(verbose=False))
+    yield ("minimize/random_partial/states=1000",
+           lambda: random_dfa(random.Random(1), 1000, ['a', 'b', 'c'], 0.5),
+           lambda dfa: dfa.minimize(verbose=False))
+    yield ("minimize/large_alphabet/states=200",
+           lambda: random_dfa(random.Random(2), 200, byte_alphabet()),
+           lambda dfa: dfa.minimize(verbose=False))
+    yield ("minimize/nth_from_last/n=10",
+           lambda: nth_from_last_nfa(10).to_DFA(verbose=False),
+           lambda dfa: dfa.minimize(verbose=False))
+    # Brzozowski on the source NFA
+    yield ("minimize/auto/blowup/n=12",
+           lambda: compile("(a|b)*a(a|b){12}(a|b)*",
+                           ['a', 'b']).to_DFA(verbose=False),
+           lambda dfa: dfa.minimize(verbose=False, algorithm='auto'))
+    # incremental
+    yield ("minimize/auto/changed_words/n=1000",
+           lambda: changed_words_dfa(1000, seed=5),
+           lambda dfa: dfa.minimize(verbose=False, algorithm='auto'))
+    # Hopcroft-Karp equivalence against the minimized DFA
+    yield ("equivalent/changed_words/n=1000",
+           lambda: (lambda dfa: (dfa, dfa.minimize(verbose=False)))(
+               changed_words_dfa(1000, seed=5)),
+           lambda pair: pair[0].equivalent(pair[1]))
+    yield ("product/difference/random/states=100",
+           lambda: (random_dfa(random.Random(6), 100, ['a', 'b']),
+                    random_dfa(random.Random(7), 100, ['a', 'b'], 0.9)),
+           lambda pair: pair[0].difference(pair[1]))
+
+    text = bytes(random.Random(3).choice(b'ab') for _ in range(1 << 18))
+    yield ("match/finditer/nth_from_last/n=8",
+           lambda: CompiledDFA(nth_from_last_nfa(8).to_DFA(verbose=False)),
+           lambda m: sum(1 for _ in m.finditer(text)), len(text))
+    # every x starts a scan to the end of the text, but no match starts
+    rng = random.Random(4)
+    sparse = bytes(rng.choice(b'abcdx') for _ in range(1 << 14))
+    yield ("match/finditer/unterminated/n=16384",
+           lambda: CompiledDFA(compile("x[a-z]*y").to_DFA(verbose=False)),
+           lambda m: sum(1 for _ in m.finditer(sparse)), len(sparse))
+    # log scanning: a rare literal, found with bytes.find (prefilter)
+    rng = random.Random(5)
+    log = b''.join(b'ERROR: %d\n' % rng.randrange(1000)
+                   if rng.random() < 0.005 else
+                   b'info: request ok id=%d\n' % rng.randrange(10 ** 6)
+                   for _ in range(1 << 13))
+    yield (f"match/finditer/log_errors/bytes={len(log)}",
+           lambda: CompiledDFA(compile("ERROR: [0-9]+").to_DFA(verbose=False)),
+           lambda m: sum(1 for _ in m.finditer(log)), len(log))
+    # runs of self-loops, skipped with find when accelerated
+    line = bytes(rng.choice(b'abcde ') for _ in range(1 << 18)) + b'foo'
+    for accelerate in [False, True]:
+        yield (f"match/fullmatch/self_loops/accelerate={accelerate}",
+               lambda accelerate=accelerate: CompiledDFA(
+                   compile(".*foo").to_DFA(verbose=False), accelerate),
+               lambda m: m.fullmatch(line), len(line))
+    # an accelerated state (after x) that the text never reaches
+    hex_text = ''.join(rng.choice('0123456789abcdef') for _ in range(1 << 18))
+    for data in [hex_text, hex_text.encode()]:
+        for accelerate in [False, True]:
+            yield (f"match/match/not_accelerated/{type(data).__name__}/"
+                   f"accelerate={accelerate}",
+                   lambda accelerate=accelerate: CompiledDFA(
+                       compile("[0-9a-f]+|x.*y").to_DFA(verbose=False),
+                       accelerate),
+                   lambda m, data=data: m.match(data), len(data))
+    yield ("match/stream/nth_from_last/n=8",
+           lambda: CompiledDFA(nth_from_last_nfa(8).to_DFA(verbose=False)),
+           lambda m: sum(1 for _ in m.stream(text)), len(text))
+    yield ("match/nfa_simulation/nth_from_last/n=20",
+           lambda: NFASimulator(nth_from_last_nfa(20)),
+           lambda m: m.fullmatch(text), len(text))
+    yield ("match/fullmatch/random/states=1000",
+           lambda: CompiledDFA(random_dfa(random.Random(4), 1000, ['a', 'b'])),
+           lambda m: m.fullmatch(text), len(text))
+
+
+def run_suite(scale: int, repeat: int, memory: bool,
+              only: str = '') -> dict:
+    results = []
+    for name, setup, run, *input_bytes in suite(scale):
+        if only and only not in name:
+            continue
+        record = measure(name, setup, run, repeat, memory, *input_bytes)
+        print(f"{name:<45}{record['seconds']:>10.4f} s", file=sys.stderr)
+        results.append(record)
+    return dict(version=FORMAT_VERSION, python=platform.python_version(),
+                platform=platform.platform(), scale=scale, results=results)
+
+
+# -- comparison ------------------------------------------------------------ #
+def compare(old: dict, new: dict, threshold: float) -> List[dict]:
+    """ Results that got slower or bigger than threshold (ratio new/old) """
+    old_results = {r['name']: r for r in old['results']}
+    regressions = []
+    for r in new['results']:
+        base = old_results.get(r['name'])
+        if base is None:
+            continue
+        for key in ['seconds', 'peak_bytes']:
+            if not base.get(key) or r.get(key) is None:
+                continue
+            ratio = r[key] / base[key]
+            print(f"{r['name']:<45}{key:<12}{ratio:>8.2f}x",
+                  file=sys.stderr)
+            if ratio > threshold:
+                regressions.append(dict(name=r['name'], metric=key,
+                                        old=base[key], new=r[key],
+                                        ratio=ratio))
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks for construction, minimization and matching")
+    parser.add_argument('-o', '--output', help="write JSON results to file")
+    parser.add_argument('--scale', type=int, default=1, choices=[0, 1, 2])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true',
+                        help="skip the tracemalloc peak memory run")
+    parser.add_argument('--only', default='',
+                        help="only benchmarks whose name contains this")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help="compare two result files")
+    parser.add_argument('--threshold', type=float, default=1.25,
+                        help="regression ratio for --compare")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            old = json.load(f)
+        with open(args.compare[1]) as f:
+            new = json.load(f)
+        regressions = compare(old, new, args.threshold)
+        print(json.dumps(regressions, indent=2))
+        return 1 if regressions else 0
+
+    results = run_suite(args.scale, args.repeat, not args.no_memory,
+                        args.only)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+from bisect import bisect_right
+from typing import Dict, FrozenSet, Iterator, List, Optional, Tuple, Union
+from src.python.charset import CharSet, label_intervals, split_intervals
+from src.python.finite_automaton import NFA
+
+Text = Union[str, bytes, bytearray, memoryview]
+
+
+def bits(mask: int):
+    """ Indices of the set bits of mask """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class BitsetNFA:
+    """ NFA with int bitset state sets and integer input symbols
+
+    The symbols are the classes of the alphabet and of any other
+    single-character label (FiniteAutomaton.symbols, as in to_DFA) or, with
+    CharSet labels, the disjoint intervals of all labels (see
+    split_intervals).
+    steps[i][symbol] is the bitset of the successors of state i.
+    """
+
+    def __init__(self, nfa: NFA) -> None:
+        states = list(nfa.sc)
+        index = {state: i for i, state in enumerate(states)}
+        self.num_states = len(states)
+        closures = nfa.epsilon_closures()
+        self.closure = []
+        for state in states:
+            mask = 0
+            for s in closures.closure(state):
+                mask |= 1 << index[s]
+            self.closure.append(mask)
+        self.accepting = 0
+        self.tagged = []  # (state bit, accept ids) for multi-pattern NFAs
+        for state in nfa.sc.accepting:
+            self.accepting |= 1 << index[state]
+            if state.accept_ids:
+                self.tagged.append((1 << index[state], state.accept_ids))
+        self.start = self.closure[index[nfa.start]]
+        self.alphabet = nfa.symbols()
+
+        self.ranges = nfa.sc.any_ranges()
+        if self.ranges:
+            self.pieces = split_intervals(
+                (lo, hi, None) for state in states
+                for label in state.transitions.tbl
+                for lo, hi in label_intervals(label))
+            self.starts = [lo for lo, _, _ in self.pieces]
+            self.num_symbols = len(self.pieces)
+        else:
+            self.class_of = {c: cid for cid, cls in
+                             enumerate(nfa.alphabet_classes(self.alphabet))
+                             for c in cls}
+            self.num_symbols = len(set(self.class_of.values()))
+
+        self.steps = []
+        for state in states:
+            step = {}
+            for label, transitions in state.transitions.tbl.items():
+                targets = 0
+                for t in transitions:
+                    if not t.epsilon:
+                        targets |= 1 << index[t.to_state]
+                if not targets:
+                    continue
+                for symbol in self.symbols_of(label):
+                    step[symbol] = step.get(symbol, 0) | targets
+            self.steps.append(step)
+
+    def accept_ids(self, subset: int) -> FrozenSet[int]:
+        """ Pattern ids accepted by the states of subset """
+        res = set()
+        for bit, ids in self.tagged:
+            if subset & bit:
+                res.update(ids)
+        return frozenset(res)
+
+    def symbols_of(self, label) -> Iterator[int]:
+        """ Symbols covered by a transition label """
+        if not self.ranges:
+            if label in self.class_of:
+                yield self.class_of[label]
+            return
+        starts = self.starts
+        for lo, hi in label_intervals(label):
+            p = bisect_right(starts, lo) - 1
+            while p < len(starts) and starts[p] <= hi:
+                yield p
+                p += 1
+
+    def symbol(self, ch: str) -> Optional[int]:
+        """ Symbol of an input character, None if no transition has it """
+        if not self.ranges:
+            return self.class_of.get(ch)
+        code = ord(ch)
+        p = bisect_right(self.starts, code) - 1
+        if p >= 0 and code <= self.pieces[p][1]:
+            return p
+        return None
+
+    def labels(self, moves: Dict[int, int]):
+        """ (label, next subset) in the order of the sequential to_DFA """
+        if not self.ranges:
+            for c in self.alphabet:
+                next_set = moves.get(self.class_of[c])
+                if next_set:
+                    yield c, next_set
+            return
+        by_set = {}  # next subset -> intervals
+        for symbol, (lo, hi, _) in enumerate(self.pieces):
+            next_set = moves.get(symbol)
+            if next_set:
+                by_set.setdefault(next_set, []).append((lo, hi))
+        for next_set, intervals in by_set.items():
+            yield CharSet(intervals).label(), next_set
+
+
+class NFASimulator:
+    """ Matching by NFA simulation, without determinization
+
+    The active states are an int bitset. Per symbol, succ[symbol][i] is the
+    epsilon-closed successor set of state i, so a step is the union of
+    succ over the active states. The union is taken a byte of the state
+    set at a time: for every (symbol, byte position) a 256-entry table of
+    unions is built on first use, which makes a step O(m/8) table lookups
+    for m NFA states. Matches are leftmost-longest.
+    """
+
+    def __init__(self, nfa: NFA) -> None:
+        fa = BitsetNFA(nfa)
+        self.fa = fa
+        self.num_bytes = (fa.num_states + 7) // 8 or 1
+
+        # succ[symbol][i]: ec(move({i}, symbol))
+        self.succ = [[0] * fa.num_states for _ in range(fa.num_symbols)]
+        for i, step in enumerate(fa.steps):
+            for symbol, targets in step.items():
+                next_set = 0
+                for t in bits(targets):
+                    next_set |= fa.closure[t]
+                self.succ[symbol][i] = next_set
+        # tables[symbol][k]: unions for byte k of the state set, or None
+        self.tables = [[None] * self.num_bytes
+                       for _ in range(fa.num_symbols)]
+        self.symbol_of = {}  # input character -> symbol (memoized)
+
+    def _table(self, symbol: int, k: int) -> List[int]:
+        base = self.succ[symbol][8 * k:8 * k + 8]
+        table = [0] * 256
+        for b in range(1, 1 << len(base)):
+            low = b & -b
+            table[b] = table[b ^ low] | base[low.bit_length() - 1]
+        self.tables[symbol][k] = table
+        return table
+
+    def step(self, states: int, symbol: int) -> int:
+        """ ec(move(states, symbol)) """
+        res = 0
+        tables = self.tables[symbol]
+        for k, b in enumerate(states.to_bytes(self.num_bytes, 'little')):
+            if b:
+                table = tables[k] or self._table(symbol, k)
+                res |= table[b]
+        return res
+
+    def _symbol(self, ch: str) -> Optional[int]:
+        try:
+            return self.symbol_of[ch]
+        except KeyError:
+            symbol = self.symbol_of[ch] = self.fa.symbol(ch)
+            return symbol
+
+    # -- scanning ---------------------------------------------------------- #
+    @staticmethod
+    def _symbols(text: Text) -> Union[str, List[str]]:
+        if isinstance(text, str):
+            return text
+        return [chr(b) for b in bytes(text)]
+
+    def _longest(self, symbols, pos: int) -> int:
+        """ End of the longest match starting at pos, or -1 """
+        states = self.fa.start
+        accepting = self.fa.accepting
+        last = pos if states & accepting else -1
+        for i in range(pos, len(symbols)):
+            symbol = self._symbol(symbols[i])
+            if symbol is None:
+                break
+            states = self.step(states, symbol)
+            if not states:
+                break
+            if states & accepting:
+                last = i + 1
+        return last
+
+    def _leftmost(self, symbols, pos: int) -> Optional[Tuple[int, int]]:
+        """ Leftmost-longest match at or after pos in one forward pass
+
+        The start set joins the active states at every position. Threads
+        are (start, states) in start order, each state only in the thread
+        of the leftmost start that reached it (later starts can only match
+        where that one does), so a step is at most one step per state.
+        """
+        start, accepting = self.fa.start, self.fa.accepting
+        threads = []  # (start, states): disjoint, leftmost first
+        active = 0  # union of the states of the threads
+        best = None
+        for p in range(pos, len(symbols)):
+            if best is None and start & ~active:
+                threads.append((p, start & ~active))
+                if start & accepting:
+                    best = (p, p)
+            symbol = self._symbol(symbols[p])
+            moved, active = [], 0
+            if symbol is not None:
+                for st, states in threads:
+                    states = self.step(states, symbol) & ~active
+                    if states:
+                        active |= states
+                        moved.append((st, states))
+            for st, states in moved:
+                # the first accepting thread is the leftmost one
+                if states & accepting and (best is None or st <= best[0]):
+                    best = (st, p + 1)
+                    break
+            if best is not None:
+                moved = [(st, states) for st, states in moved
+                         if st <= best[0]]
+                if not moved:
+                    return best
+                active = 0
+                for _, states in moved:
+                    active |= states
+            threads = moved
+        # empty match at the end
+        if best is None and start & accepting:
+            return (len(symbols), len(symbols))
+        return best
+
+    # -- public API -------------------------------------------------------- #
+    def fullmatch(self, text: Text) -> bool:
+        """ Does the NFA accept the whole input? """
+        symbols = self._symbols(text)
+        return self._longest(symbols, 0) == len(symbols)
+
+    def match(self, text: Text, pos: int = 0) -> Optional[Tuple[int, int]]:
+        """ Longest match starting at pos as (start, end) span """
+        end = self._longest(self._symbols(text), pos)
+        return (pos, end) if end >= 0 else None
+
+    def search(self, text: Text, pos: int = 0) -> Optional[Tuple[int, int]]:
+        """ Leftmost-longest match at or after pos as (start, end) span """
+        return self._leftmost(self._symbols(text), pos)
+
+    def finditer(self, text: Text, pos: int = 0) -> Iterator[Tuple[int, int]]:
+        """ All non-overlapping leftmost-longest matches as spans """
+        symbols = self._symbols(text)
+        start = pos
+        while start <= len(symbols):
+            span = self._leftmost(symbols, start)
+            if span is None:
+                return
+            yield span
+            start, end = span
+            start = end if end > start else end + 1
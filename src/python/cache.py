@@ -0,0 +1,258 @@
+import hashlib
+import json
+import os
+from array import array
+from collections import OrderedDict, deque
+from typing import List, Optional
+from src.python.charset import CharSet
+from src.python.finite_automaton import FiniteAutomaton, NFA, DFA
+from src.python.compact import CompactDFA
+from src.python.regex import compile
+
+# Content-addressed compile cache: automaton -> minimized DFA
+#
+# The key is a hash of a canonical form of the input automaton: states are
+# numbered in BFS order from the start state (edges sorted by label, targets
+# of one label by a structural class), so names and unreachable states do
+# not matter. Results are kept in an in-process LRU tier and, if a directory
+# is given, as JSON files in an on-disk tier that is evicted (least recently used first) by total size.
+
+CACHE_VERSION = 2
+
+
+def _label_key(label) -> list:
+    if isinstance(label, CharSet):
+        return ['r', [list(i) for i in label.intervals]]
+    return ['s', label]
+
+
+def _structural_classes(fa: FiniteAutomaton) -> dict:
+    """ Name-independent class of every reachable state: the coarsest
+    partition by accept flag and ids in which the states of a class have
+    the same number of edges per label into every class (refined with
+    splitters, all but the largest piece of a split are queued again) """
+    preds, seen = {}, {fa.start}
+    queue = deque([fa.start])
+    while queue:
+        state = queue.popleft()
+        for label, transitions in state.transitions.tbl.items():
+            label = json.dumps(_label_key(label))
+            for t in transitions:
+                preds.setdefault(t.to_state, []).append((state, label))
+                if t.to_state not in seen:
+                    seen.add(t.to_state)
+                    queue.append(t.to_state)
+    groups = {}
+    for state in seen:
+        groups.setdefault((state.acc, tuple(sorted(state.accept_ids))),
+                          set()).add(state)
+    members = [groups[key] for key in sorted(groups)]
+    cls = {s: i for i, group in enumerate(members) for s in group}
+    work = deque(range(len(members)))
+    queued = set(work)
+    while work:
+        splitter = work.popleft()
+        queued.discard(splitter)
+        counts = {}
+        for state in members[splitter]:
+            for pred, label in preds.get(state, ()):
+                edges = counts.setdefault(pred, {})
+                edges[label] = edges.get(label, 0) + 1
+        touched = {}
+        for pred, edges in counts.items():
+            touched.setdefault(cls[pred], {}).setdefault(
+                tuple(sorted(edges.items())), set()).add(pred)
+        for c in sorted(touched):
+            pieces = touched[c]
+            rest = members[c].difference(*pieces.values())
+            if rest:
+                pieces[()] = rest
+            if len(pieces) == 1:
+                continue
+            pieces = [pieces[key] for key in sorted(pieces)]
+            members[c] = pieces[0]
+            ids = [c]
+            for piece in pieces[1:]:
+                ids.append(len(members))
+                members.append(piece)
+                for state in piece:
+                    cls[state] = ids[-1]
+            if c not in queued:
+                largest = max(range(len(pieces)),
+                              key=lambda i: (len(pieces[i]), -i))
+                ids.pop(largest)
+            for i in ids:
+                if i not in queued:
+                    queued.add(i)
+                    work.append(i)
+    return cls
+
+
+def canonical_key(fa: FiniteAutomaton, options: dict = None) -> str:
+    """ sha256 of the alphabet, a canonical numbering of the reachable
+    states, their transitions, accept flags and accept ids, and options """
+    number = {fa.start: 0}
+    queue = deque([fa.start])
+    states = []
+    cls = None
+    while queue:
+        state = queue.popleft()
+        edges = []
+        for label, transitions in sorted(
+                state.transitions.tbl.items(),
+                key=lambda item: _label_key(item[0])):
+            targets = [t.to_state for t in transitions]
+            fresh = [s for s in targets if s not in number]
+            if len(fresh) > 1:
+                # unnumbered targets by structure; only states refinement
+                # cannot tell apart are left in name order
+                if cls is None:
+                    cls = _structural_classes(fa)
+                fresh.sort(key=lambda s: (cls[s], s.name))
+            for target in fresh:
+                if target not in number:
+                    number[target] = len(number)
+                    queue.append(target)
+            edges.append([_label_key(label),
+                          sorted(number[t] for t in targets)])
+        states.append([state.acc, sorted(state.accept_ids), edges])
+    data = json.dumps([CACHE_VERSION, type(fa).__name__,
+                       list(fa.alphabet), states, options or {}],
+                      sort_keys=True)
+    return hashlib.sha256(data.encode()).hexdigest()
+
+
+# -- JSON form of a CompactDFA --------------------------------------------- #
+def _dump_label(label):
+    if isinstance(label, CharSet):
+        return {'ranges': [list(i) for i in label.intervals]}
+    return label
+
+
+def _load_label(label):
+    if isinstance(label, dict):
+        return CharSet(tuple(i) for i in label['ranges'])
+    return label
+
+
+def dump_compact(compact: CompactDFA) -> dict:
+    return dict(alphabet=compact.alphabet,
+                labels=[_dump_label(label) for label in compact.labels],
+                names=compact.names, origins=compact.origins,
+                accepting=list(compact.accepting), start=compact.start,
+                table=list(compact.table),
+                accept_ids=[sorted(ids) for ids in compact.accept_ids]
+                if compact.accept_ids else None)
+
+
+def load_compact(data: dict) -> CompactDFA:
+    return CompactDFA(data['alphabet'],
+                      [_load_label(label) for label in data['labels']],
+                      data['names'], data['origins'],
+                      bytearray(data['accepting']), data['start'],
+                      array('i', data['table']),
+                      [frozenset(ids) for ids in data['accept_ids']]
+                      if data['accept_ids'] else None)
+
+
+class CompileCache:
+    """ Cache of minimized DFAs keyed by canonical_key of the input
+
+    Args:
+        directory (str, optional): Directory of the on-disk tier, None to
+            only cache in memory
+        max_entries (int): Size of the in-process LRU tier
+        max_bytes (int): Total size of the on-disk tier
+    """
+
+    def __init__(self, directory: Optional[str] = None,
+                 max_entries: int = 128,
+                 max_bytes: int = 64 * 1024 * 1024) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.memory = OrderedDict()  # key -> CompactDFA
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0}
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    # -- tiers ------------------------------------------------------------- #
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + '.json')
+
+    def _remember(self, key: str, compact: CompactDFA) -> None:
+        self.memory[key] = compact
+        self.memory.move_to_end(key)
+        if len(self.memory) > self.max_entries:
+            self.memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[CompactDFA]:
+        compact = self.memory.get(key)
+        if compact is not None:
+            self.memory.move_to_end(key)
+            self.stats['memory_hits'] += 1
+            return compact
+        if self.directory is not None:
+            try:
+                with open(self._path(key)) as f:
+                    compact = load_compact(json.load(f))
+            except (OSError, ValueError, KeyError):
+                compact = None  # missing or unreadable entry
+            if compact is not None:
+                os.utime(self._path(key))  # recently used
+                self._remember(key, compact)
+                self.stats['disk_hits'] += 1
+                return compact
+        self.stats['misses'] += 1
+        return None
+
+    def put(self, key: str, compact: CompactDFA) -> None:
+        self._remember(key, compact)
+        if self.directory is None:
+            return
+        tmp = self._path(key) + f".{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(dump_compact(compact), f)
+        os.replace(tmp, self._path(key))  # atomic for concurrent writers
+        self._evict()
+
+    def _evict(self) -> None:
+        """ Remove least recently used files above max_bytes """
+        entries = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                st = os.stat(os.path.join(self.directory, name))
+                entries.append((st.st_mtime, st.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.directory, name))
+            total -= size
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.directory is not None:
+            for name in os.listdir(self.directory):
+                if name.endswith('.json'):
+                    os.remove(os.path.join(self.directory, name))
+
+    # -- compiling --------------------------------------------------------- #
+    def compile(self, fa: FiniteAutomaton, dead_state_removal=True) -> DFA:
+        """ Minimized DFA of an NFA or DFA, from the cache if possible
+
+        Returns a new DFA object on every call, so callers may modify it.
+        """
+        key = canonical_key(fa, dict(dead_state_removal=dead_state_removal))
+        compact = self.get(key)
+        if compact is None:
+            dfa = fa.to_DFA(verbose=False) if isinstance(fa, NFA) else fa
+            dfa = dfa.minimize(dead_state_removal, verbose=False)
+            compact = CompactDFA.from_dfa(dfa)
+            self.put(key, compact)
+        return compact.to_dfa()
+
+    def compile_regex(self, pattern: str,
+                      alphabet: Optional[List[str]] = None) -> DFA:
+        """ Minimized DFA of a regular expression """
+        return self.compile(compile(pattern, alphabet))
@@ -0,0 +1,167 @@
+from bisect import bisect_right
+from typing import Hashable, Iterable, Iterator, List, Tuple, Union
+
+MAX_CODEPOINT = 0x10FFFF
+
+Interval = Tuple[int, int]  # inclusive codepoint range (lo, hi)
+
+
+class CharSet:
+    """ Set of characters as sorted, disjoint codepoint intervals
+
+    Immutable and hashable, so it can be used as a transition label. A
+    transition labelled [a-z] is one edge instead of 26.
+    """
+
+    def __init__(self, intervals: Iterable[Interval] = ()) -> None:
+        merged = []
+        for lo, hi in sorted(intervals):
+            if lo > hi:
+                continue
+            if merged and lo <= merged[-1][1] + 1:
+                if hi > merged[-1][1]:
+                    merged[-1] = (merged[-1][0], hi)
+            else:
+                merged.append((lo, hi))
+        self.intervals = tuple(merged)
+        self._starts = [lo for lo, _ in merged]
+
+    @classmethod
+    def from_chars(cls, chars: Iterable[str]) -> 'CharSet':
+        return cls((ord(c), ord(c)) for c in chars)
+
+    @classmethod
+    def of(cls, label: Union[str, 'CharSet']) -> 'CharSet':
+        """ CharSet of a transition label (empty for other labels) """
+        if isinstance(label, CharSet):
+            return label
+        if isinstance(label, str) and len(label) == 1:
+            return cls([(ord(label), ord(label))])
+        return cls()
+
+    # Methods
+    def label(self) -> Union[str, 'CharSet']:
+        """ Plain string label for a single character, else the set """
+        if len(self.intervals) == 1 and \
+                self.intervals[0][0] == self.intervals[0][1]:
+            return chr(self.intervals[0][0])
+        return self
+
+    def union(self, other: 'CharSet') -> 'CharSet':
+        return CharSet(self.intervals + other.intervals)
+
+    def intersection(self, other: 'CharSet') -> 'CharSet':
+        res = []
+        i = j = 0
+        a, b = self.intervals, other.intervals
+        while i < len(a) and j < len(b):
+            lo = max(a[i][0], b[j][0])
+            hi = min(a[i][1], b[j][1])
+            if lo <= hi:
+                res.append((lo, hi))
+            if a[i][1] < b[j][1]:
+                i += 1
+            else:
+                j += 1
+        return CharSet(res)
+
+    def complement(self) -> 'CharSet':
+        """ All other characters (up to MAX_CODEPOINT) """
+        res = []
+        lo = 0
+        for start, end in self.intervals:
+            if start > lo:
+                res.append((lo, start - 1))
+            lo = end + 1
+        if lo <= MAX_CODEPOINT:
+            res.append((lo, MAX_CODEPOINT))
+        return CharSet(res)
+
+    def __contains__(self, ch) -> bool:
+        if not isinstance(ch, str) or len(ch) != 1:
+            return False
+        code = ord(ch)
+        i = bisect_right(self._starts, code) - 1
+        return i >= 0 and code <= self.intervals[i][1]
+
+    def __len__(self) -> int:
+        return sum(hi - lo + 1 for lo, hi in self.intervals)
+
+    def __bool__(self) -> bool:
+        return bool(self.intervals)
+
+    def __iter__(self) -> Iterator[str]:
+        for lo, hi in self.intervals:
+            for code in range(lo, hi + 1):
+                yield chr(code)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, CharSet) and self.intervals == other.intervals
+
+    def __hash__(self) -> int:
+        return hash(self.intervals)
+
+    def __lt__(self, other) -> bool:
+        """ Order labels by first character (for sorted output) """
+        return self.intervals < CharSet.of(other).intervals
+
+    def __str__(self) -> str:
+        def char(code):
+            c = chr(code)
+            if c in '\\]-^"':
+                return '\\' + c
+            if c.isprintable() and c != ' ':
+                return c
+            return f"\\x{code:02x}" if code < 0x100 else f"\\u{code:04x}"
+        parts = []
+        for lo, hi in self.intervals:
+            if lo == hi:
+                parts.append(char(lo))
+            elif hi == lo + 1:
+                parts.append(char(lo) + char(hi))
+            else:
+                parts.append(f"{char(lo)}-{char(hi)}")
+        return '[' + ''.join(parts) + ']'
+
+    def __repr__(self) -> str:
+        return str(self)
+
+
+def split_intervals(items: Iterable[Tuple[int, int, Hashable]]) \
+        -> List[Tuple[int, int, frozenset]]:
+    """ Split overlapping intervals into disjoint pieces
+
+    Args:
+        items: (lo, hi, value) triples
+
+    Returns:
+        Sorted, disjoint (lo, hi, values) triples covering every point of
+        the input, where values are all values whose interval contains it.
+    """
+    events = []
+    for lo, hi, value in items:
+        events.append((lo, 1, value))
+        events.append((hi + 1, -1, value))
+    events.sort(key=lambda e: e[0])
+
+    res = []
+    active = {}
+    i = 0
+    while i < len(events):
+        pos = events[i][0]
+        while i < len(events) and events[i][0] == pos:
+            _, delta, value = events[i]
+            count = active.get(value, 0) + delta
+            if count:
+                active[value] = count
+            else:
+                del active[value]
+            i += 1
+        if active and i < len(events):
+            res.append((pos, events[i][0] - 1, frozenset(active)))
+    return res
+
+
+def label_intervals(label) -> Tuple[Interval, ...]:
+    """ Codepoint intervals of a transition label """
+    return CharSet.of(label).intervals
@@ -0,0 +1,184 @@
+from array import array
+from typing import Dict, FrozenSet, List, Optional
+from src.python.states import StateCollection, State
+from src.python.finite_automaton import FiniteAutomaton, NFA, DFA
+
+EPSILON = -1  # label id of epsilon transitions (CSR)
+UNDEFINED = -1  # target of undefined transitions (transition table)
+
+
+def _index_labels(fa: FiniteAutomaton) -> List[str]:
+    """ Alphabet first, followed by any other non-epsilon label in use """
+    labels = list(fa.alphabet)
+    seen = set(labels)
+    for state in fa.sc:
+        for label, transitions in state.transitions.tbl.items():
+            if label in seen:
+                continue
+            if any(not t.epsilon for t in transitions):
+                labels.append(label)
+                seen.add(label)
+    return labels
+
+
+def _accept_ids(states: List[State]) -> Optional[List[FrozenSet[int]]]:
+    """ Accepted pattern ids per state, None if no state has any """
+    if not any(state.accept_ids for state in states):
+        return None
+    return [state.accept_ids for state in states]
+
+
+class CompactAutomaton:
+    """ Integer states (0..n-1) and integer labels (0..k-1)
+
+    The first len(alphabet) label ids are the alphabet, in order. Labels
+    used by transitions but missing from the alphabet follow, so converting
+    back to the object graph is lossless.
+    """
+
+    def __init__(self, alphabet: List[str], labels: List[str],
+                 names: List[str], origins: List[str],
+                 accepting: bytearray, start: int,
+                 accept_ids: Optional[List[FrozenSet[int]]] = None) -> None:
+        self.alphabet = alphabet
+        self.labels = labels
+        self.label_index = {label: i for i, label in enumerate(labels)}
+        self.names = names
+        self.origins = origins
+        self.accepting = accepting  # 1 for accepting states, else 0
+        self.start = start
+        # accepted pattern ids per state (multi-pattern automata only)
+        self.accept_ids = accept_ids
+
+    @property
+    def num_states(self) -> int:
+        return len(self.names)
+
+    @property
+    def num_labels(self) -> int:
+        return len(self.labels)
+
+    def _new_states(self) -> List[State]:
+        return [State(name, acc=bool(self.accepting[i]),
+                      origin=self.origins[i],
+                      accept_ids=self.accept_ids[i] if self.accept_ids
+                      else ())
+                for i, name in enumerate(self.names)]
+
+
+class CompactDFA(CompactAutomaton):
+    """ DFA as a dense array('i') transition table
+
+    table[s * num_labels + c] is the target of state s on label id c,
+    or UNDEFINED.
+    """
+
+    def __init__(self, alphabet: List[str], labels: List[str],
+                 names: List[str], origins: List[str],
+                 accepting: bytearray, start: int, table: array,
+                 accept_ids: Optional[List[FrozenSet[int]]] = None) -> None:
+        super().__init__(alphabet, labels, names, origins, accepting, start,
+                         accept_ids)
+        if len(table) != len(names) * len(labels):
+            raise Exception("CompactDFA Error: table has wrong size.")
+        self.table = table
+
+    def next(self, state: int, label: int) -> int:
+        return self.table[state * len(self.labels) + label]
+
+    @classmethod
+    def from_dfa(cls, dfa: DFA) -> 'CompactDFA':
+        states = list(dfa.sc)
+        index = {state.name: i for i, state in enumerate(states)}
+        labels = _index_labels(dfa)
+        k = len(labels)
+        table = array('i', [UNDEFINED]) * (len(states) * k)
+        for i, state in enumerate(states):
+            for c, label in enumerate(labels):
+                # exact label, a CharSet edge is its own column
+                transitions = state.transitions.tbl.get(label)
+                if transitions:
+                    target = next(iter(transitions)).to_state
+                    table[i * k + c] = index[target.name]
+        return cls(list(dfa.alphabet), labels,
+                   [state.name for state in states],
+                   [state.origin for state in states],
+                   bytearray(state.acc for state in states),
+                   index[dfa.start.name], table, _accept_ids(states))
+
+    def to_dfa(self) -> DFA:
+        states = self._new_states()
+        k = len(self.labels)
+        for i, state in enumerate(states):
+            for c, label in enumerate(self.labels):
+                t = self.table[i * k + c]
+                if t != UNDEFINED:
+                    state.add_transition(states[t], label)
+        return DFA(list(self.alphabet), states[self.start],
+                   StateCollection(states))
+
+
+class CompactNFA(CompactAutomaton):
+    """ NFA as CSR adjacency lists
+
+    The edges of state s are offsets[s]:offsets[s+1] in the parallel
+    arrays labels_of (label id or EPSILON) and targets.
+    """
+
+    def __init__(self, alphabet: List[str], labels: List[str],
+                 names: List[str], origins: List[str],
+                 accepting: bytearray, start: int,
+                 offsets: array, labels_of: array, targets: array,
+                 accept_ids: Optional[List[FrozenSet[int]]] = None) -> None:
+        super().__init__(alphabet, labels, names, origins, accepting, start,
+                         accept_ids)
+        if len(offsets) != len(names) + 1 or \
+                len(labels_of) != len(targets):
+            raise Exception("CompactNFA Error: inconsistent CSR arrays.")
+        self.offsets = offsets
+        self.labels_of = labels_of
+        self.targets = targets
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.targets)
+
+    def edges(self, state: int):
+        """ (label id, target) pairs for all edges out of state """
+        lo, hi = self.offsets[state], self.offsets[state + 1]
+        return zip(self.labels_of[lo:hi], self.targets[lo:hi])
+
+    def successors(self, state: int, label: int) -> List[int]:
+        return [t for c, t in self.edges(state) if c == label]
+
+    @classmethod
+    def from_nfa(cls, nfa: FiniteAutomaton) -> 'CompactNFA':
+        states = list(nfa.sc)
+        index = {state.name: i for i, state in enumerate(states)}
+        labels = _index_labels(nfa)
+        label_index: Dict[str, int] = {lb: i for i, lb in enumerate(labels)}
+        offsets = array('i', [0])
+        labels_of = array('i')
+        targets = array('i')
+        for state in states:
+            for label, transitions in state.transitions.tbl.items():
+                for t in transitions:
+                    labels_of.append(EPSILON if t.epsilon
+                                     else label_index[label])
+                    targets.append(index[t.to_state.name])
+            offsets.append(len(targets))
+        return cls(list(nfa.alphabet), labels,
+                   [state.name for state in states],
+                   [state.origin for state in states],
+                   bytearray(state.acc for state in states),
+                   index[nfa.start.name], offsets, labels_of, targets,
+                   _accept_ids(states))
+
+    def to_nfa(self) -> NFA:
+        states = self._new_states()
+        for i, state in enumerate(states):
+            for c, t in self.edges(i):
+                label = '' if c == EPSILON else self.labels[c]
+                state.add_transition(states[t], label)
+        return NFA(list(self.alphabet), states[self.start],
+                   StateCollection(states))
@@ -0,0 +1,111 @@
+from collections import deque
+from typing import Iterator, Optional, Tuple, Union
+from src.python.charset import CharSet, label_intervals, split_intervals
+from src.python.states import State
+from src.python.finite_automaton import DFA
+
+# Language equivalence and inclusion of DFAs
+#
+# Both walk the product of the two DFAs breadth first from the pair of
+# start states and stop at the first pair that tells them apart; the path
+# to that pair is the counterexample. Nothing is minimized and only
+# reachable pairs are looked at. Undefined transitions go to SINK.
+#
+# Equivalence is Hopcroft-Karp: the states of a pair are merged in a
+# union-find structure and a pair whose states are already in one class is
+# skipped, so at most n1 + n2 - 1 pairs are expanded (near-linear time).
+# Inclusion is not symmetric and visits every reachable pair once (at most
+# n1 * n2, usually far fewer).
+
+SINK = None  # non-accepting, all transitions lead back to it
+
+Pair = Tuple[Optional[State], Optional[State]]
+
+
+def _targets(state: Optional[State]) -> dict:
+    if state is SINK:
+        return {}
+    return {label: next(iter(transitions)).to_state
+            for label, transitions in state.transitions.tbl.items()}
+
+
+def moves(p: Optional[State], q: Optional[State]) \
+        -> Iterator[Tuple[Union[str, CharSet], Optional[State],
+                          Optional[State]]]:
+    """ (label, p target, q target) for the disjoint labels on which p or q
+    has a transition: the characters, or with CharSet labels the pieces
+    on which both targets stay the same """
+    p_targets, q_targets = _targets(p), _targets(q)
+    if not any(state is not SINK and state.transitions.ranges
+               for state in (p, q)):
+        # plain character labels
+        for c, s in p_targets.items():
+            yield c, s, q_targets.get(c, SINK)
+        for c, t in q_targets.items():
+            if c not in p_targets:
+                yield c, SINK, t
+        return
+    items = [(lo, hi, (side, target))
+             for side, targets in enumerate((p_targets, q_targets))
+             for label, target in targets.items()
+             for lo, hi in label_intervals(label)]
+    for lo, hi, values in split_intervals(items):
+        s = t = SINK
+        for side, target in values:
+            if side == 0:
+                s = target
+            else:
+                t = target
+        yield CharSet([(lo, hi)]), s, t
+
+
+def _accepting(state: Optional[State]) -> bool:
+    return state is not SINK and state.acc
+
+
+def counterexample(dfa1: DFA, dfa2: DFA, subset=False) -> Optional[str]:
+    """ A string accepted by exactly one of the DFAs, or with subset by
+    dfa1 but not by dfa2. None if there is no such string. """
+    start = (dfa1.start, dfa2.start)  # start None: empty language
+    parent = {start: None}  # pair -> (previous pair, character)
+    queue = deque([start])
+    classes = {}  # union-find parents, roots are missing
+
+    def find(state):
+        root = state
+        while root in classes:
+            root = classes[root]
+        while state in classes and classes[state] is not root:
+            classes[state], state = root, classes[state]
+        return root
+
+    while queue:
+        pair = queue.popleft()
+        p, q = pair
+        if not subset:
+            p_root, q_root = find(p), find(q)
+            if p_root is q_root:
+                continue
+        if _accepting(p) != _accepting(q) and \
+                (not subset or _accepting(p)):
+            return _word(parent, pair)
+        if not subset:
+            classes[p_root] = q_root
+        for label, s, t in moves(p, q):
+            if subset and s is SINK:
+                continue  # nothing accepted by dfa1 from here on
+            next_pair = (s, t)
+            if next_pair not in parent:
+                if isinstance(label, CharSet):
+                    label = chr(label.intervals[0][0])
+                parent[next_pair] = (pair, label)
+                queue.append(next_pair)
+    return None
+
+
+def _word(parent: dict, pair: Pair) -> str:
+    chars = []
+    while parent[pair] is not None:
+        pair, c = parent[pair]
+        chars.append(c)
+    return ''.join(reversed(chars))
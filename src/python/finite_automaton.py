@@ -1,6 +1,23 @@
-from typing import List
+from itertools import chain
+from typing import Iterable, List, Optional, Set
+from collections import deque
 from queue import Queue
-from src.python.states import StateCollection, State
+from src.python.states import StateCollection, State, EpsilonClosures
+from src.python.transitions import TransitionCollection
+from src.python.tracing import Tracer, TextTracer
+from src.python.minimization import hopcroft_partition
+from src.python.charset import CharSet, label_intervals, split_intervals
+
+# minimize(algorithm='auto') tries Brzozowski on the source NFA of subset
+# construction results with at least BLOWUP times the states of their NFA,
+# and the incremental engine on minimize() results with at most 1/CHANGED
+# of the states changed. Brzozowski gives up above 1/SHRINK of the DFA
+# states, the incremental engine above 1/AFFECTED of them affected, where
+# Hopcroft is about as fast.
+BRZOZOWSKI_BLOWUP = 4
+BRZOZOWSKI_SHRINK = 16
+INCREMENTAL_CHANGED = 32
+INCREMENTAL_AFFECTED = 8
 
 
 class FiniteAutomaton:
@@ -11,6 +28,185 @@ class FiniteAutomaton:
         self.alphabet = alphabet
         self.start = startstate
         self.sc = state_collection
+        self._ec = None  # epsilon-closures, see epsilon_closures
+        self._ec_version = None
+
+    def epsilon_closures(self) -> EpsilonClosures:
+        """ Epsilon-closures of the states, built once per automaton
+
+        Rebuilt after an epsilon transition has been added to one of the
+        states. Other transitions (e.g. those of the DFA in to_DFA) leave
+        the closures as they are, without looking at the states.
+        """
+        if self._ec is not None and \
+                TransitionCollection.epsilon_version > self._ec_version and \
+                all(state.transitions.modified <= self._ec_version
+                    for state in self.sc):
+            # only other automata got epsilon transitions
+            self._ec_version = TransitionCollection.version
+        if self._ec is None or \
+                TransitionCollection.epsilon_version > self._ec_version:
+            self._ec = EpsilonClosures(self.sc)
+            self._ec_version = TransitionCollection.version
+        return self._ec
+
+    def ec(self, states: Iterable[State]) -> StateCollection:
+        """ Epsilon-closure of a set of states """
+        return StateCollection(self.epsilon_closures().closure_of(states))
+
+    def symbols(self) -> List[str]:
+        """ Alphabet first, followed by any other single-character label in
+        use (to_DFA turns one-character pieces of CharSets into those) """
+        symbols = list(self.alphabet)
+        seen = set(symbols)
+        for state in self.sc:
+            for label, transitions in state.transitions.tbl.items():
+                if isinstance(label, str) and len(label) == 1 and \
+                        label not in seen and \
+                        any(not t.epsilon for t in transitions):
+                    symbols.append(label)
+                    seen.add(label)
+        return symbols
+
+    def alphabet_classes(self, alphabet: List[str] = None) \
+            -> List[List[str]]:
+        """ Partition of the alphabet into symbol equivalence classes
+
+        Two symbols are in the same class if they label exactly the same
+        transitions from every state, so algorithms only need to look at
+        one symbol per class. Refines a single class state by state in
+        O(edges). Classes and their symbols are in alphabet order.
+        alphabet replaces self.alphabet (e.g. symbols()).
+        """
+        alphabet = self.alphabet if alphabet is None else alphabet
+        class_of = {c: 0 for c in alphabet}
+        size = [len(class_of)]  # number of symbols per class
+        for state in self.sc:
+            targets_of = {}  # symbol -> target states
+            for label, transitions in state.transitions.tbl.items():
+                if label in class_of:
+                    symbols = [label]
+                elif isinstance(label, CharSet):
+                    symbols = [c for c in label if c in class_of] \
+                        if len(label) < len(class_of) \
+                        else [c for c in class_of if c in label]
+                else:
+                    continue
+                targets = [t.to_state for t in transitions if not t.epsilon]
+                for c in symbols:
+                    try:
+                        targets_of[c].update(targets)
+                    except KeyError:
+                        targets_of[c] = set(targets)
+
+            buckets = {}
+            for c, targets in targets_of.items():
+                key = (class_of[c], frozenset(targets))
+                try:
+                    buckets[key].append(c)
+                except KeyError:
+                    buckets[key] = [c]
+            for (cid, _), symbols in buckets.items():
+                if len(symbols) == size[cid]:
+                    continue  # the whole class behaves the same
+                new_cid = len(size)
+                size.append(len(symbols))
+                size[cid] -= len(symbols)
+                for c in symbols:
+                    class_of[c] = new_cid
+
+        classes = {}
+        for c in alphabet:
+            try:
+                classes[class_of[c]].append(c)
+            except KeyError:
+                classes[class_of[c]] = [c]
+        return list(classes.values())
+
+    def reachable(self) -> Set[State]:
+        """ States reachable from the start state (forward search) """
+        res = {self.start}
+        queue = deque([self.start])
+        while queue:
+            state = queue.popleft()
+            for _, transitions in state.transitions.tbl.items():
+                for t in transitions:
+                    if t.to_state not in res:
+                        res.add(t.to_state)
+                        queue.append(t.to_state)
+        return res
+
+    def coaccessible(self) -> Set[State]:
+        """ States with a path to an accepting state (backward search) """
+        # reverse-edge index
+        preds = {}
+        for state in self.sc:
+            for _, transitions in state.transitions.tbl.items():
+                for t in transitions:
+                    try:
+                        preds[t.to_state].append(state)
+                    except KeyError:
+                        preds[t.to_state] = [state]
+        res = set(self.sc.accepting)
+        queue = deque(res)
+        while queue:
+            for state in preds.get(queue.popleft(), ()):
+                if state not in res:
+                    res.add(state)
+                    queue.append(state)
+        return res
+
+    def dead_states(self) -> List[State]:
+        """ States from which no accepting state can be reached """
+        coaccessible = self.coaccessible()
+        return [state for state in self.sc if state not in coaccessible]
+
+    def trim(self) -> 'FiniteAutomaton':
+        """ Copy without unreachable and non-coaccessible states
+
+        Runs in O(states + edges). The start state is always kept, so the
+        trimmed automaton of an empty language is a single non-accepting
+        state.
+        """
+        keep = self.reachable() & self.coaccessible()
+        keep.add(self.start)
+        new_states = {}
+        for state in self.sc:
+            if state in keep:
+                new_states[state] = State(state.name, acc=state.acc,
+                                          origin=state.origin,
+                                          accept_ids=state.accept_ids)
+        for state, new_state in new_states.items():
+            for label, transitions in state.transitions.tbl.items():
+                for t in transitions:
+                    if t.to_state in new_states:
+                        new_state.add_transition(new_states[t.to_state],
+                                                 '' if t.epsilon else label)
+        return type(self)(self.alphabet, new_states[self.start],
+                          StateCollection(new_states.values()))
+
+    def reverse(self) -> 'NFA':
+        """ NFA of the reversed language
+
+        All edges are reversed, the old start state is the accepting state
+        and a new start state has epsilon transitions to the old accepting
+        states.
+        """
+        copies = {state: State(state.name, acc=state is self.start)
+                  for state in self.sc}
+        for state in self.sc:
+            for label, transitions in state.transitions.tbl.items():
+                for t in transitions:
+                    copies[t.to_state].add_transition(
+                        copies[state], '' if t.epsilon else label)
+        name = 'r'
+        while self.sc.get(name):
+            name += "'"
+        start = State(name)
+        for state in self.sc.accepting:
+            start.add_transition(copies[state])
+        return NFA(self.alphabet, start,
+                   StateCollection([start] + list(copies.values())))
 
     def to_graphviz(self) -> str:
         accstr = ''.join(
@@ -55,14 +251,36 @@ class FiniteAutomaton:
 
 class NFA(FiniteAutomaton):
 
-    def to_DFA(self, verbose=True) -> 'DFA':
+    def to_DFA(self, verbose=True, tracer: Tracer = None,
+               trim=False, workers=1, max_states=None) -> 'DFA':
+        """ Subset construction
+
+        Args:
+            verbose (bool): Print the steps (TextTracer) if no tracer is given
+            tracer (Tracer, optional): Receives the steps as events
+            trim (bool): Remove useless NFA states first (see trim)
+            workers (int): Expand the worklist in this many processes (see
+                parallel.py). The steps are not traced in that case.
+            max_states (int, optional): Give up (return None) once the DFA
+                has more states
+
+        Returns:
+            DFA: The DFA. Its source is this NFA (see minimize).
+        """
+        if trim:
+            return self.trim().to_DFA(verbose, tracer, workers=workers,
+                                      max_states=max_states)
+        if workers > 1:
+            # imported here since parallel.py builds on this module
+            from src.python.parallel import parallel_to_DFA
+            return parallel_to_DFA(self, workers, max_states=max_states)
+        if tracer is None and verbose:
+            tracer = TextTracer()
+
         # Initialize variable(s)
         self.name_index = 0
 
         # -- helper functions ----------------------------------------------- #
-        def acc_to_str(is_acc: bool) -> str:
-            return 'accepting' if is_acc else 'non-acc'
-
         def next_state_name():
             """ Ex: start state = 's0', next = 's1' """
             name = 's'+str(self.name_index)
@@ -74,113 +292,155 @@ class NFA(FiniteAutomaton):
         # Gives us the set of states reachable from
         # the NFA start state through epsilon transitions
         #######################################################################
-        start_set = StateCollection(self.start.epsilon_closure())
+        start_set = self.ec([self.start])
 
         # create new start state
         new_state_name = next_state_name()
-        start_state = State(new_state_name, acc=start_set.any_accepting())
+        start_state = State(new_state_name, acc=start_set.any_accepting(),
+                            accept_ids=start_set.accept_ids())
 
         # create new StateCollection for all the final DFA states
         dfa_states = StateCollection([start_state])
 
-        # output strings
-        output = ['-'*80 + "\nNFA to DFA\n" + '-'*80 + "\n"]
-        output += [
-            f"start = ec({{{self.start.name}}}) = ",
-            f"{start_set.state_names()} = {new_state_name} ",
-            f"({acc_to_str(start_state.acc)})\n"
-        ]
+        if tracer:
+            tracer.event('begin', title="NFA to DFA")
+            tracer.event('dfa_start', nfa_start=self.start.name,
+                         nfa_set=list(start_set.states_by_name),
+                         state=new_state_name, accepting=start_state.acc)
 
         #######################################################################
         # dfa_state_sets: Dictionary linking the new DFA states with the NFA
         # state sets which is used to determine if a new DFA state should be
-        # created or if the NFA set is already linked to an existing DFA state
+        # created or if the NFA set is already linked to an existing DFA state.
+        # Keyed by the frozen set of NFA state names for O(1) lookup.
         #######################################################################
-        dfa_state_sets = {start_state.name: start_set}
+        dfa_state_sets = {start_set.key(): start_state.name}
 
-        # Initialize queue for new DFA states and related NFA state sets
-        new_state_queue = Queue()
-        new_state_queue.put((start_state, start_set))
+        # symbols of one alphabet class lead to the same NFA state set
+        symbols = self.symbols()
+        class_of = {c: cid for cid, cls in
+                    enumerate(self.alphabet_classes(symbols)) for c in cls}
 
-        while not new_state_queue.empty():
+        # CharSet labels: split the labels into disjoint intervals instead
+        # of looping over the alphabet
+        ranges = self.sc.any_ranges()
+
+        # Initialize queue for new DFA states and related NFA state sets
+        # (single-threaded, so a deque instead of the locking queue.Queue)
+        new_state_queue = deque([(start_state, start_set)])
 
-            # output strings - spacing
-            output += ["\n"]
+        while new_state_queue:
 
             # get next state set from queue
-            dfa_state, nfa_state_set = new_state_queue.get()
+            dfa_state, nfa_state_set = new_state_queue.popleft()
+
+            if tracer:
+                tracer.event('dfa_dequeue', state=dfa_state.name)
 
             # check possible transitions for every label in alphabet
-            for c in self.alphabet:
+            if ranges:
+                label_moves = self._range_moves(nfa_state_set)
+            else:
+                label_moves = self._label_moves(nfa_state_set, symbols,
+                                                class_of)
+            for c, move_set, next_state_set in label_moves:
+
+                if next_state_set is None:  # move set empty
+                    if tracer:
+                        tracer.event('dfa_move', state=dfa_state.name,
+                                     label=str(c), move_set=[], nfa_set=[],
+                                     to_state=None, new=False,
+                                     accepting=False)
+                    continue
+
+                ###############################################################
+                # check if next_state_set already is referenced by
+                # a new DFA state
+                ###############################################################
+                next_state_key = next_state_set.key()
+                new_state_name = dfa_state_sets.get(next_state_key, '')
+                is_new = not new_state_name
 
-                # output strings
-                output += [f"move({dfa_state.name},{c}) = "]
+                if is_new:
+
+                    # create new state
+                    new_state_name = next_state_name()
+                    new_state = State(new_state_name,
+                                      acc=next_state_set.any_accepting(),
+                                      accept_ids=next_state_set.accept_ids())
+
+                    # add new state to DFA StateCollection
+                    dfa_state_sets[next_state_key] = new_state_name
+                    dfa_states.add(new_state)
+                    if max_states is not None and \
+                            len(dfa_state_sets) > max_states:
+                        return None
+
+                    # enqueue new DFA state and related NFA state set
+                    new_state_queue.append((new_state, next_state_set))
 
                 ###############################################################
-                # move(c): check which transitions are reachable from the state
-                # through the label c
+                # Add the transition to the new DFA state for the current
+                # label c. This can be an already existing DFA state,
+                # including dfa_state (loop) or a new state created in the
+                # current iteration.
                 ###############################################################
-                next_state_set = nfa_state_set.move(c)
-
-                if next_state_set.states_by_name:  # dictionary not empty
-
-                    # output strings
-                    output += [f"ec({next_state_set.state_names()}) = "]
-
-                    # get epsilon closures
-                    next_state_set.ec()
-
-                    ###########################################################
-                    # check if next_state_set already is referenced by
-                    # a new DFA state
-                    ###########################################################
-                    new_state_name = ''
-                    for sn, nfa_states in dfa_state_sets.items():
-                        if nfa_states == next_state_set:  # needs to be equal
-                            new_state_name = sn  # sn: state name
-
-                    # output strings
-                    temp = [f"{new_state_name}\n"]
-
-                    if not new_state_name:
-
-                        # create new state
-                        new_state_name = next_state_name()
-                        new_state = State(new_state_name,
-                                          acc=next_state_set.any_accepting())
-
-                        # add new state to DFA StateCollection
-                        dfa_state_sets[new_state_name] = next_state_set
-                        dfa_states.add(new_state)
-
-                        # enqueue new DFA state and related NFA state set
-                        new_state_queue.put((new_state, next_state_set))
-
-                        # output strings - overwrite temp
-                        temp = [
-                            f"{next_state_set.state_names()} = ",
-                            f"{new_state_name} ({acc_to_str(new_state.acc)})\n"
-                            ]
-
-                    ###########################################################
-                    # Add the transition to the new DFA state for the current
-                    # label c. This can be an already existing DFA state,
-                    # including dfa_state (loop) or a new state created in the
-                    # current iteration.
-                    ###########################################################
-                    to_state = dfa_states.get(new_state_name)
-                    dfa_state.add_transition(to_state, c)
-
-                    # output strings
-                    output += temp
-                else:
-                    output += [f"ec({{}}) = undefined\n"]
+                to_state = dfa_states.get(new_state_name)
+                dfa_state.add_transition(to_state, c)
+
+                if tracer:
+                    tracer.event('dfa_move', state=dfa_state.name,
+                                 label=str(c),
+                                 move_set=list(move_set.states_by_name),
+                                 nfa_set=list(next_state_set.states_by_name),
+                                 to_state=new_state_name, new=is_new,
+                                 accepting=to_state.acc)
 
         # while-loop end
-        # print output if verbose = True
-        if verbose:
-            print(''.join(output))
-        return DFA(self.alphabet, start_state, dfa_states)
+        if tracer:
+            tracer.event('end')
+        dfa = DFA(self.alphabet, start_state, dfa_states)
+        dfa.set_source(self)
+        return dfa
+
+    def _label_moves(self, nfa_state_set: StateCollection,
+                     symbols: List[str], class_of: dict):
+        """ (label, move set, closure) for every symbol (see symbols) """
+        moves = {}  # alphabet class -> (move set, closure)
+        for c in symbols:
+            ###################################################################
+            # move(c): check which transitions are reachable from the state
+            # through the label c (computed once per alphabet class)
+            ###################################################################
+            cid = class_of[c]
+            if cid not in moves:
+                move_set = nfa_state_set.move(c)
+                moves[cid] = (move_set, self.ec(move_set)
+                              if move_set.states_by_name else None)
+            yield (c,) + moves[cid]
+
+    def _range_moves(self, nfa_state_set: StateCollection):
+        """ (label, move set, closure) per reachable NFA state set
+
+        The labels of all transitions are split into disjoint intervals
+        (move_ranges). Intervals that lead to the same closure are merged
+        into one CharSet label, so the work depends on the number of
+        distinct ranges and not on the size of the character set.
+        """
+        by_key = {}  # closure key -> (intervals, move set, closure)
+        closures = {}  # move set -> closure
+        for lo, hi, targets in nfa_state_set.move_ranges():
+            if targets not in closures:
+                closures[targets] = self.ec(targets)
+            next_state_set = closures[targets]
+            key = next_state_set.key()
+            if key not in by_key:
+                by_key[key] = ([], set(), next_state_set)
+            by_key[key][0].append((lo, hi))
+            by_key[key][1].update(targets)
+        for intervals, move_set, next_state_set in by_key.values():
+            yield (CharSet(intervals).label(), StateCollection(move_set),
+                   next_state_set)
 
     def __repr__(self):
         return "NFA"
@@ -193,6 +453,11 @@ class DFA(FiniteAutomaton):
                  state_collection: StateCollection) -> None:
         super().__init__(alphabet, startstate, state_collection)
         self.validate()
+        self.source = None  # NFA, if built by to_DFA (see source_nfa)
+        self.source_version = None
+        self.minimized_by = None  # engine, if built by minimize
+        self.minimal_version = None  # see changed_states
+        self.minimal_states = None
 
     def validate(self) -> None:
         # check if DFA has legal transitions
@@ -203,14 +468,397 @@ class DFA(FiniteAutomaton):
         else:
             pass
 
-    def minimize(self, dead_state_removal=True, verbose=True):
+    def accepts(self, text: str) -> bool:
+        """ Run the DFA on text (one symbol per character) """
+        state = self.start
+        if state is None:
+            return False  # empty language (e.g. from minimize)
+        for c in text:
+            label_transitions = state.get_label_transitions(c)
+            if not label_transitions:
+                return False
+            state = label_transitions[0]
+        return state.acc
+
+    def save(self, path: str) -> None:
+        """ Write the DFA to a binary file for DFA.load (see serialize.py) """
+        # imported here since serialize.py builds on this module
+        from src.python.serialize import save
+        save(self, path)
+
+    @staticmethod
+    def load(path: str):
+        """ Memory-map a saved DFA for matching (a MappedDFA)
+
+        No State objects are built, matching runs off the mapped file.
+        """
+        from src.python.serialize import load
+        return load(path)
+
+    def counterexample(self, other: 'DFA', subset=False) -> Optional[str]:
+        """ A shortest string accepted by exactly one of the DFAs (with
+        subset: accepted by this DFA but not by other), None if there is
+        none (see equivalence.py) """
+        # imported here since equivalence.py builds on this module
+        from src.python.equivalence import counterexample
+        return counterexample(self, other, subset)
+
+    def equivalent(self, other: 'DFA') -> bool:
+        """ Whether both DFAs accept the same language, without minimizing """
+        return self.counterexample(other) is None
+
+    def is_subset(self, other: 'DFA') -> bool:
+        """ Whether every string this DFA accepts is accepted by other """
+        return self.counterexample(other, subset=True) is None
+
+    def intersect(self, other: 'DFA', minimize=False) -> 'DFA':
+        """ DFA of the strings accepted by both DFAs (see product.py) """
+        # imported here since product.py builds on this module
+        from src.python.product import product
+        return product(self, other, 'intersect', minimize)
+
+    def union(self, other: 'DFA', minimize=False) -> 'DFA':
+        """ DFA of the strings accepted by either DFA """
+        from src.python.product import product
+        return product(self, other, 'union', minimize)
+
+    def difference(self, other: 'DFA', minimize=False) -> 'DFA':
+        """ DFA of the strings accepted by this DFA but not by other """
+        from src.python.product import product
+        return product(self, other, 'difference', minimize)
+
+    def complement(self, minimize=False) -> 'DFA':
+        """ DFA of the strings this DFA does not accept, over the alphabet
+        (over all characters if the DFA has CharSet labels) """
+        from src.python.product import complement
+        return complement(self, minimize)
+
+    def minimize(self, dead_state_removal=True, verbose=True,
+                 algorithm='hopcroft', tracer: Tracer = None, trim=False):
+        """ Minimize the DFA
+
+        Args:
+            dead_state_removal (bool): Remove dead states from the result
+            verbose (bool): Print the steps (TextTracer) if no tracer is given
+            algorithm (str): 'hopcroft' (default), 'table-filling',
+                'brzozowski', 'incremental' or 'auto' (see choose_engine)
+            tracer (Tracer, optional): Receives the steps as events
+            trim (bool): Remove unreachable and dead states first (see trim)
+
+        Returns:
+            DFA: The minimized DFA, minimized_by names the engine that ran
+        """
+        if trim:
+            return self.trim().minimize(dead_state_removal, verbose,
+                                        algorithm, tracer)
+        if tracer is None and verbose:
+            tracer = TextTracer()
+        res = None
+        if algorithm == 'auto':
+            algorithm, reason = self.choose_engine(dead_state_removal)
+            if tracer:
+                tracer.event('engine', name=algorithm, reason=reason)
+            n = len(self.sc.states_by_name)
+            if algorithm == 'brzozowski':
+                res = self._minimize_brzozowski(dead_state_removal, tracer,
+                                                n // BRZOZOWSKI_SHRINK)
+            elif algorithm == 'incremental':
+                res = self._minimize_incremental(dead_state_removal, tracer,
+                                                 n // INCREMENTAL_AFFECTED)
+            if res is None and algorithm != 'hopcroft':
+                if tracer:
+                    tracer.event('engine', name='hopcroft',
+                                 reason=f"{algorithm} gave up")
+                algorithm = 'hopcroft'
+        engines = {'hopcroft': self._minimize_hopcroft,
+                   'table-filling': self._minimize_table_filling,
+                   'brzozowski': self._minimize_brzozowski,
+                   'incremental': self._minimize_incremental}
+        if algorithm not in engines:
+            raise Exception(f"Minimize Error: unknown algorithm {algorithm}.")
+        if res is None:
+            res = engines[algorithm](dead_state_removal, tracer)
+        res.minimized_by = algorithm
+        if dead_state_removal:
+            # lets the incremental engine re-minimize after later changes
+            res.minimal_version = TransitionCollection.version
+            res.minimal_states = set(res.sc)
+        return res
+
+    def set_source(self, nfa: 'NFA') -> None:
+        """ Remember the NFA this DFA was built from (see source_nfa) """
+        self.source = nfa
+        self.source_version = TransitionCollection.version
+
+    def source_nfa(self) -> 'NFA':
+        """ The NFA of set_source if neither automaton got new transitions
+        since, else None """
+        if self.source is None:
+            return None
+        for state in chain(self.sc, self.source.sc):
+            if state.transitions.modified > self.source_version:
+                return None
+        return self.source
+
+    def changed_states(self) -> List[State]:
+        """ States added or given new transitions since minimize() returned
+        this DFA (None if it was not returned by minimize) """
+        if self.minimal_version is None:
+            return None
+        return [state for state in self.sc
+                if state not in self.minimal_states
+                or state.transitions.modified > self.minimal_version]
+
+    def choose_engine(self, dead_state_removal=True):
+        """ Minimization engine for algorithm='auto' as (name, reason)
+
+        * incremental: a minimize() result with few changed states since
+        * brzozowski: a subset construction result much larger than its
+          source NFA, which is minimized instead of the DFA (minimize
+          falls back to hopcroft if the minimal DFA is large as well)
+        * hopcroft: otherwise
+        """
+        n = len(self.sc.states_by_name)
+        changed = self.changed_states() if dead_state_removal else None
+        if changed is not None and len(changed) * INCREMENTAL_CHANGED <= n:
+            return 'incremental', \
+                f"{len(changed)} of {n} states changed since minimize()"
+        nfa = self.source_nfa() if dead_state_removal else None
+        if nfa is not None and \
+                n >= BRZOZOWSKI_BLOWUP * len(nfa.sc.states_by_name) and \
+                not any(state.accept_ids for state in self.sc.accepting):
+            return 'brzozowski', f"{n} DFA states from " \
+                f"{len(nfa.sc.states_by_name)} NFA states"
+        return 'hopcroft', f"{n} states"
+
+    # -- engines ----------------------------------------------------------- #
+    def _minimize_hopcroft(self, dead_state_removal, tracer):
+        states = list(self.sc)
+        index = {state.name: i for i, state in enumerate(states)}
+        n = len(states)
+
+        #######################################################################
+        # Integer transition table with an implicit sink state (index n) for
+        # all undefined transitions, which makes move() total without
+        # touching the DFA itself.
+        #######################################################################
+        sink = n
+        if self.sc.any_ranges():
+            # CharSet labels: one symbol per disjoint piece of all labels
+            pieces = [(lo, hi) for lo, hi, _ in split_intervals(
+                (lo, hi, None) for state in self.sc
+                for label in state.transitions.tbl
+                for lo, hi in label_intervals(label))]
+            symbols = [chr(lo) for lo, _ in pieces]
+        else:
+            pieces = None
+            # one row per alphabet class, with the labels outside the
+            # alphabet (single characters of CharSets in to_DFA)
+            alphabet = self.symbols()
+            classes = self.alphabet_classes(alphabet)
+            symbols = [cls[0] for cls in classes]
+
+        delta = []
+        for c in symbols:
+            row = [sink] * (n + 1)
+            for i, state in enumerate(states):
+                label_transitions = state.get_label_transitions(c)
+                if label_transitions:
+                    row[i] = index[label_transitions[0].name]
+            delta.append(row)
+
+        if pieces is not None:
+            # pieces with identical rows behave the same
+            unique_rows = {}
+            piece_class = [unique_rows.setdefault(tuple(row), len(unique_rows))
+                           for row in delta]
+            delta = [list(row) for row in unique_rows]
+
+        #######################################################################
+        # Initial partition: non-accepting states (0) and accepting states,
+        # one block per set of accepted pattern ids (a plain DFA has one).
+        # With dead state removal the sink joins the non-accepting states,
+        # so every dead state ends up in the sink's group and is removed.
+        # Otherwise the sink gets its own group and an undefined transition
+        # stays distinguishable from a transition to a dead state.
+        #######################################################################
+        accept_block = {}  # accept ids -> initial block
+        initial = [accept_block.setdefault(state.accept_ids,
+                                           len(accept_block) + 2)
+                   if state.acc else 0 for state in states]
+        initial.append(0 if dead_state_removal else 1)
+
+        block_of, blocks = hopcroft_partition(len(delta), delta, initial)
+
+        # name groups by order of first appearance in the state collection
+        group_names = {}
+        for i in range(n):
+            b = block_of[i]
+            if b != block_of[sink] and b not in group_names:
+                group_names[b] = 'G' + str(len(group_names) + 1)
+
+        minimized_sc = StateCollection()
+        new_states = {}
+        for b, group_name in group_names.items():
+            group = StateCollection([states[i] for i in blocks[b]])
+            new_state = State(group_name, acc=group.any_accepting(),
+                              origin=group.state_names().replace(' ', ''),
+                              accept_ids=group.accept_ids())
+            new_states[b] = new_state
+            minimized_sc.add(new_state)
+
+        if pieces is None:
+            class_of = {c: ci for ci, cls in enumerate(classes) for c in cls}
+        for b, new_state in new_states.items():
+            representative = next(iter(blocks[b]))
+            if pieces is None:
+                for c in alphabet:
+                    to_block = block_of[delta[class_of[c]][representative]]
+                    if to_block in new_states:
+                        new_state.add_transition(new_states[to_block], c)
+            else:
+                # merge the pieces per target group into one CharSet label
+                intervals_to = {}
+                for (lo, hi), ci in zip(pieces, piece_class):
+                    to_block = block_of[delta[ci][representative]]
+                    if to_block in new_states:
+                        intervals_to.setdefault(to_block, []).append((lo, hi))
+                for to_block, intervals in intervals_to.items():
+                    new_state.add_transition(new_states[to_block],
+                                             CharSet(intervals).label())
+
+        start_state = new_states.get(block_of[index[self.start.name]])
+
+        res = DFA(self.alphabet, start_state, minimized_sc)
+        if tracer:
+            # states merged with the sink (only with dead state removal)
+            dead_states = [states[i].name for i in blocks[block_of[sink]]
+                           if i != sink]
+            self._trace_result(tracer, "Minimizing DFA (Hopcroft)",
+                               dead_states, res)
+        return res
+
+    def _trace_result(self, tracer, title, dead_states, res) -> None:
+        rows = []
+        alphabet = self.symbols()
+        for new_state in res.sc:
+            row = []
+            for c in alphabet:
+                label_transitions = new_state.get_label_transitions(c)
+                row.append(label_transitions[0].name
+                           if label_transitions else ' -')
+            rows.append(dict(name=new_state.name, row=' '.join(row),
+                             start=new_state is res.start,
+                             accepting=new_state.acc,
+                             origin=new_state.origin))
+        tracer.event('begin', title=title)
+        tracer.event('dead_states', states=dead_states, dummy=None)
+        tracer.event('refined', states=len(self.sc.states_by_name),
+                     groups=len(res.sc.states_by_name))
+        tracer.event('final_table', alphabet=alphabet,
+                     rows=rows,
+                     removed="group containing dead states"
+                     if dead_states else None)
+        tracer.event('end')
+
+    @staticmethod
+    def _targets(state: State) -> dict:
+        """ label -> target state """
+        return {label: next(iter(transitions)).to_state
+                for label, transitions in state.transitions.tbl.items()}
+
+    def _minimize_incremental(self, dead_state_removal, tracer,
+                              max_affected=None):
+        # see incremental.py, None if more than max_affected states are
+        # affected by the changes
+        if self.changed_states() is None or not dead_state_removal:
+            raise Exception("Minimize Error: incremental minimization needs "
+                            "a DFA returned by minimize() with dead state "
+                            "removal.")
+        # imported here since incremental.py builds on this module
+        from src.python.incremental import IncrementalMinimizer
+        minimizer = IncrementalMinimizer(self, max_affected)
+        if minimizer.affected is None:
+            return None
+        res = minimizer.minimize()
+        if tracer:
+            self._trace_result(tracer, "Minimizing DFA (incremental)",
+                               minimizer.dead_states, res)
+        return res
+
+    def _minimize_brzozowski(self, dead_state_removal, tracer,
+                             max_states=None):
+        #######################################################################
+        # Brzozowski: the subset construction of the reversal of a DFA in
+        # which every state is reachable gives the minimal DFA of the
+        # reversed language. Doing it twice gives the minimal DFA, and the
+        # first reversal may as well start from the source NFA, which
+        # skips the (large) DFA. The result only has reachable, live
+        # states, so dead state removal is implied (and unlike the other
+        # engines unreachable states are removed too). Accept ids cannot
+        # survive the reversal. None if a DFA gets over max_states states.
+        #######################################################################
+        if not dead_state_removal:
+            raise Exception("Minimize Error: brzozowski always removes dead "
+                            "states.")
+        if any(state.accept_ids for state in self.sc.accepting):
+            raise Exception("Minimize Error: brzozowski cannot keep accept "
+                            "ids.")
+        if self.start not in self.coaccessible():
+            # empty language: same result as Hopcroft (no states)
+            res = DFA(self.alphabet, None, StateCollection())
+        else:
+            fa = self.source_nfa() or self
+            dfa = fa.reverse().to_DFA(verbose=False, max_states=max_states)
+            if dfa is None:
+                return None
+            dfa = dfa.reverse().to_DFA(verbose=False,
+                                         max_states=max_states)
+            if dfa is None:
+                return None
+            states = list(dfa.sc)
+            #################################################################
+            # The new start state of the reversal makes the start subset
+            # differ from the subset without it, although both have the
+            # same language and transitions. Nothing leads back to the
+            # start, so its twin can take its place.
+            #################################################################
+            targets = self._targets(dfa.start)
+            for state in states[1:]:
+                if state.acc == dfa.start.acc and \
+                        self._targets(state) == targets:
+                    states.remove(dfa.start)
+                    states.remove(state)
+                    states.insert(0, state)
+                    break
+            # the same naming as the other engines
+            for i, state in enumerate(states):
+                state.name = 'G' + str(i + 1)
+            res = DFA(self.alphabet, states[0], StateCollection(states))
+        if tracer:
+            self._trace_result(tracer, "Minimizing DFA (Brzozowski)",
+                               [state.name for state in self.dead_states()],
+                               res)
+        return res
+
+    def _minimize_table_filling(self, dead_state_removal, tracer):
         # Initialize variable(s)
         self.name_index = 1
+        # the alphabet and labels outside it (see symbols). CharSet labels:
+        # one symbol per disjoint piece of all labels (as in Hopcroft), the
+        # first character of the piece stands for it.
+        label_of = {}  # symbol -> label of new transitions, if not itself
+        if self.sc.any_ranges():
+            for lo, hi, _ in split_intervals(
+                    (lo, hi, None) for state in self.sc
+                    for label in state.transitions.tbl
+                    for lo, hi in label_intervals(label)):
+                label_of[chr(lo)] = CharSet([(lo, hi)]).label()
+            alphabet = list(label_of)
+        else:
+            alphabet = self.symbols()
 
         # -- helper functions ----------------------------------------------- #
-        def acc_to_str(is_acc: bool) -> str:
-            return 'acc' if is_acc else 'non-acc'
-
         def next_group_name():
             """ Ex: first group = 'G1', next = 'G2' """
             name = 'G'+str(self.name_index)
@@ -224,114 +872,43 @@ class DFA(FiniteAutomaton):
                 if len(groups[unmarked_group].states_by_name) > 1:
                     q.put(unmarked_group)
 
-        def final_singleton_output(groups) -> str:
-            out = []
-            for gn in groups:
-
-                # final output for singletons
-                if len(groups[gn].states_by_name) == 1:
-
-                    # fetching singleton
-                    for key, item in groups[gn].states_by_name.items():
-                        sn = key
-                        state = item
-                        break
-
-                    # 'pseudo'-array header
-                    header = f"{gn}  "+'  '.join([c for c in self.alphabet])
-                    out += [
-                        f"\nFinal table for {gn}:\n",
-                        f"\n{header}\n",
-                        "-"*(len(header)+1)  # pretty printing array line
-                    ]
-
-                    res = []
-                    # to check consistency we use string matching
-                    for c in self.alphabet:
-                        label_transitions = state.get_label_transitions(c)
-
-                        # * There can only be one or zero transitions in the
-                        # * returned list because graph is DFA
-                        if label_transitions:
-                            to_state = label_transitions[0]
-
-                            # get group name
-                            for gn, states in groups.items():
-                                if states.get(to_state.name):
-                                    res.append(gn)
-                        else:
-                            res.append(' -')
-
-                    # add the result to results as tuple
-                    res = ' '.join(res)
-                    out += [f"\n{sn}  {res}"]
-                out += ["\n"]
-            return out
-
-        def any_dead_states(dfa_to_check) -> List[State]:
-            """ Check if any states in the DFA are dead states
-
-            Args:
-                dfa_to_check (DFA): Graph of DFA
-
-            Returns:
-                List[State]: The list of all dead states found
-            """
-            visited_states = {}
-
-            DEAD = 1
-            NOT_DEAD = 2
-            UNDECIDED = 3
+        def group_row(state, groups) -> str:
+            res = []
+            # to check consistency we use string matching
+            for c in alphabet:
+                label_transitions = state.get_label_transitions(c)
 
-            def dead_state(state_to_check):
-                # see if we already have checked the state
-                if state_to_check.name in visited_states:
-                    if visited_states[state_to_check.name] == DEAD:
-                        return True
-                    else:
-                        return False
+                # * There can only be one or zero transitions in the
+                # * returned list because graph is DFA
+                if label_transitions:
+                    to_state = label_transitions[0]
 
-                if not state_to_check.transitions.tbl:  # no transitions
-                    visited_states[state_to_check.name] = DEAD
-                    return True
+                    # get group name
+                    for gn, states in groups.items():
+                        if states.get(to_state.name):
+                            res.append(gn)
+                else:
+                    res.append(' -')
+            return ' '.join(res)
 
+        def singleton_rows(groups) -> List[dict]:
+            """ Final table rows for singleton groups (trace only) """
+            out = []
+            for gn in groups:
+                if len(groups[gn].states_by_name) == 1:
+                    state = next(iter(groups[gn]))
+                    out.append(dict(name=gn, state=state.name,
+                                    row=group_row(state, groups)))
                 else:
-                    for _, trs in state_to_check.transitions.tbl.items():
-                        for t in trs:
-                            if t.to_state == state_to_check:
-                                # loop to self
-                                continue
-                            elif t.to_state.acc:
-                                visited_states[state_to_check.name] = NOT_DEAD
-                                return False
-                            else:
-                                # see if we have already checked transition state
-                                if t.to_state.name in visited_states:
-                                    if visited_states[t.to_state.name] == NOT_DEAD:
-                                        visited_states[state_to_check.name] = NOT_DEAD
-                                        return False
-                                else:
-                                    visited_states[state_to_check.name] = UNDECIDED
-                                    if not dead_state(t.to_state):
-                                        visited_states[state_to_check.name] = NOT_DEAD
-                                        return False
-                visited_states[state_to_check.name] = DEAD
-                return True
-
-            # initialize visited with accepting states
-            for state in dfa_to_check.sc.accepting:
-                visited_states[state.name] = NOT_DEAD
-
-            dead_states = []
-            for state in dfa_to_check.sc:
-                if dead_state(state):
-                    dead_states.append(state)
-            return set(dead_states)
+                    out.append(dict(name=gn, state=None, row=None))
+            return out
 
         #######################################################################
         # start by creating two new groups:
         # G1 for all accepting states
         # G2 for all non-acc. states
+        # Accepting states of a multi-pattern DFA are split further by
+        # their set of accepted pattern ids (G3, G4, ... for the others).
         #######################################################################
         groups = {}
         g1_name = next_group_name()
@@ -339,8 +916,8 @@ class DFA(FiniteAutomaton):
         groups[g1_name] = StateCollection()  # G1
         groups[g2_name] = StateCollection()  # G2
 
-        # output strings
-        output = ['-'*80 + "\nMinimizing DFA\n" + '-'*80 + "\n"]
+        if tracer:
+            tracer.event('begin', title="Minimizing DFA")
 
         #######################################################################
         # * Dead states *
@@ -357,7 +934,7 @@ class DFA(FiniteAutomaton):
         # it is not possible to transition to an accepting state)
         #######################################################################
 
-        dead_states = any_dead_states(self) if dead_state_removal else []
+        dead_states = self.dead_states() if dead_state_removal else []
 
         if dead_states:
             ###################################################################
@@ -370,34 +947,34 @@ class DFA(FiniteAutomaton):
             self.sc.add(dummy)
             # add undefined transitions
             for state in self.sc:
-                for c in self.alphabet:
+                for c in alphabet:
                     if not state.get_label_transitions(c):
-                        state.add_transition(dummy, c)
+                        state.add_transition(dummy, label_of.get(c, c))
 
-            if not verbose:
-                # small hack: turn of verbose if dead state is detected to print gv
-                self.print_as_gvfile()
-
-            # output strings
-            output += [
-                f"Dead states detected: {dead_states}\n",
-                f"Make move() total: adding dummy state {{d0}}\n\n",
-            ]
-        else:
-            output += ["No dead states detected.\n\n"]
+        if tracer:
+            tracer.event('dead_states',
+                         states=[state.name for state in dead_states],
+                         dummy='d0' if dead_states else None)
 
         # Add states to new groups
+        accept_groups = {}  # accept ids -> group name
         for state in self.sc:
             if state.acc:
-                groups[g1_name].add(state)
+                if state.accept_ids not in accept_groups:
+                    accept_groups[state.accept_ids] = g1_name \
+                        if not accept_groups else next_group_name()
+                    groups.setdefault(accept_groups[state.accept_ids],
+                                      StateCollection())
+                groups[accept_groups[state.accept_ids]].add(state)
             else:
                 groups[g2_name].add(state)
 
-        # output strings
-        output += [
-            f"{g1_name} = {groups[g1_name].state_names():<13} accepting\n",
-            f"{g2_name} = {groups[g2_name].state_names():<13} non-accepting\n"
-        ]
+        if tracer:
+            tracer.event('initial_groups', groups=[
+                dict(name=gn, accepting=gn != g2_name,
+                     states=list(groups[gn].states_by_name))
+                for gn in groups
+            ])
 
         # Initialize queue for new groups and related DFA state sets
         unmarked_groups = Queue()
@@ -409,41 +986,16 @@ class DFA(FiniteAutomaton):
             group_name = unmarked_groups.get()
             group_to_check = groups[group_name]
 
-            # output strings
-            # 'pseudo'-array header
-            header = f"{group_name}  " + '  '.join([c for c in self.alphabet])
-            output += [
-                f"\nChecking {group_name}:\n",
-                f"\n{header}\n",
-                "-"*(len(header)+1)  # pretty printing array line
-            ]
-
             results = []
             for state in group_to_check:
-                res = []
-                # to check consistency we use string matching
-                for c in self.alphabet:
-                    label_transitions = state.get_label_transitions(c)
-
-                    # * There can only be one or zero transitions in the
-                    # * returned list because graph is DFA
-                    if label_transitions:
-                        to_state = label_transitions[0]
-
-                        # get group name
-                        for gn, states in groups.items():
-                            if states.get(to_state.name):
-                                res.append(gn)
-                    else:
-                        res.append(' -')
-
                 # add the result to results as tuple
-                res = ' '.join(res)
-                results.append((state, res))
+                results.append((state, group_row(state, groups)))
 
-                # output strings
-                output += [f"\n{state.name}  {res}"]
-            output += ["\n"]
+            if tracer:
+                tracer.event('check_group', group=group_name,
+                             alphabet=list(alphabet),
+                             rows=[(state.name, res)
+                                   for state, res in results])
 
             # Is group consistent??
             is_consistent = True
@@ -453,10 +1005,9 @@ class DFA(FiniteAutomaton):
                     is_consistent = False
                     break
             if is_consistent:
-                output += [f"\n{group_name} is consistent!\n"]
+                if tracer:
+                    tracer.event('consistent', group=group_name)
             else:
-                output += [f"\nNot consistent! Split {group_name} into:\n\n"]
-
                 # Split into new groups
                 # * First: group the identical states
                 new_groups = {}
@@ -469,16 +1020,13 @@ class DFA(FiniteAutomaton):
                         new_groups[to_groups] = [state]
 
                 # * Second: create new groups and add to groups
+                split = []
                 for row, states in new_groups.items():
 
                     next_name = next_group_name()
                     gc = StateCollection(states)
                     groups[next_name] = gc
-
-                    # output strings
-                    output += [
-                        f"{next_name} = {gc.state_names()}\t(row {row})\n"
-                    ]
+                    split.append((next_name, row, gc))
 
                 # * Third: 'mark' original group as obsolete (remove)
                 groups.pop(group_name)
@@ -486,31 +1034,26 @@ class DFA(FiniteAutomaton):
                 # * Fourth: reset queue
                 add_unmarked_groups_to_queue(groups, unmarked_groups)
 
-                # output strings
-                output += [
-                    f"\nMarking {group_name} obsolete!\n",
-                    "Reset queue (unmark groups)\n",
-                    "\n--\n"
-                ]
+                if tracer:
+                    tracer.event('split', group=group_name, new_groups=[
+                        dict(name=name, row=row,
+                             states=list(gc.states_by_name))
+                        for name, row, gc in split
+                    ])
         # while-loop end
 
         #######################################################################
-        # Create new minimized DFA and final output strings
+        # Create new minimized DFA
         #######################################################################
 
-        # output strings - singleton groups
-        output += final_singleton_output(groups)
-
-        # output strings - final transition table
-        header = f"    " + '  '.join([c for c in self.alphabet])
-        output += [
-            f"\nFinal transition table:\n",
-            f"\n{header}\n",
-            "-"*(len(header)+1)  # pretty printing array line
-        ]
+        if tracer:
+            tracer.event('singletons', alphabet=list(alphabet),
+                         groups=singleton_rows(groups))
 
         minimized_sc = StateCollection()
         start_state = None
+        dummy_group = None
+        table = []  # final transition table rows (trace only)
         for group_name, sc in groups.items():
             ###################################################################
             # Every new group in groups has a StateCollection with
@@ -519,6 +1062,10 @@ class DFA(FiniteAutomaton):
             # for G transitions.
             ###################################################################
 
+            # Disregard empty groups (no accepting or non-acc. states)
+            if not sc.states_by_name:
+                continue
+
             # Disregard group with dummy state
             if sc.get('d0'):
                 dummy_group = group_name
@@ -526,7 +1073,6 @@ class DFA(FiniteAutomaton):
 
             # Create new State
             is_start = sc.get(self.start.name)
-            start = "start, " if is_start else ''
             origin = sc.state_names().replace(' ', '')
             accepting = sc.any_accepting()
 
@@ -535,9 +1081,13 @@ class DFA(FiniteAutomaton):
                 # already exists - add origin and acc
                 existing_state.origin = origin
                 existing_state.acc = accepting
+                existing_state.accept_ids = sc.accept_ids()
+                if accepting:
+                    minimized_sc.accepting.append(existing_state)
                 new_state = existing_state
             else:
-                new_state = State(group_name, acc=accepting, origin=origin)
+                new_state = State(group_name, acc=accepting, origin=origin,
+                                  accept_ids=sc.accept_ids())
                 # add to StateCollections
                 minimized_sc.add(new_state)
 
@@ -545,7 +1095,7 @@ class DFA(FiniteAutomaton):
                 start_state = new_state
 
             res = []
-            for c in self.alphabet:
+            for c in alphabet:
                 state_transitions = sc.move(c)
 
                 r = ' -'
@@ -564,28 +1114,22 @@ class DFA(FiniteAutomaton):
                             t_state = minimized_sc.get(gn)
                             if not t_state:  # not found - create
                                 t_state = State(gn)  # will be updated later
+                                minimized_sc.add(t_state)
 
-                            new_state.add_transition(t_state, c)
+                            new_state.add_transition(
+                                t_state, label_of.get(c, c))
                             r = gn
                 res.append(r)
 
-            # add the result to results as tuple
-            res = ' '.join(res)
-
-            # output strings
-            output += [
-                f"\n{group_name}  {res}    {start}{acc_to_str(accepting)}"
-            ]
-
-        if dead_states:
-            output += [
-                    f"\n\nRemoved {dummy_group} containing dummy state 'd0'"
-                ]
-
-        output += ["\n"]
+            table.append(dict(name=group_name, row=' '.join(res),
+                              start=bool(is_start), accepting=accepting))
 
-        if verbose:
-            print(''.join(output))
+        if tracer:
+            tracer.event('final_table', alphabet=list(alphabet),
+                         rows=table,
+                         removed=f"{dummy_group} containing dummy state 'd0'"
+                         if dummy_group else None)
+            tracer.event('end')
         return DFA(self.alphabet, start_state, minimized_sc)
 
     def __repr__(self):
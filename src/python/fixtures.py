@@ -0,0 +1,163 @@
+import random
+from src.python.states import StateCollection, State
+from src.python.finite_automaton import NFA, DFA
+from src.python.matcher import CompiledDFA
+
+# Automata and helpers shared by the tests and the benchmarks
+
+
+def example2_nfa() -> NFA:
+    """ example2.py: Introduction to Compiler Design, figure 1.5 """
+    s = {i: State(str(i), acc=(i == 4)) for i in range(1, 9)}
+    s[1].add_transition(s[2])
+    s[1].add_transition(s[5])
+    s[2].add_transition(s[3], 'a')
+    s[3].add_transition(s[4], 'c')
+    s[5].add_transition(s[6])
+    s[5].add_transition(s[7])
+    s[6].add_transition(s[8], 'a')
+    s[7].add_transition(s[8], 'b')
+    s[8].add_transition(s[1])
+    return NFA(['a', 'b', 'c'], s[1], StateCollection(s.values()))
+
+
+def nth_from_last_nfa(n: int) -> NFA:
+    """ (a|b)*a(a|b){n-1}: the n-th symbol from the end is 'a', the DFA has
+    2^n states """
+    states = [State(f"q{i}", acc=(i == n)) for i in range(n + 1)]
+    states[0].add_transition(states[0], 'a')
+    states[0].add_transition(states[0], 'b')
+    states[0].add_transition(states[1], 'a')
+    for i in range(1, n):
+        states[i].add_transition(states[i + 1], 'a')
+        states[i].add_transition(states[i + 1], 'b')
+    return NFA(['a', 'b'], states[0], StateCollection(states))
+
+
+def out_of_alphabet_nfa() -> NFA:
+    """ a|z with alphabet ['a'] """
+    s0, s1 = State("0"), State("1", acc=True)
+    s0.add_transition(s1, 'a')
+    s0.add_transition(s1, 'z')
+    return NFA(['a'], s0, StateCollection([s0, s1]))
+
+
+def example_dfa() -> DFA:
+    """ min_example.py """
+    s0 = State("s0", acc=True)
+    s1 = State("s1")
+    s2 = State("s2", acc=True)
+    s3 = State("s3", acc=True)
+    s4 = State("s4")
+    s0.add_transition(s1, 'a')
+    s0.add_transition(s3, 'b')
+    s1.add_transition(s2, 'a')
+    s2.add_transition(s4, 'a')
+    s2.add_transition(s3, 'b')
+    s3.add_transition(s3, 'b')
+    s3.add_transition(s4, 'a')
+    s4.add_transition(s3, 'a')
+    s4.add_transition(s1, 'b')
+    return DFA(['a', 'b'], s0, StateCollection([s0, s1, s2, s3, s4]))
+
+
+def deadstate_dfa() -> DFA:
+    """ min_example_deadstate.py """
+    s1 = State("s1", acc=True)
+    s2 = State("s2", acc=True)
+    s3 = State("s3")
+    s1.add_transition(s2, 'a')
+    s2.add_transition(s1, 'a')
+    s2.add_transition(s3, 'b')
+    return DFA(['a', 'b'], s1, StateCollection([s1, s2, s3]))
+
+
+def random_dfa(rng: random.Random, n: int, alphabet, density=1.0) -> DFA:
+    """ Random (partial) DFA with about 30% accepting states """
+    states = [State(f"s{i}", acc=rng.random() < 0.3) for i in range(n)]
+    for state in states:
+        for c in alphabet:
+            if rng.random() < density:
+                state.add_transition(rng.choice(states), c)
+    return DFA(alphabet, states[0], StateCollection(states))
+
+
+def abb_nfa() -> NFA:
+    """ (a|b)*abb """
+    s0, s1, s2 = State("0"), State("1"), State("2")
+    s3 = State("3", acc=True)
+    s0.add_transition(s0, 'a')
+    s0.add_transition(s0, 'b')
+    s0.add_transition(s1, 'a')
+    s1.add_transition(s2, 'b')
+    s2.add_transition(s3, 'b')
+    return NFA(['a', 'b'], s0, StateCollection([s0, s1, s2, s3]))
+
+
+def ab_plus_dfa():
+    """ ab+ as a partial DFA """
+    s0, s1 = State("0"), State("1")
+    s2 = State("2", acc=True)
+    s0.add_transition(s1, 'a')
+    s1.add_transition(s2, 'b')
+    s2.add_transition(s2, 'b')
+    return NFA(['a', 'b'], s0, StateCollection([s0, s1, s2])).to_DFA(
+        verbose=False)
+
+
+def isomorphic(dfa1: DFA, dfa2: DFA) -> bool:
+    """ Check if two DFAs are equal up to renaming of states """
+    if len(dfa1.sc.states_by_name) != len(dfa2.sc.states_by_name):
+        return False
+    if len(dfa1.sc.accepting) != len(dfa2.sc.accepting):
+        return False
+    if dfa1.start is None or dfa2.start is None:
+        return dfa1.start is None and dfa2.start is None
+    mapping = {dfa1.start.name: dfa2.start}
+    stack = [(dfa1.start, dfa2.start)]
+    while stack:
+        s1, s2 = stack.pop()
+        if s1.acc != s2.acc:
+            return False
+        for c in dfa1.alphabet:
+            t1 = s1.get_label_transitions(c)
+            t2 = s2.get_label_transitions(c)
+            if bool(t1) != bool(t2):
+                return False
+            if not t1:
+                continue
+            if t1[0].name in mapping:
+                if mapping[t1[0].name] is not t2[0]:
+                    return False
+            else:
+                mapping[t1[0].name] = t2[0]
+                stack.append((t1[0], t2[0]))
+    return True
+
+
+def spans(matcher: CompiledDFA, text):
+    """ finditer reference: the longest match tried at every position """
+    classes = matcher._classes(text, 0, len(text))
+    start, res = 0, []
+    while start <= len(classes):
+        end = matcher._longest(classes, start)
+        if end < 0:
+            start += 1
+            continue
+        res.append((start, end))
+        start = end if end > start else end + 1
+    return res
+
+
+def match_spans(matcher, text, start: int = 0) -> list:
+    """ finditer reference for any matcher: the longest match (match)
+    tried at every position """
+    res = []
+    while start <= len(text):
+        span = matcher.match(text, start)
+        if span is None:
+            start += 1
+            continue
+        res.append(span)
+        start = span[1] if span[1] > start else span[1] + 1
+    return res
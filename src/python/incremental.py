@@ -0,0 +1,288 @@
+from bisect import bisect_right
+from typing import Dict, List, Optional
+from src.python.charset import CharSet, label_intervals, split_intervals
+from src.python.states import StateCollection, State
+from src.python.finite_automaton import DFA
+from src.python.minimization import hopcroft_partition
+
+# Incremental minimization
+#
+# For a DFA returned by minimize() that got a few new states and transitions
+# since (DFA.changed_states). The states that cannot reach a changed state
+# (unaffected) keep their right languages, so they are still pairwise
+# inequivalent and nothing has to be refined among them. Only the affected
+# states are placed:
+#
+# 1. dead affected states join the (implicit) sink
+# 2. an affected state equivalent to an unaffected one is found with a
+#    union-find equivalence test (Hopcroft-Karp) against the unaffected
+#    states that have the same target on some symbol
+# 3. the remaining affected states are refined among themselves with
+#    hopcroft_partition, their unaffected targets acting as fixed blocks
+#
+# The result is copied from the transitions of one state per class, so the
+# unaffected part is never turned into a transition table.
+
+
+class IncrementalMinimizer:
+    """ Equivalence classes of a minimized DFA after a few changes
+
+    Args:
+        dfa (DFA): A DFA with minimal info (see DFA.changed_states)
+        max_affected (int, optional): Give up (affected is None) if more
+            states are affected
+    """
+
+    def __init__(self, dfa: DFA, max_affected: Optional[int] = None) -> None:
+        self.dfa = dfa
+        self.sink = State('')  # all undefined transitions
+        self.parent = {}  # union-find, roots are missing
+        self.distinct = set()  # root pairs known to be distinguishable
+        self.rows = {}  # state -> targets per symbol (see row)
+        self.dead_states = []  # names, see minimize
+
+        # incoming edges as (source, label) of every state
+        self.preds = {}
+        for state in dfa.sc:
+            for label, transitions in state.transitions.tbl.items():
+                for t in transitions:
+                    try:
+                        self.preds[t.to_state].append((state, label))
+                    except KeyError:
+                        self.preds[t.to_state] = [(state, label)]
+
+        # affected: changed states and everything that can reach them
+        self.affected = {}  # ordered set
+        stack = list(dfa.changed_states())
+        while stack:
+            state = stack.pop()
+            if state not in self.affected:
+                if max_affected is not None and \
+                        len(self.affected) >= max_affected:
+                    self.affected = None
+                    return
+                self.affected[state] = None
+                stack.extend(s for s, _ in self.preds.get(state, ()))
+
+        # symbols: disjoint pieces of the labels of the affected states
+        self.pieces = split_intervals(
+            (lo, hi, None) for state in self.affected
+            for label in state.transitions.tbl
+            for lo, hi in label_intervals(label))
+        self.starts = [lo for lo, _, _ in self.pieces]
+
+    # -- union-find -------------------------------------------------------- #
+    def find(self, state: State) -> State:
+        # no path compression, so failed unions can simply be undone
+        while state in self.parent:
+            state = self.parent[state]
+        return state
+
+    def key(self, state: State):
+        return (state.acc, state.accept_ids)
+
+    def symbols(self, lo: int, hi: int) -> Optional[range]:
+        """ The adjacent pieces that make up [lo, hi], None if there are
+        none """
+        p = bisect_right(self.starts, lo) - 1
+        if p < 0 or self.starts[p] != lo:
+            return None
+        q = p
+        while self.pieces[q][1] < hi:
+            q += 1
+            if q == len(self.pieces) or \
+                    self.starts[q] != self.pieces[q - 1][1] + 1:
+                return None
+        return range(p, q + 1) if self.pieces[q][1] == hi else None
+
+    def row(self, state: State) -> Optional[List[State]]:
+        """ Target per symbol, None if the state has transitions on other
+        characters or splits a symbol (then no affected state can be
+        equivalent to it) """
+        if state in self.rows:
+            return self.rows[state]
+        res = [self.sink] * len(self.pieces)
+        for label, transitions in state.transitions.tbl.items():
+            target = next(iter(transitions)).to_state
+            for lo, hi in label_intervals(label):
+                symbols = self.symbols(lo, hi)
+                if symbols is None:
+                    self.rows[state] = None
+                    return None
+                for p in symbols:
+                    res[p] = target
+        self.rows[state] = res
+        return res
+
+    def equivalent(self, p: State, q: State) -> bool:
+        """ Union-find equivalence test, the unions are kept if it holds """
+        merged = []
+        pairs = [(p, q)]
+        while pairs:
+            s, t = pairs.pop()
+            s, t = self.find(s), self.find(t)
+            if s is t:
+                continue
+            row_s, row_t = self.row(s), self.row(t)
+            if (s not in self.affected and t not in self.affected) or \
+                    self.key(s) != self.key(t) or \
+                    row_s is None or row_t is None or \
+                    (s, t) in self.distinct:
+                for r in merged:
+                    del self.parent[r]
+                p, q = self.find(p), self.find(q)
+                self.distinct.update([(p, q), (q, p)])
+                return False
+            # unaffected states stay roots
+            if s in self.affected:
+                s, t = t, s
+                row_s, row_t = row_t, row_s
+            self.parent[t] = s
+            merged.append(t)
+            pairs.extend(zip(row_s, row_t))
+        return True
+
+    # -- placement --------------------------------------------------------- #
+    def candidates(self, a: State) -> Optional[List[State]]:
+        """ Unaffected states with the same target as a on the symbol whose
+        (unaffected) target has the fewest incoming edges, None if a has
+        no such target yet """
+        best = None
+        for p, target in enumerate(self.row(a)):
+            target = self.find(target)
+            if target in self.affected or target is self.sink:
+                continue
+            preds = self.preds.get(target, ())
+            if best is None or len(preds) < len(best[1]):
+                best = (p, preds)
+        if best is None:
+            return None
+        p, preds = best
+        lo, hi, _ = self.pieces[p]
+        return [s for s, label in preds if s not in self.affected and
+                any(l <= lo and hi <= h for l, h in label_intervals(label))]
+
+    def place(self) -> None:
+        """ Union every affected state with its equivalent unaffected
+        state (or the sink), if any """
+        # 1. dead states: no path to an accepting or an unaffected state
+        live = set()
+        stack = [a for a in self.affected if a.acc or any(
+            t not in self.affected and t is not self.sink
+            for t in self.row(a))]
+        while stack:
+            state = stack.pop()
+            if state not in live:
+                live.add(state)
+                stack.extend(s for s, _ in self.preds.get(state, ())
+                             if s in self.affected)
+        for a in self.affected:
+            if a not in live:
+                self.parent[a] = self.sink
+
+        # 2. equivalent unaffected states, found through a target that is
+        # (equivalent to) an unaffected state. Every union can give other
+        # affected states such a target, so repeat until nothing changes.
+        todo = [a for a in self.affected if a in live]
+        changed = True
+        while changed:
+            changed = False
+            waiting = []
+            for a in todo:
+                if self.find(a) is not a:
+                    continue
+                candidates = self.candidates(a)
+                if candidates is None:
+                    waiting.append(a)
+                    continue
+                for u in candidates:
+                    if self.equivalent(a, u):
+                        changed = True
+                        break
+            todo = waiting
+        # targets only among the remaining affected states: try all
+        # unaffected states with the same key and defined characters
+        by_domain = {}
+        if todo:
+            for u in self.dfa.sc:
+                if u not in self.affected:
+                    domain = CharSet(i for label in u.transitions.tbl
+                                     for i in label_intervals(label))
+                    by_domain.setdefault((self.key(u), domain),
+                                         []).append(u)
+        for a in todo:
+            if self.find(a) is a:
+                domain = CharSet(self.pieces[p][:2]
+                                 for p, t in enumerate(self.row(a))
+                                 if self.find(t) is not self.sink)
+                for u in by_domain.get((self.key(a), domain), ()):
+                    if self.equivalent(a, u):
+                        break
+
+    def classes(self) -> Dict[State, object]:
+        """ Class id of every state (the sink's class is self.sink) """
+        self.place()
+        remaining = [a for a in self.affected if self.find(a) is a]
+
+        # 3. refine the remaining affected states, their other targets are
+        # fixed blocks (one per unaffected root, the sink included)
+        index = {a: i for i, a in enumerate(remaining)}
+        key_block = {}
+        initial = [key_block.setdefault(self.key(a), len(key_block))
+                   for a in remaining]
+        delta = [[] for _ in self.pieces]
+        for a in remaining:
+            for p, target in enumerate(self.row(a)):
+                target = self.find(target)
+                if target not in index:
+                    index[target] = len(initial)
+                    initial.append(len(initial) + len(key_block))
+                delta[p].append(index[target])
+        for row in delta:
+            row.extend(range(len(remaining), len(initial)))  # self-loops
+        block_of, _ = hopcroft_partition(len(delta), delta, initial)
+
+        block = {a: ('block', block_of[i]) for i, a in enumerate(remaining)}
+        return {state: block.get(state) or self.find(state)
+                for state in self.dfa.sc}
+
+    def minimize(self) -> DFA:
+        """ The minimized DFA, dead_states are the states left out """
+        dfa = self.dfa
+        class_of = self.classes()
+
+        # name groups by order of first appearance in the state collection
+        members = {}
+        for state in dfa.sc:
+            if class_of[state] is self.sink:
+                self.dead_states.append(state.name)
+            else:
+                members.setdefault(class_of[state], []).append(state)
+        minimized_sc = StateCollection()
+        new_states = {}
+        for i, (c, group) in enumerate(members.items()):
+            group = StateCollection(group)
+            new_state = State('G' + str(i + 1), acc=group.any_accepting(),
+                              origin=group.state_names().replace(' ', ''),
+                              accept_ids=group.accept_ids())
+            new_states[c] = new_state
+            minimized_sc.add(new_state)
+
+        ranges = dfa.sc.any_ranges()
+        for c, new_state in new_states.items():
+            representative = members[c][0]
+            labels_to = {}  # target group -> labels
+            for label, transitions in representative.transitions.tbl.items():
+                to = class_of[next(iter(transitions)).to_state]
+                if to in new_states:
+                    labels_to.setdefault(to, []).append(label)
+            for to, labels in labels_to.items():
+                if ranges:
+                    # one CharSet label per target group, as in Hopcroft
+                    labels = [CharSet(i for label in labels for i in
+                                      label_intervals(label)).label()]
+                for label in labels:
+                    new_state.add_transition(new_states[to], label)
+
+        start = new_states.get(class_of[dfa.start])
+        return DFA(dfa.alphabet, start, minimized_sc)
@@ -0,0 +1,197 @@
+from collections import OrderedDict
+from typing import FrozenSet, Iterator, List, Optional, Tuple, Union
+from src.python.charset import CharSet, MAX_CODEPOINT
+from src.python.finite_automaton import NFA
+
+Text = Union[str, bytes, bytearray, memoryview]
+
+
+class LazyDFA:
+    """ On-demand determinization of an NFA (RE2-style lazy DFA)
+
+    DFA states (epsilon-closed sets of NFA state ids) are only built when a
+    scan reaches them and are kept in an LRU cache of at most max_states
+    states. If a scan keeps rebuilding states (fewer than
+    min_symbols_per_state input symbols per built state once the cache is
+    full) the cache is thrashing, and the rest of that scan falls back to
+    plain NFA simulation from the current state set.
+
+    search and finditer make one backward pass with a lazy DFA of the
+    reversed NFA to mark where matches start, then scan forward from those
+    positions only.
+    """
+
+    def __init__(self, nfa: NFA, max_states: int = 10000,
+                 min_symbols_per_state: int = 10) -> None:
+        if max_states < 1:
+            raise Exception("LazyDFA Error: max_states must be positive.")
+        self.max_states = max_states
+        self.min_symbols_per_state = min_symbols_per_state
+        self.nfa = nfa
+        self._reverse = None  # see _match_starts
+
+        # NFA with integer state ids
+        states = list(nfa.sc)
+        index = {state: i for i, state in enumerate(states)}
+        closures = nfa.epsilon_closures()
+        self.closure = [frozenset(index[s] for s in closures.closure(state))
+                        for state in states]
+        self.moves = []  # moves[i][label] -> successor ids of state i
+        self.ranges = []  # ranges[i] -> [(CharSet, successor ids)]
+        for state in states:
+            moves, ranges = {}, []
+            for label, transitions in state.transitions.tbl.items():
+                targets = [index[t.to_state] for t in transitions
+                           if not t.epsilon]
+                if not targets:
+                    continue
+                if isinstance(label, CharSet):
+                    ranges.append((label, targets))
+                else:
+                    moves[label] = targets
+            self.moves.append(moves)
+            self.ranges.append(ranges)
+        self.nfa_accepting = frozenset(index[s] for s in nfa.sc.accepting)
+        self.start = self.closure[index[nfa.start]]
+
+        # cache: DFA state -> (accepting, {label: next DFA state})
+        self.cache = OrderedDict()
+        self.stats = {'states_built': 0, 'evictions': 0, 'fallbacks': 0}
+
+    # -- determinization --------------------------------------------------- #
+    def _step_set(self, nfa_set: FrozenSet[int], c: str) -> FrozenSet[int]:
+        """ ec(move(nfa_set, c)) """
+        res = set()
+        closure, moves, ranges = self.closure, self.moves, self.ranges
+        for i in nfa_set:
+            for t in moves[i].get(c, ()):
+                res.update(closure[t])
+            for chars, targets in ranges[i]:
+                if c in chars:
+                    for t in targets:
+                        res.update(closure[t])
+        return frozenset(res)
+
+    def _entry(self, key: FrozenSet[int]):
+        entry = self.cache.get(key)
+        if entry is None:
+            entry = (not self.nfa_accepting.isdisjoint(key), {})
+            self.cache[key] = entry
+            self.stats['states_built'] += 1
+            if len(self.cache) > self.max_states:
+                self.cache.popitem(last=False)
+                self.stats['evictions'] += 1
+        else:
+            self.cache.move_to_end(key)
+        return entry
+
+    def clear_cache(self) -> None:
+        self.cache.clear()
+        if self._reverse is not None:
+            self._reverse.clear_cache()
+
+    # -- scanning ---------------------------------------------------------- #
+    @staticmethod
+    def _symbols(text: Text) -> Union[str, List[str]]:
+        if isinstance(text, str):
+            return text
+        return [chr(b) for b in bytes(text)]
+
+    def _longest(self, symbols, pos: int) -> int:
+        """ End of the longest match starting at pos, or -1 """
+        key = self.start
+        accepting, trans = self._entry(key)
+        last = pos if accepting else -1
+        built = self.stats['states_built']
+        for i in range(pos, len(symbols)):
+            c = symbols[i]
+            next_key = trans.get(c)
+            if next_key is None:
+                next_key = self._step_set(key, c)
+                trans[c] = next_key
+            if not next_key:
+                return last
+            key = next_key
+            accepting, trans = self._entry(key)
+            if accepting:
+                last = i + 1
+
+            # thrashing: states are rebuilt faster than input is consumed
+            new_states = self.stats['states_built'] - built
+            if new_states > self.max_states and \
+                    (i + 1 - pos) < new_states * self.min_symbols_per_state:
+                self.stats['fallbacks'] += 1
+                return self._simulate(symbols, i + 1, key, last)
+        return last
+
+    def _simulate(self, symbols, pos: int, nfa_set: FrozenSet[int],
+                  last: int) -> int:
+        """ NFA simulation without caching, continuing from nfa_set """
+        for i in range(pos, len(symbols)):
+            nfa_set = self._step_set(nfa_set, symbols[i])
+            if not nfa_set:
+                break
+            if not self.nfa_accepting.isdisjoint(nfa_set):
+                last = i + 1
+        return last
+
+    def _match_starts(self, symbols, pos: int) -> bytearray:
+        """ starts[i] is 1 iff a match starts at pos + i
+
+        One backward pass of a LazyDFA of the reversed NFA whose start
+        state loops on every symbol, so after reading symbols[i:] backwards
+        it accepts iff a match starts at i. Built on first use.
+        """
+        if self._reverse is None:
+            nfa = self.nfa.reverse()
+            nfa.start.add_transition(nfa.start,
+                                     CharSet([(0, MAX_CODEPOINT)]))
+            self._reverse = LazyDFA(nfa, self.max_states,
+                                    self.min_symbols_per_state)
+        if pos > len(symbols):
+            return bytearray()
+        reverse = self._reverse
+        key = reverse.start
+        accepting, trans = reverse._entry(key)
+        starts = bytearray(len(symbols) - pos + 1)
+        starts[-1] = accepting
+        for i in range(len(symbols) - 1, pos - 1, -1):
+            c = symbols[i]
+            next_key = trans.get(c)
+            if next_key is None:
+                next_key = reverse._step_set(key, c)
+                trans[c] = next_key
+            key = next_key
+            accepting, trans = reverse._entry(key)
+            starts[i - pos] = accepting
+        return starts
+
+    # -- public API -------------------------------------------------------- #
+    def fullmatch(self, text: Text) -> bool:
+        """ Does the NFA accept the whole input? """
+        symbols = self._symbols(text)
+        return self._longest(symbols, 0) == len(symbols)
+
+    def match(self, text: Text, pos: int = 0) -> Optional[Tuple[int, int]]:
+        """ Longest match starting at pos as (start, end) span """
+        end = self._longest(self._symbols(text), pos)
+        return (pos, end) if end >= 0 else None
+
+    def search(self, text: Text, pos: int = 0) -> Optional[Tuple[int, int]]:
+        """ Leftmost-longest match at or after pos as (start, end) span """
+        symbols = self._symbols(text)
+        start = self._match_starts(symbols, pos).find(1)
+        if start < 0:
+            return None
+        return (pos + start, self._longest(symbols, pos + start))
+
+    def finditer(self, text: Text, pos: int = 0) -> Iterator[Tuple[int, int]]:
+        """ All non-overlapping leftmost-longest matches as spans """
+        symbols = self._symbols(text)
+        starts = self._match_starts(symbols, pos)
+        start = starts.find(1)
+        while start >= 0:
+            end = self._longest(symbols, pos + start)
+            yield (pos + start, end)
+            end -= pos
+            start = starts.find(1, end if end > start else end + 1)
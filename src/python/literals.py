@@ -0,0 +1,258 @@
+import mmap
+from typing import Callable, Iterable, List, Optional, Union
+from src.python.states import State
+from src.python.finite_automaton import FiniteAutomaton, DFA
+
+# Literal analysis for prefiltered scanning
+#
+# literal_prefixes: a small set of literals one of which every accepted
+#     string starts with, so matches can only start where one occurs.
+# required_substring: a literal every accepted string contains. States
+#     that dominate acceptance (every path from the start to an accepting
+#     state passes them) with a single incoming edge on one character are
+#     passed together with that edge, so chains of them spell a literal.
+#
+# Prefilter finds the literals with str/bytes find (C speed), so a scan
+# only runs the DFA at candidate positions.
+
+PREFIX_LIMIT = 8  # most literals (and characters of a CharSet) followed
+PREFIX_LENGTH = 16
+
+
+def _chars(label, limit: int) -> Optional[List[str]]:
+    """ Characters of a label, None for more than limit """
+    if isinstance(label, str):
+        return [label]
+    if len(label) > limit:
+        return None
+    return list(label)
+
+
+def literal_prefixes(fa: FiniteAutomaton, limit: int = PREFIX_LIMIT,
+                     length: int = PREFIX_LENGTH) -> List[str]:
+    """ Non-empty literals one of which every accepted string starts with,
+    at most limit of them. [] if there is no such set (e.g. the empty
+    string is accepted). Works on NFA (epsilon-closures) and DFA. """
+    paths = [('', frozenset(fa.ec([fa.start])))] \
+        if fa.start is not None else []
+    done = []  # literals that cannot be extended
+    best = None  # fewest literals of a level, the later one on ties
+    while paths:
+        level = done + [literal for literal, _ in paths]
+        if '' not in level and (best is None or len(level) <= len(best)):
+            best = level
+        extended = []
+        for literal, states in paths:
+            if len(literal) == length or any(s.acc for s in states):
+                done.append(literal)
+                continue
+            targets = {}  # character -> next states
+            for state in states:
+                for label, transitions in state.transitions.tbl.items():
+                    for t in transitions:
+                        if t.epsilon:
+                            continue
+                        chars = _chars(label, limit)
+                        if chars is None:
+                            targets = None
+                            break
+                        for c in chars:
+                            targets.setdefault(c, set()).add(t.to_state)
+                    if targets is None:
+                        break
+                if targets is None:
+                    break
+            if targets is None:
+                done.append(literal)  # a wide label follows
+            else:
+                # no targets: no accepted string goes this way
+                extended.extend((literal + c, frozenset(fa.ec(next_states)))
+                                for c, next_states in targets.items())
+        if len(done) + len(extended) > limit:
+            done = best
+            break
+        paths = extended
+    if not done or '' in done:
+        return []
+    # a literal with another one as prefix adds no candidates
+    return [literal for literal in sorted(done)
+            if not any(literal != other and literal.startswith(other)
+                       for other in done)]
+
+
+def _successors(state: State) -> List[State]:
+    return [next(iter(transitions)).to_state
+            for transitions in state.transitions.tbl.values()]
+
+
+def _dominators(dfa: DFA, final: State) -> dict:
+    """ Immediate dominators of the states reachable from the start, final
+    being a node after every accepting state (Cooper, Harvey, Kennedy) """
+    # reverse postorder, iterative
+    order, seen = [], {dfa.start}
+    stack = [(dfa.start, iter(_successors(dfa.start)))]
+    while stack:
+        state, targets = stack[-1]
+        for t in targets:
+            if t not in seen:
+                seen.add(t)
+                stack.append((t, iter(_successors(t))))
+                break
+        else:
+            stack.pop()
+            order.append(state)
+    order.reverse()
+    order.append(final)
+    number = {state: i for i, state in enumerate(order)}
+
+    preds = {state: [] for state in order}
+    for state in order[:-1]:
+        for t in _successors(state):
+            preds[t].append(state)
+        if state.acc:
+            preds[final].append(state)
+
+    idom = {dfa.start: dfa.start}
+
+    def intersect(a: State, b: State) -> State:
+        while a is not b:
+            while number[a] > number[b]:
+                a = idom[a]
+            while number[b] > number[a]:
+                b = idom[b]
+        return a
+
+    changed = True
+    while changed:
+        changed = False
+        for state in order[1:]:
+            new = None
+            for p in preds[state]:
+                if p in idom:
+                    new = p if new is None else intersect(p, new)
+            if new is not None and idom.get(state) is not new:
+                idom[state] = new
+                changed = True
+    return idom
+
+
+def required_substring(dfa: DFA) -> str:
+    """ Longest literal (found this way) every accepted string contains,
+    '' if there is none """
+    if dfa.start is None or not dfa.sc.accepting:
+        return ''
+    final = State('')
+    idom = _dominators(dfa, final)
+    if final not in idom:
+        return ''
+
+    incoming = {}  # state -> [(source, label)]
+    for state in idom:
+        if state is not final:
+            for label, transitions in state.transitions.tbl.items():
+                for t in transitions:
+                    incoming.setdefault(t.to_state, []).append(
+                        (state, label))
+
+    best = ''
+    state = idom[final]
+    while True:
+        # the literal of single-character edges that ends in state. Loops
+        # on state itself come after its first arrival, on other states
+        # they would split the literal.
+        literal, x = '', state
+        edges = [e for e in incoming.get(state, ()) if e[0] is not state]
+        while x is not dfa.start and len(edges) == 1:
+            source, label = edges[0]
+            chars = _chars(label, 1)
+            if chars is None:
+                break
+            literal = chars[0] + literal
+            x = source
+            edges = incoming.get(x, ())
+        if len(literal) > len(best):
+            best = literal
+        if state is dfa.start:
+            return best
+        state = idom[state]
+
+
+# -- prefilter ------------------------------------------------------------- #
+class Prefilter:
+    """ Candidate match starts of a DFA from its literals
+
+    Args:
+        prefixes (List[str]): Every match starts with one of them
+        required (str): Every match contains it ('' for none)
+    """
+
+    def __init__(self, prefixes: List[str], required: str = '') -> None:
+        self.prefixes = prefixes
+        self.required = required
+
+    @classmethod
+    def of(cls, dfa: DFA) -> Optional['Prefilter']:
+        """ Prefilter of a DFA, None if it has no literals """
+        prefixes = literal_prefixes(dfa)
+        if len(prefixes) > 1 and all(len(p) == 1 for p in prefixes):
+            prefixes = []  # several characters: little to skip
+        required = required_substring(dfa)
+        if not prefixes and not required:
+            return None
+        return cls(prefixes, required)
+
+    @staticmethod
+    def _encode(literals: Iterable[str], text) -> List:
+        """ literals in the type of text, bytes as codepoints below 256 """
+        if isinstance(text, str):
+            return list(literals)
+        res = []
+        for literal in literals:
+            try:
+                res.append(literal.encode('latin-1'))
+            except UnicodeEncodeError:
+                pass  # cannot occur in bytes
+        return res
+
+    def finder(self, text: Union[str, bytes, bytearray, memoryview,
+                                 mmap.mmap],
+               pos: int = 0) -> Optional[Callable[[int], int]]:
+        """ find(p): the first candidate start at or after p, -1 if there
+        is none. None if text[pos:] has no match at all. Without prefixes
+        every position is a candidate. """
+        haystack = bytes(text) if isinstance(text, memoryview) else text
+        if self.required:
+            required = self._encode([self.required], text)
+            if not required or haystack.find(required[0], pos) < 0:
+                return None
+        if not self.prefixes:
+            return lambda p: p if p <= len(text) else -1
+
+        literals = self._encode(self.prefixes, text)
+        if not literals:
+            return None
+        return nearest(literals, haystack)
+
+
+def nearest(literals: List, haystack) -> Callable[[int], int]:
+    """ find(p): the first occurrence of one of the literals at or after p,
+    -1 if there is none. One find per literal, each repeated only once p
+    is past its last result, so increasing p costs O(len(haystack)) in
+    all. """
+    if len(literals) == 1:
+        literal = literals[0]
+        return lambda p: haystack.find(literal, p)
+
+    found = [-1] * len(literals)  # next occurrence of each literal
+
+    def find(p: int) -> int:
+        best = -1
+        for i, literal in enumerate(literals):
+            if found[i] is not None and found[i] < p:
+                found[i] = haystack.find(literal, p)
+                if found[i] < 0:
+                    found[i] = None  # no more occurrences
+            if found[i] is not None and (best < 0 or found[i] < best):
+                best = found[i]
+        return best
+    return find
@@ -0,0 +1,669 @@
+import mmap
+from bisect import bisect_right
+from collections import deque
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple, Union
+from src.python.charset import CharSet, MAX_CODEPOINT, label_intervals, \
+    split_intervals
+from src.python.compact import CompactDFA, UNDEFINED
+from src.python.states import StateCollection, State
+from src.python.finite_automaton import DFA
+from src.python.literals import Prefilter, nearest
+
+NO_CLASS = 255  # byte class of bytes outside the alphabet (translate path)
+PREFILTER_MISSES = 16  # failed literal scans, then finditer goes two-phase
+MAX_ESCAPES = 3  # most symbols that leave an accelerated state
+MIN_BLOCK, MAX_BLOCK = 64, 1 << 14  # symbols classified at once (scans)
+MAX_DERIVED = 4096  # most states of the DFAs built for prefilter, reverse
+
+Text = Union[str, bytes, bytearray, memoryview]
+Buffer = Union[bytes, bytearray, memoryview, mmap.mmap]
+Source = Union[Buffer, BinaryIO, Iterable[Buffer]]
+
+
+def chunks_of(source: Source, chunk_size: int = 1 << 16) \
+        -> Iterator[memoryview]:
+    """ Chunks of a buffer (incl. mmap), binary file or iterable of chunks
+
+    Buffers are cut into memoryview slices, which do not copy the data.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        view = memoryview(source)
+        for i in range(0, len(view), chunk_size):
+            yield view[i:i + chunk_size]
+    elif hasattr(source, 'read'):
+        for chunk in iter(lambda: source.read(chunk_size), b''):
+            yield memoryview(chunk)
+    else:
+        for chunk in source:
+            yield memoryview(chunk)
+
+
+class ChunkWindow:
+    """ The chunks of a stream from the current search start on
+
+    Chunks before the search start, or before a position a scan has
+    released, are dropped, so only the chunks that a pending match may
+    still span are kept (as references, not copies).
+    """
+
+    def __init__(self, chunks: Iterator[memoryview]) -> None:
+        self.chunks = chunks
+        self.views = deque()  # (offset, chunk)
+        self.end = 0  # offset after the last chunk read
+        self.eof = False
+
+    def _read(self) -> bool:
+        for view in self.chunks:
+            if len(view):
+                self.views.append((self.end, view))
+                self.end += len(view)
+                return True
+        self.eof = True
+        return False
+
+    def release(self, pos: int) -> None:
+        """ Drop the chunks that end at or before pos """
+        views = self.views
+        while views and views[0][0] + len(views[0][1]) <= pos:
+            views.popleft()
+
+    def _view_at(self, pos: int) -> Optional[memoryview]:
+        """ The stream from pos to the end of its chunk, None at the end """
+        for offset, view in self.views:
+            if offset + len(view) > pos:
+                return view[max(pos - offset, 0):]
+        while not self.eof and self._read():
+            offset, view = self.views[-1]
+            if offset + len(view) > pos:
+                return view[max(pos - offset, 0):]
+        return None
+
+    def views_from(self, pos: int) -> Iterator[memoryview]:
+        """ The stream from pos on as memoryview slices """
+        self.release(pos)
+        while True:
+            view = self._view_at(pos)
+            if view is None:
+                return
+            yield view
+            pos += len(view)
+
+
+class Escapes(dict):
+    """ Accelerated states: state -> the symbols that leave it (at most
+    MAX_ESCAPES of them, a self-loop on all others), None for other states
+
+    Filled on first lookup of a state, so only the rows of visited states
+    are read (MappedDFA). Symbols are characters for str input, one-byte
+    bytes for bytes input.
+    """
+
+    def __init__(self, matcher: 'CompiledDFA', chars: bool) -> None:
+        super().__init__()
+        self.matcher = matcher
+        self.chars = chars
+        # symbols outside all classes leave every state
+        if chars:
+            self.outside = MAX_CODEPOINT + 1 - sum(
+                hi - lo + 1 for lo, hi, _ in matcher.intervals)
+        else:
+            self.outside = matcher.byte_class.count(UNDEFINED)
+        self._any = None
+        self._rows = None
+
+    def any(self) -> bool:
+        """ Is any state accelerated? (all states looked up once) """
+        if self._any is None:
+            self._any = self.outside <= MAX_ESCAPES and any(
+                self[s] is not None
+                for s in range(len(self.matcher.accepting)))
+        return self._any
+
+    def rows(self) -> List[List[int]]:
+        """ The rows of the matcher with -2 - t for a transition to an
+        accelerated state t, so scans notice entering one in the check
+        for UNDEFINED they make anyway """
+        if self._rows is None:
+            rows = self.matcher.rows
+            self._rows = [[-2 - t if t != UNDEFINED and self[t] is not None
+                           else t for t in rows[s]]
+                          for s in range(len(self.matcher.accepting))]
+        return self._rows
+
+    def __missing__(self, s: int) -> Optional[list]:
+        row, m = self.matcher.rows[s], self.matcher
+        if self.outside > MAX_ESCAPES:
+            escapes = None
+        elif self.chars:
+            escapes, code = [], 0  # code: first codepoint not yet looked at
+            for lo, hi, c in m.intervals + [(MAX_CODEPOINT + 1, 0, None)]:
+                if c is not None and row[c] != s:
+                    continue  # the interval is part of an escape gap
+                if lo - code > MAX_ESCAPES - len(escapes):
+                    escapes = None
+                    break
+                escapes.extend(chr(e) for e in range(code, lo))
+                code = hi + 1
+        else:
+            escapes = [bytes([b]) for b, c in enumerate(m.byte_class)
+                       if c == UNDEFINED or row[c] != s]
+            if len(escapes) > MAX_ESCAPES:
+                escapes = None
+        self[s] = escapes
+        return escapes
+
+
+class CompiledDFA:
+    """ DFA compiled to a flat transition table for matching
+
+    Single-character and CharSet labels are the input symbols. States that
+    cannot reach an accepting state are pruned to UNDEFINED, so scanning
+    stops as soon as no match is possible anymore. Matches are
+    leftmost-longest.
+
+    Args:
+        dfa (DFA | CompactDFA): The automaton
+        accelerate (bool): Skip runs of self-loops with find in states
+            that few symbols leave (see Escapes)
+    """
+    accelerate = True  # default for subclasses (MappedDFA)
+    max_derived = MAX_DERIVED  # see _prefilter_of and _reverse_matcher
+
+    def __init__(self, dfa: Union[DFA, CompactDFA],
+                 accelerate: bool = True) -> None:
+        if isinstance(dfa, DFA) and dfa.start is None:
+            # empty language: a single dead row
+            dead = State("dead")
+            dfa = DFA(list(dfa.alphabet), dead, StateCollection([dead]))
+        compact = dfa if isinstance(dfa, CompactDFA) \
+            else CompactDFA.from_dfa(dfa)
+        self.compact = compact
+        self.accelerate = accelerate
+        k = compact.num_labels
+        n = compact.num_states
+
+        #######################################################################
+        # live states: accepting states and states with a path to one
+        # (backward search over the transition table)
+        #######################################################################
+        preds = [[] for _ in range(n)]
+        for s in range(n):
+            for c in range(k):
+                t = compact.table[s * k + c]
+                if t != UNDEFINED:
+                    preds[t].append(s)
+        live = bytearray(compact.accepting)
+        stack = [s for s in range(n) if live[s]]
+        while stack:
+            for p in preds[stack.pop()]:
+                if not live[p]:
+                    live[p] = 1
+                    stack.append(p)
+
+        table = [t if t != UNDEFINED and live[t] else UNDEFINED
+                 for t in compact.table]
+
+        #######################################################################
+        # alphabet classes: labels are split into elementary codepoint
+        # intervals ([a-z] next to 'x' gives [a-w], x and [y-z]). Intervals
+        # with identical columns in the table are one symbol class.
+        # Intervals that never lead to a live state get no class at all, so
+        # scanning stops on them right away.
+        #######################################################################
+        pieces = split_intervals(
+            (lo, hi, c) for c, label in enumerate(compact.labels)
+            for lo, hi in label_intervals(label))
+        columns = {}  # column -> class id
+        piece_class = []
+        for _, _, label_ids in pieces:
+            if len(label_ids) == 1:
+                c, = label_ids
+                column = tuple(table[c::k])
+            else:
+                # overlapping labels: a DFA state has at most one of them
+                label_ids = sorted(label_ids)
+                column = tuple(next((table[s * k + c] for c in label_ids
+                                     if table[s * k + c] != UNDEFINED),
+                                    UNDEFINED) for s in range(n))
+            if all(t == UNDEFINED for t in column):
+                piece_class.append(UNDEFINED)
+            else:
+                piece_class.append(columns.setdefault(column, len(columns)))
+        self.num_classes = len(columns)
+
+        # one row per state: rows[s][class] is the target state or UNDEFINED
+        self.rows = [list(row) for row in zip(*columns)] if columns \
+            else [[] for _ in range(n)]
+        self.accepting = [bool(a) for a in compact.accepting]
+        self.start = compact.start if live[compact.start] else UNDEFINED
+
+        # disjoint (lo, hi, class id) codepoint intervals of all classes
+        self.intervals = [(lo, hi, c) for (lo, hi, _), c
+                          in zip(pieces, piece_class) if c != UNDEFINED]
+        self._index_classes()
+
+    def _index_classes(self) -> None:
+        """ Lookup tables for the class of an input symbol (intervals) """
+        # symbol -> class id, for str input. Only the first 256 characters
+        # of an interval are listed, the rest of wide intervals is found by
+        # binary search.
+        self.char_class = {}
+        self.wide_starts, self.wide_ends, self.wide_class = [], [], []
+        for lo, hi, c in self.intervals:
+            for code in range(lo, min(hi, lo + 255) + 1):
+                self.char_class[chr(code)] = c
+            if hi - lo >= 256:
+                self.wide_starts.append(lo)
+                self.wide_ends.append(hi)
+                self.wide_class.append(c)
+
+        #######################################################################
+        # bytes fast path: a 256-entry class table. With fewer than 255
+        # classes bytes.translate maps a whole buffer to class ids in C.
+        #######################################################################
+        self.byte_class = [UNDEFINED] * 256
+        for label, c in self.char_class.items():
+            if ord(label) < 256:
+                self.byte_class[ord(label)] = c
+        if self.num_classes < NO_CLASS:
+            self.byte_translate = bytes(NO_CLASS if c == UNDEFINED else c
+                                        for c in self.byte_class)
+        else:
+            self.byte_translate = None
+        self.escapes = {str: Escapes(self, True), bytes: Escapes(self, False)}
+
+    # -- symbol classes ---------------------------------------------------- #
+    def _classes(self, text: Text, pos: int, endpos: int) -> List[int]:
+        """ Class ids of text[pos:endpos], UNDEFINED for unknown symbols """
+        if isinstance(text, str):
+            if self.wide_starts:
+                char_class, wide = self.char_class, self._wide_class
+                return [char_class[ch] if ch in char_class else wide(ch)
+                        for ch in text[pos:endpos]]
+            get = self.char_class.get
+            return [get(ch, UNDEFINED) for ch in text[pos:endpos]]
+        if self.byte_translate is not None:
+            return [UNDEFINED if c == NO_CLASS else c for c in
+                    bytes(text[pos:endpos]).translate(self.byte_translate)]
+        byte_class = self.byte_class
+        return [byte_class[b] for b in bytes(text[pos:endpos])]
+
+    def _wide_class(self, ch: str) -> int:
+        code = ord(ch)
+        i = bisect_right(self.wide_starts, code) - 1
+        if i >= 0 and code <= self.wide_ends[i]:
+            return self.wide_class[i]
+        return UNDEFINED
+
+    def _longest(self, classes: List[int], pos: int) -> int:
+        """ End of the longest match starting at pos, or -1 """
+        s = self.start
+        if s == UNDEFINED:
+            return -1
+        rows, accepting = self.rows, self.accepting
+        last = pos if accepting[s] else -1
+        for i in range(pos, len(classes)):
+            c = classes[i]
+            if c == UNDEFINED:
+                break
+            s = rows[s][c]
+            if s == UNDEFINED:
+                break
+            if accepting[s]:
+                last = i + 1
+        return last
+
+    # -- two-phase finditer ------------------------------------------------ #
+    _reverse = False  # see _reverse_matcher (None: over max_derived)
+    _reset_rows = None  # see _match_starts
+    _prefilter = False  # see _prefilter_of (None: no literals)
+
+    def _to_dfa(self) -> DFA:
+        """ DFA of the class table, one CharSet label per class. Works
+        without State objects to start from (MappedDFA) too. """
+        intervals_of = {}  # class id -> intervals
+        for lo, hi, c in self.intervals:
+            intervals_of.setdefault(c, []).append((lo, hi))
+        labels = {c: CharSet(i) for c, i in intervals_of.items()}
+        states = [State(str(s), acc=acc)
+                  for s, acc in enumerate(self.accepting)]
+        for s, state in enumerate(states):
+            for c, t in enumerate(self.rows[s]):
+                if t != UNDEFINED:
+                    state.add_transition(states[t], labels[c])
+        # single characters become plain labels in to_DFA
+        alphabet = [chr(lo) for lo, hi, _ in self.intervals if lo == hi]
+        return DFA(alphabet, states[self.start], StateCollection(states))
+
+    def _reverse_matcher(self) -> 'CompiledDFA':
+        """ Matcher that, reading text[i:] backwards, accepts iff a match
+        starts at i
+
+        The reverse of the DFA (FiniteAutomaton.reverse) with a loop on
+        every symbol at its start state, determinized and minimized. Built
+        on first use. Reversal can blow up the number of states: None if
+        the DFA or its reverse has more than max_derived states.
+        """
+        if self._reverse is False:
+            self._reverse = None
+            if len(self.accepting) <= self.max_derived:
+                nfa = self._to_dfa().reverse()
+                nfa.start.add_transition(nfa.start, CharSet(
+                    (lo, hi) for lo, hi, _ in self.intervals))
+                dfa = nfa.to_DFA(verbose=False, max_states=self.max_derived)
+                if dfa is not None:
+                    self._reverse = CompiledDFA(dfa.minimize(verbose=False))
+        return self._reverse
+
+    def _prefilter_of(self) -> Optional[Prefilter]:
+        """ Prefilter of the literals of the DFA (see literals.py), built
+        on first use. On the minimized DFA: equivalent states would split
+        the edges a literal is read from. None for DFAs with more than
+        max_derived states, which are not turned into State objects. """
+        if self._prefilter is False:
+            self._prefilter = None
+            if len(self.accepting) <= self.max_derived:
+                self._prefilter = Prefilter.of(
+                    self._to_dfa().minimize(verbose=False))
+        return self._prefilter
+
+    def _escapes_for(self, text: Text) -> Optional[Escapes]:
+        """ Escapes table for the type of text, None without acceleration
+        (off, no accelerated states, or a memoryview, which has no find) """
+        if not self.accelerate or isinstance(text, memoryview):
+            return None
+        escapes = self.escapes[str if isinstance(text, str) else bytes]
+        return escapes if escapes.any() else None
+
+    def _longest_text(self, text: Text, pos: int) -> int:
+        """ _longest on the text itself, for scans at a few positions
+
+        Class ids are computed in blocks (_classes) that start small and
+        grow, so a short scan does not classify the whole text. With
+        accelerate, entering an accelerated state jumps to the next of its
+        escape symbols (find), and the next block starts there.
+        """
+        s = self.start
+        if s == UNDEFINED:
+            return -1
+        escapes = self._escapes_for(text)
+        rows = self.rows if escapes is None else escapes.rows()
+        accepting = self.accepting
+        finders = {}  # accelerated state -> find of its escapes in text
+        n = len(text)
+
+        def skip(s: int, i: int) -> int:
+            """ Position of the next escape symbol of s at or after i """
+            find = finders.get(s)
+            if find is None:
+                find = finders[s] = nearest(escapes[s], text)
+            j = find(i)
+            return n if j < 0 else j
+
+        last = pos if accepting[s] else -1
+        i, size = pos, MIN_BLOCK
+        if escapes is not None and escapes[s] is not None and i < n:
+            i = skip(s, i)
+            if accepting[s]:
+                last = i
+        while i < n:
+            start = i
+            for i, c in enumerate(self._classes(text, i, i + size),
+                                  start + 1):
+                if c == UNDEFINED:
+                    return last
+                t = rows[s][c]
+                if t < 0:
+                    if t == UNDEFINED:
+                        return last
+                    s = -2 - t  # entered an accelerated state
+                    if accepting[s]:
+                        last = i
+                    j = skip(s, i)
+                    if j > i:
+                        i, size = j, MIN_BLOCK
+                        if accepting[s]:
+                            last = i
+                        break
+                    continue
+                if accepting[t]:
+                    last = i
+                s = t
+            else:
+                size = min(2 * size, MAX_BLOCK)
+        return last
+
+    def _match_starts(self, reverse: 'CompiledDFA', text: Text,
+                      pos: int) -> bytearray:
+        """ starts[i] is 1 iff a match starts at pos + i (backward pass
+        with the reverse matcher) """
+        start = reverse.start
+        if reverse._reset_rows is None:
+            # a symbol no match contains leaves only the loop: back to
+            # start, also for UNDEFINED (-1, the extra last column)
+            reverse._reset_rows = [[start if t == UNDEFINED else t
+                                    for t in row] + [start]
+                                   for row in reverse.rows]
+        rows = reverse._reset_rows
+        s = start
+        states = [s]
+        append = states.append
+        for c in reversed(reverse._classes(text, pos, len(text))):
+            s = rows[s][c]
+            append(s)
+        states.reverse()
+        return bytearray(map(reverse.accepting.__getitem__, states))
+
+    def _leftmost(self, classes: List[int],
+                  pos: int) -> Optional[Tuple[int, int]]:
+        """ Leftmost-longest match in classes at or after pos in one
+        forward pass (threads as in _search_stream) """
+        rows, accepting = self.rows, self.accepting
+        start = self.start
+        threads = {}  # DFA state -> leftmost start
+        best = None
+        for p in range(pos, len(classes)):
+            if best is None and start not in threads:
+                threads[start] = p
+                if accepting[start]:
+                    best = (p, p)
+            c = classes[p]
+            moved = {}
+            if c != UNDEFINED:
+                for s, st in threads.items():
+                    t = rows[s][c]
+                    if t != UNDEFINED and st < moved.get(t, p + 1):
+                        moved[t] = st
+            for t, st in moved.items():
+                if accepting[t] and (best is None or st <= best[0]):
+                    best = (st, p + 1)
+            if best is not None:
+                moved = {t: st for t, st in moved.items() if st <= best[0]}
+                if not moved:
+                    return best
+            threads = moved
+        # empty match at the end
+        if best is None and accepting[start]:
+            return (len(classes), len(classes))
+        return best
+
+    def _search_stream(self, window: ChunkWindow,
+                       pos: int) -> Optional[Tuple[int, int]]:
+        """ Leftmost-longest match at or after pos in one forward pass
+
+        All candidate starts run at once: threads maps each DFA state to
+        the leftmost start that reached it (later starts in the same state
+        can only match where that one does). The search ends as soon as no
+        thread can still produce a more leftmost or longer match.
+        """
+        rows, accepting, byte_class = self.rows, self.accepting, \
+            self.byte_class
+        start = self.start
+        threads = {}  # DFA state -> leftmost start
+        best = None
+        p = pos
+        for view in window.views_from(pos):
+            for b in view:
+                if best is None and start not in threads:
+                    threads[start] = p
+                    if accepting[start]:
+                        best = (p, p)
+                c = byte_class[b]
+                moved = {}
+                if c != UNDEFINED:
+                    for s, st in threads.items():
+                        t = rows[s][c]
+                        if t != UNDEFINED and st < moved.get(t, p + 1):
+                            moved[t] = st
+                p += 1
+                for t, st in moved.items():
+                    # more leftmost, or the same start and longer
+                    if accepting[t] and (best is None or st <= best[0]):
+                        best = (st, p)
+                if best is not None:
+                    moved = {t: st for t, st in moved.items()
+                             if st <= best[0]}
+                    if not moved:
+                        return best
+                threads = moved
+            # the next search starts at the end of the match, which is not
+            # before p unless best has been found already (spans only, the
+            # data before is not needed)
+            window.release(p if best is None else best[1])
+        # empty match at the end of the stream
+        if best is None and p <= window.end and start not in threads \
+                and accepting[start]:
+            return (p, p)
+        return best
+
+    # -- public API -------------------------------------------------------- #
+    def fullmatch(self, text: Text) -> bool:
+        """ Does the DFA accept the whole input? """
+        if self._escapes_for(text) is not None:
+            return self._longest_text(text, 0) == len(text)
+        return self._longest(self._classes(text, 0, len(text)), 0) \
+            == len(text)
+
+    def match(self, text: Text, pos: int = 0) -> Optional[Tuple[int, int]]:
+        """ Longest match starting at pos as (start, end) span """
+        if self._escapes_for(text) is not None:
+            end = self._longest_text(text, pos)
+            return (pos, end) if end >= 0 else None
+        end = self._longest(self._classes(text, pos, len(text)), 0)
+        return (pos, pos + end) if end >= 0 else None
+
+    def search(self, text: Text, pos: int = 0) -> Optional[Tuple[int, int]]:
+        """ Leftmost-longest match at or after pos as (start, end) span """
+        if self.start == UNDEFINED:
+            return None
+        prefilter = self._prefilter_of()
+        if prefilter is not None:
+            find = prefilter.finder(text, pos)
+            start = find(pos) if find is not None else -1
+            misses = 0  # failed scans, then one pass (as in finditer)
+            while start >= 0:
+                end = self._longest_text(text, start)
+                if end >= 0:
+                    return (start, end)
+                misses += 1
+                if misses > PREFILTER_MISSES:
+                    pos = start
+                    break
+                start = find(start + 1)
+            else:
+                return None
+        span = self._leftmost(self._classes(text, pos, len(text)), 0)
+        return (pos + span[0], pos + span[1]) if span is not None else None
+
+    def finditer(self, text: Text, pos: int = 0) -> Iterator[Tuple[int, int]]:
+        """ All non-overlapping leftmost-longest matches as spans
+
+        With literals (see literals.py) only the positions where one occurs
+        are scanned, found with str/bytes find. Otherwise, or once too many
+        of those scans fail, two phases: a backward pass with the reverse
+        DFA marks where matches start, then a forward scan from each start
+        finds its end, so positions where no match starts are skipped
+        without scanning. The backward pass is only made from the first
+        such position on; until then the forward scans alone find the
+        matches. If the reverse DFA gets too large, one-pass searches
+        (_leftmost) take over instead.
+        """
+        if self.start == UNDEFINED:
+            return
+        prefilter = self._prefilter_of()
+        if prefilter is None:
+            yield from self._finditer_classes(text, pos)
+            return
+        find = prefilter.finder(text, pos)
+        if find is None:
+            return
+        misses = 0  # failed scans, each may run to the end of the text
+        start = find(pos)
+        while start >= 0:
+            end = self._longest_text(text, start)
+            if end < 0:
+                misses += 1
+                if misses > PREFILTER_MISSES:
+                    yield from self._finditer_classes(text, start)
+                    return
+                start = find(start + 1)
+                continue
+            yield (start, end)
+            start = find(end if end > start else end + 1)
+
+    def _finditer_classes(self, text: Text,
+                          pos: int) -> Iterator[Tuple[int, int]]:
+        """ finditer on the class ids of text[pos:] (two phases) """
+        classes = self._classes(text, pos, len(text))
+        starts, base = None, 0  # starts[i]: a match starts at base + i
+        start = 0
+        while start <= len(classes):
+            if starts is not None:
+                start = starts.find(1, start - base)
+                if start < 0:
+                    return
+                start += base
+            end = self._longest(classes, start)
+            if end < 0:
+                if start == len(classes):
+                    return
+                reverse = self._reverse_matcher()
+                if reverse is None:
+                    yield from self._finditer_leftmost(classes, pos, start)
+                    return
+                # only once: with starts every scan starts a match
+                starts, base = self._match_starts(reverse, text,
+                                                  pos + start), start
+                continue
+            yield (pos + start, pos + end)
+            start = end if end > start else end + 1
+
+    def _finditer_leftmost(self, classes: List[int], pos: int,
+                           start: int) -> Iterator[Tuple[int, int]]:
+        """ finditer on class ids with one-pass searches from start """
+        while start <= len(classes):
+            span = self._leftmost(classes, start)
+            if span is None:
+                return
+            yield (pos + span[0], pos + span[1])
+            start = span[1] if span[1] > span[0] else span[1] + 1
+
+    def stream(self, source: Source,
+               chunk_size: int = 1 << 16) -> Iterator[Tuple[int, int]]:
+        """ finditer over a byte stream: chunks, binary file or mmap
+
+        Matches are reported as (start, end) stream offsets while reading.
+        The input is never concatenated; only the chunks a pending match
+        may still span are kept.
+        """
+        if self.start == UNDEFINED:
+            return
+        window = ChunkWindow(chunks_of(source, chunk_size))
+        pos = 0
+        while True:
+            span = self._search_stream(window, pos)
+            if span is None:
+                return
+            yield span
+            start, end = span
+            pos = end if end > start else end + 1
@@ -0,0 +1,90 @@
+from typing import List, Tuple
+
+
+def hopcroft_partition(num_symbols: int,
+                       delta: List[List[int]],
+                       initial: List[int]) -> Tuple[List[int], List[set]]:
+    """ Hopcroft partition refinement, O(n*k*log n)
+
+    Args:
+        num_symbols (int): Size of the alphabet (k)
+        delta (List[List[int]]): Total transition function indexed as
+            delta[symbol][state] -> state
+        initial (List[int]): Initial block id for every state
+
+    Returns:
+        Tuple[List[int], List[set]]: Final block id of every state and the
+        list of (non-empty) blocks indexed by block id
+    """
+    num_states = len(initial)
+
+    ###########################################################################
+    # inverse transition index: inv[c][t] is the list of states s with
+    # delta(s, c) = t. Built once, so a splitter is processed by looking at
+    # its predecessors only.
+    ###########################################################################
+    inv = []
+    for c in range(num_symbols):
+        inv_c = [[] for _ in range(num_states)]
+        for s, t in enumerate(delta[c]):
+            inv_c[t].append(s)
+        inv.append(inv_c)
+
+    # state-to-block array and blocks (renumbered to skip empty ids)
+    renumber = {}
+    block_of = []
+    for b in initial:
+        if b not in renumber:
+            renumber[b] = len(renumber)
+        block_of.append(renumber[b])
+    blocks = [set() for _ in renumber]
+    for s, b in enumerate(block_of):
+        blocks[b].add(s)
+
+    # all initial blocks but the largest are needed as splitters
+    largest = max(range(len(blocks)), key=lambda b: len(blocks[b]),
+                  default=None)
+    work = [b for b in range(len(blocks)) if b != largest]
+    in_work = set(work)
+
+    while work:
+        splitter_id = work.pop()
+        in_work.discard(splitter_id)
+        splitter = list(blocks[splitter_id])  # snapshot, may split below
+
+        for c in range(num_symbols):
+            inv_c = inv[c]
+
+            # states with a c-transition into the splitter, grouped by block
+            touched = {}
+            for t in splitter:
+                for s in inv_c[t]:
+                    b = block_of[s]
+                    try:
+                        touched[b].append(s)
+                    except KeyError:
+                        touched[b] = [s]
+
+            for b, members in touched.items():
+                block = blocks[b]
+                if len(members) == len(block):
+                    continue  # whole block moves into splitter, no split
+
+                # split block b: members move into a new block
+                new_id = len(blocks)
+                new_block = set(members)
+                block.difference_update(new_block)
+                blocks.append(new_block)
+                for s in members:
+                    block_of[s] = new_id
+
+                if b in in_work:
+                    work.append(new_id)
+                    in_work.add(new_id)
+                else:
+                    # only the smaller half has to be used as splitter
+                    smaller = new_id if len(new_block) <= len(block) else b
+                    work.append(smaller)
+                    in_work.add(smaller)
+
+    return block_of, blocks
@@ -0,0 +1,102 @@
+from typing import FrozenSet, Iterator, List, Optional, Set, Tuple, Union
+from src.python.charset import CharSet, MAX_CODEPOINT
+from src.python.states import StateCollection, State
+from src.python.finite_automaton import NFA
+from src.python.compact import CompactDFA, UNDEFINED
+from src.python.matcher import CompiledDFA, Text
+from src.python.regex import compile
+
+# Multi-pattern matching
+#
+# union() combines many NFAs into one: a new start state with epsilon
+# transitions into (renamed copies of) every NFA. The accepting states of
+# NFA i accept pattern id i (State.accept_ids). to_DFA unites the ids of a
+# subset and minimize only merges states that accept the same ids, so the
+# minimal DFA still tells which patterns matched.
+
+ANY = CharSet([(0, MAX_CODEPOINT)])
+
+
+def union(nfas: List[NFA], ids: Optional[List[int]] = None,
+          anchored=True) -> NFA:
+    """ One NFA for many patterns, tagged with pattern ids
+
+    Args:
+        nfas (List[NFA]): The NFAs (not modified)
+        ids (List[int], optional): Pattern id per NFA. Defaults to
+            0..len(nfas)-1.
+        anchored (bool): If False, the start state loops on every
+            character, so matches may start anywhere in the input
+
+    Returns:
+        NFA: NFA whose accepting states have accept_ids
+    """
+    if ids is None:
+        ids = list(range(len(nfas)))
+    if len(ids) != len(nfas):
+        raise Exception("Union Error: need one id per NFA.")
+    start = State("start")
+    states = [start]
+    alphabet = {}  # ordered set
+    for i, (nfa, pattern_id) in enumerate(zip(nfas, ids)):
+        alphabet.update(dict.fromkeys(nfa.alphabet))
+        copies = {state: State(f"{i}.{state.name}", acc=state.acc,
+                               accept_ids=[pattern_id] if state.acc else ())
+                  for state in nfa.sc}
+        for state, copy in copies.items():
+            for label, transitions in state.transitions.tbl.items():
+                for t in transitions:
+                    copy.add_transition(copies[t.to_state],
+                                        '' if t.epsilon else label)
+        start.add_transition(copies[nfa.start])
+        states.extend(copies.values())
+    if not anchored:
+        start.add_transition(start, ANY)
+    return NFA(list(alphabet), start, StateCollection(states))
+
+
+class MultiPattern:
+    """ Many patterns matched in a single scan
+
+    The patterns (regular expressions or NFAs) are combined with an
+    unanchored union() and compiled to one minimal DFA. Scanning the input
+    once visits every state a match of any pattern ends in.
+    """
+
+    def __init__(self, patterns: List[Union[str, NFA]],
+                 ids: Optional[List[int]] = None) -> None:
+        nfas = [compile(p) if isinstance(p, str) else p
+                for p in patterns]
+        self.dfa = union(nfas, ids, anchored=False).to_DFA(
+            verbose=False).minimize(verbose=False)
+        compact = CompactDFA.from_dfa(self.dfa)
+        self.matcher = CompiledDFA(compact)
+        # accepted pattern ids per state, in compact state order
+        self.accept_ids = compact.accept_ids or \
+            [frozenset()] * compact.num_states
+
+    def ends(self, text: Text) -> Iterator[Tuple[int, FrozenSet[int]]]:
+        """ (end, pattern ids) for every position a match ends at """
+        m = self.matcher
+        s = m.start
+        if s == UNDEFINED:
+            return
+        rows, accept_ids = m.rows, self.accept_ids
+        if accept_ids[s]:
+            yield 0, accept_ids[s]
+        for i, c in enumerate(m._classes(text, 0, len(text))):
+            # undefined only if no pattern can match at all anymore
+            if c == UNDEFINED:
+                return
+            s = rows[s][c]
+            if s == UNDEFINED:
+                return
+            if accept_ids[s]:
+                yield i + 1, accept_ids[s]
+
+    def scan(self, text: Text) -> Set[int]:
+        """ Ids of all patterns that match somewhere in text """
+        res = set()
+        for _, ids in self.ends(text):
+            res.update(ids)
+        return res
@@ -0,0 +1,122 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
+from src.python.states import StateCollection, State
+from src.python.finite_automaton import NFA, DFA
+from src.python.bitset_nfa import BitsetNFA, bits
+
+# Parallel subset construction
+#
+# NFA states are numbered 0..n-1 and an NFA state set is an int bitset.
+# The coordinator expands the DFA breadth first, one level at a time: the
+# frontier of new subsets is cut into batches that worker processes expand
+# (move + epsilon closure for every symbol), and the coordinator dedupes
+# the resulting subsets. New subsets are numbered in the order of the
+# sequential construction, so both give the same DFA (state names included).
+
+# tables of the worker processes (see _init_worker)
+_closure: List[int] = []
+_steps: List[Dict[int, int]] = []
+
+
+def _init_worker(closure: List[int], steps: List[Dict[int, int]]) -> None:
+    global _closure, _steps
+    _closure = closure
+    _steps = steps
+
+
+def _expand(subsets: List[int]) -> List[Dict[int, int]]:
+    """ symbol -> ec(move(subset, symbol)) for every subset """
+    return expand(subsets, _closure, _steps)
+
+
+def expand(subsets: List[int], closure: List[int],
+           steps: List[Dict[int, int]]) -> List[Dict[int, int]]:
+    res = []
+    closures = {}  # move set -> closure
+    for subset in subsets:
+        moves = {}
+        for i in bits(subset):
+            for symbol, targets in steps[i].items():
+                moves[symbol] = moves.get(symbol, 0) | targets
+        for symbol, move_set in moves.items():
+            next_set = closures.get(move_set)
+            if next_set is None:
+                next_set = 0
+                for t in bits(move_set):
+                    next_set |= closure[t]
+                closures[move_set] = next_set
+            moves[symbol] = next_set
+        res.append(moves)
+    return res
+
+
+def parallel_to_DFA(nfa: NFA, workers: Optional[int] = None,
+                    min_batch: int = 64,
+                    max_states: Optional[int] = None) -> Optional[DFA]:
+    """ Subset construction with a pool of worker processes
+
+    Args:
+        nfa (NFA): The NFA
+        workers (int, optional): Number of processes. Defaults to the
+            number of CPUs.
+        min_batch (int): Frontiers smaller than this are expanded in the
+            coordinator, so small DFAs do not pay for the pool.
+        max_states (int, optional): Give up (return None) once the DFA has
+            more states (checked after every level)
+
+    Returns:
+        DFA: The same DFA as NFA.to_DFA
+    """
+    fa = BitsetNFA(nfa)
+    workers = workers or os.cpu_count() or 1
+
+    ids = {fa.start: 0}  # subset -> DFA state id
+    subsets = [fa.start]
+    rows = []  # DFA state id -> [(label, target id)]
+    frontier = [fa.start]
+    pool = None
+    try:
+        while frontier:
+            if len(frontier) < min_batch or workers < 2:
+                results = expand(frontier, fa.closure, fa.steps)
+            else:
+                if pool is None:
+                    pool = ProcessPoolExecutor(
+                        workers, initializer=_init_worker,
+                        initargs=(fa.closure, fa.steps))
+                size = max(min_batch // 4,
+                           -(-len(frontier) // (4 * workers)))
+                batches = [frontier[i:i + size]
+                           for i in range(0, len(frontier), size)]
+                results = [moves for batch in pool.map(_expand, batches)
+                           for moves in batch]
+
+            # dedupe in frontier order: ids as in the sequential worklist
+            next_frontier = []
+            for moves in results:
+                row = []
+                for label, next_set in fa.labels(moves):
+                    t = ids.get(next_set)
+                    if t is None:
+                        t = ids[next_set] = len(subsets)
+                        subsets.append(next_set)
+                        next_frontier.append(next_set)
+                    row.append((label, t))
+                rows.append(row)
+            frontier = next_frontier
+            if max_states is not None and len(subsets) > max_states:
+                return None
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    states = [State('s' + str(i), acc=bool(subset & fa.accepting),
+                    accept_ids=fa.accept_ids(subset))
+              for i, subset in enumerate(subsets)]
+    for state, row in zip(states, rows):
+        for label, t in row:
+            state.add_transition(states[t], label)
+    dfa = DFA(list(nfa.alphabet), states[0], StateCollection(states))
+    dfa.set_source(nfa)
+    return dfa
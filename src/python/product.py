@@ -0,0 +1,111 @@
+from collections import deque
+from typing import Optional
+from src.python.charset import CharSet, MAX_CODEPOINT, label_intervals
+from src.python.states import StateCollection, State
+from src.python.finite_automaton import DFA
+from src.python.equivalence import SINK, moves
+
+# Boolean operations on DFAs (product construction)
+#
+# A state of the result is a pair (p, q) of a state of each DFA, with SINK
+# for a side that has no transition (the dummy state that makes move total
+# in minimize, left implicit). Only pairs reachable from the pair of start
+# states are built, numbered in BFS order through a dict keyed by the pair.
+# A pair is accepting as the operation says. Pairs that cannot lead to an
+# accepting pair because a side is in SINK are not built: both sides for
+# intersect, the first for difference.
+
+OPERATIONS = {
+    # name: (accepting, sides that must not be in SINK)
+    'intersect': (lambda a, b: a and b, (True, True)),
+    'union': (lambda a, b: a or b, (False, False)),
+    'difference': (lambda a, b: a and not b, (True, False)),
+}
+
+
+def _accepting(state: Optional[State]) -> bool:
+    return state is not SINK and state.acc
+
+
+def product(dfa1: DFA, dfa2: DFA, operation: str, minimize=False) -> DFA:
+    """ DFA of the intersection, union or difference of the languages
+
+    Args:
+        dfa1 (DFA): Left operand
+        dfa2 (DFA): Right operand
+        operation (str): 'intersect', 'union' or 'difference'
+        minimize (bool): Minimize the product (Hopcroft)
+
+    Returns:
+        DFA: States P1, P2, ... with the pair as origin
+    """
+    try:
+        accepting, needed = OPERATIONS[operation]
+    except KeyError:
+        raise Exception(f"Product Error: unknown operation '{operation}'.")
+    dfa1.validate()
+    dfa2.validate()
+    ranges = dfa1.sc.any_ranges() or dfa2.sc.any_ranges()
+    symbols = set(dfa1.alphabet)
+    alphabet = list(dfa1.alphabet) + [c for c in dfa2.alphabet
+                                      if c not in symbols]
+    states = {}  # pair -> product state (hashed pair ids)
+
+    def new_state(pair) -> State:
+        p, q = pair
+        acc = accepting(_accepting(p), _accepting(q))
+        accept_ids = set()
+        if acc:
+            # ids of the accepting sides that are part of the result
+            if _accepting(p):
+                accept_ids.update(p.accept_ids)
+            if _accepting(q) and operation != 'difference':
+                accept_ids.update(q.accept_ids)
+        names = ','.join('-' if s is SINK else s.name for s in pair)
+        state = State('P' + str(len(states) + 1), acc=acc,
+                      origin=f"({names})", accept_ids=accept_ids)
+        states[pair] = state
+        return state
+
+    start = (dfa1.start, dfa2.start)  # start None: empty language
+    new_state(start)
+    queue = deque([start])
+    while queue:
+        pair = queue.popleft()
+        labels_to = {}  # target pair -> labels
+        for label, s, t in moves(*pair):
+            if (needed[0] and s is SINK) or (needed[1] and t is SINK):
+                continue
+            labels_to.setdefault((s, t), []).append(label)
+        for target, labels in labels_to.items():
+            if target not in states:
+                new_state(target)
+                queue.append(target)
+            if ranges:
+                # one CharSet label per target pair, as in Hopcroft
+                labels = [CharSet(i for label in labels
+                                  for i in label_intervals(label)).label()]
+            for label in labels:
+                states[pair].add_transition(states[target], label)
+
+    res = DFA(alphabet, states[start], StateCollection(states.values()))
+    if minimize:
+        res = res.minimize(verbose=False)
+    return res
+
+
+def universal(dfa: DFA) -> DFA:
+    """ DFA of all strings over the alphabet of dfa, or over all
+    characters if dfa has CharSet labels """
+    state = State('U', acc=True)
+    if dfa.sc.any_ranges():
+        state.add_transition(state, CharSet([(0, MAX_CODEPOINT)]))
+    else:
+        for c in dfa.alphabet:
+            state.add_transition(state, c)
+    return DFA(list(dfa.alphabet), state, StateCollection([state]))
+
+
+def complement(dfa: DFA, minimize=False) -> DFA:
+    """ DFA of the strings not accepted by dfa (see universal) """
+    return product(universal(dfa), dfa, 'difference', minimize)
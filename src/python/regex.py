@@ -0,0 +1,312 @@
+from typing import Iterable, List, Optional, Tuple, Union
+from src.python.charset import CharSet
+from src.python.states import StateCollection, State
+from src.python.finite_automaton import NFA
+
+# Thompson construction of an NFA from a regular expression
+#
+# Supported syntax:
+#   ab      concatenation          a|b     alternation
+#   a*      zero or more           a+      one or more
+#   a?      zero or one            (a)     group
+#   a{m}    exactly m              a{m,}   at least m
+#   a{m,n}  between m and n        a{,n}   at most n
+#   .       any symbol but newline [abc]   character class
+#   [a-z]   character range        [^abc]  negated class
+#   \d \w \s classes, \D \W \S their complements
+#   \n \t \r \f \v \xhh characters, \ before any other punctuation
+#
+# Classes, '.' and class escapes become one CharSet-labelled transition.
+# Without an alphabet they range over all of Unicode. Other escapes
+# (anchors such as \b and \Z, backreferences) and malformed repetitions
+# are errors rather than literals.
+
+Label = Union[str, CharSet]
+
+ESCAPE_CLASSES = {
+    'd': CharSet([(ord('0'), ord('9'))]),
+    'w': CharSet([(ord('a'), ord('z')), (ord('A'), ord('Z')),
+                  (ord('0'), ord('9')), (ord('_'), ord('_'))]),
+    's': CharSet.from_chars(' \t\n\r\f\v'),
+}
+ESCAPE_CLASSES.update({c.upper(): chars.complement()
+                       for c, chars in list(ESCAPE_CLASSES.items())})
+ESCAPE_CHARS = {'n': '\n', 't': '\t', 'r': '\r', 'f': '\f', 'v': '\v'}
+ANY_CHAR = CharSet.from_chars('\n').complement()
+
+
+class Fragment:
+    """ Partial NFA with one start and one end state """
+
+    def __init__(self, start: State, end: State, states: List[State]) -> None:
+        self.start = start
+        self.end = end
+        self.states = states
+
+
+class ThompsonBuilder:
+
+    def __init__(self) -> None:
+        self.name_index = 0
+
+    def new_state(self) -> State:
+        state = State(str(self.name_index))
+        self.name_index += 1
+        return state
+
+    # -- fragments --------------------------------------------------------- #
+    def empty(self) -> Fragment:
+        s, e = self.new_state(), self.new_state()
+        s.add_transition(e)
+        return Fragment(s, e, [s, e])
+
+    def symbols(self, labels: Iterable[Label]) -> Fragment:
+        s, e = self.new_state(), self.new_state()
+        for label in labels:
+            s.add_transition(e, label)
+        return Fragment(s, e, [s, e])
+
+    def concat(self, fragments: List[Fragment]) -> Fragment:
+        if not fragments:
+            return self.empty()
+        res = fragments[0]
+        for f in fragments[1:]:
+            res.end.add_transition(f.start)
+            res.states.extend(f.states)
+            res.end = f.end
+        return res
+
+    def alternate(self, fragments: List[Fragment]) -> Fragment:
+        if len(fragments) == 1:
+            return fragments[0]
+        s, e = self.new_state(), self.new_state()
+        states = [s]
+        for f in fragments:
+            s.add_transition(f.start)
+            f.end.add_transition(e)
+            states.extend(f.states)
+        states.append(e)
+        return Fragment(s, e, states)
+
+    def star(self, f: Fragment) -> Fragment:
+        s, e = self.new_state(), self.new_state()
+        s.add_transition(f.start)
+        s.add_transition(e)
+        f.end.add_transition(f.start)
+        f.end.add_transition(e)
+        return Fragment(s, e, [s] + f.states + [e])
+
+    def plus(self, f: Fragment) -> Fragment:
+        e = self.new_state()
+        f.end.add_transition(f.start)
+        f.end.add_transition(e)
+        f.states.append(e)
+        f.end = e
+        return f
+
+    def optional(self, f: Fragment) -> Fragment:
+        s, e = self.new_state(), self.new_state()
+        s.add_transition(f.start)
+        s.add_transition(e)
+        f.end.add_transition(e)
+        return Fragment(s, e, [s] + f.states + [e])
+
+    def copy(self, f: Fragment) -> Fragment:
+        """ Copy of a fragment with fresh states """
+        new_states = {state: self.new_state() for state in f.states}
+        for state, new_state in new_states.items():
+            for label, transitions in state.transitions.tbl.items():
+                for t in transitions:
+                    new_state.add_transition(new_states[t.to_state],
+                                             '' if t.epsilon else label)
+        return Fragment(new_states[f.start], new_states[f.end],
+                        list(new_states.values()))
+
+    def repeat(self, f: Fragment, low: int, high: Optional[int]) -> Fragment:
+        """ f{low,high}, high = None for no upper bound """
+        if high is not None and high < low:
+            raise Exception("Regex Error: bad repetition range.")
+        if high == 0:
+            return self.empty()
+        # all copies are taken before any of them is modified
+        count = low + 1 if high is None else high
+        copies = [f] + [self.copy(f) for _ in range(count - 1)]
+        res = copies[:low]
+        if high is None:
+            res.append(self.star(copies[low]))
+        else:
+            res.extend(self.optional(c) for c in copies[low:])
+        return self.concat(res)
+
+
+class RegexParser:
+    """ Single left-to-right pass with an explicit stack of open groups """
+
+    def __init__(self, pattern: str, alphabet: Optional[List[str]] = None):
+        self.pattern = pattern
+        self.alphabet = alphabet
+        self.pos = 0
+        self.used = set()  # literal symbols used by the pattern
+        self.builder = ThompsonBuilder()
+
+    def error(self, msg: str) -> Exception:
+        return Exception(f"Regex Error: {msg} at position {self.pos} "
+                         f"in {self.pattern!r}.")
+
+    def any_symbol(self) -> CharSet:
+        if self.alphabet is None:
+            return ANY_CHAR
+        return CharSet.from_chars(self.alphabet)
+
+    def restrict(self, chars: CharSet) -> List[Label]:
+        """ Label of a character set within the alphabet """
+        if self.alphabet is not None:
+            chars = chars.intersection(self.any_symbol())
+        return [chars.label()] if chars else []
+
+    def parse(self) -> Fragment:
+        b = self.builder
+        stack = []  # open groups: (alternatives, sequence)
+        alternatives, sequence = [], []
+        pattern = self.pattern
+
+        while self.pos < len(pattern):
+            ch = pattern[self.pos]
+            if ch == '(':
+                stack.append((alternatives, sequence))
+                alternatives, sequence = [], []
+            elif ch == ')':
+                if not stack:
+                    raise self.error("unbalanced ')'")
+                alternatives.append(b.concat(sequence))
+                group = b.alternate(alternatives)
+                alternatives, sequence = stack.pop()
+                sequence.append(group)
+            elif ch == '|':
+                alternatives.append(b.concat(sequence))
+                sequence = []
+            elif ch in '*+?':
+                if not sequence:
+                    raise self.error(f"nothing to repeat with '{ch}'")
+                op = {'*': b.star, '+': b.plus, '?': b.optional}[ch]
+                sequence[-1] = op(sequence[-1])
+            elif ch == '{':
+                if not sequence:
+                    raise self.error("nothing to repeat with '{'")
+                low, high = self.repetition()
+                sequence[-1] = b.repeat(sequence[-1], low, high)
+            else:
+                sequence.append(b.symbols(self.atom()))
+            self.pos += 1
+
+        if stack:
+            raise self.error("missing ')'")
+        alternatives.append(b.concat(sequence))
+        return b.alternate(alternatives)
+
+    def repetition(self) -> Tuple[int, Optional[int]]:
+        """ (low, high) of the {m}, {m,}, {,n} or {m,n} at pos, which then
+        is at its '}' """
+        end = self.pattern.find('}', self.pos)
+        low, comma, high = self.pattern[self.pos + 1:end].partition(',') \
+            if end >= 0 else ('', '', '')
+        if not (low or high) or \
+                not all(part.isdecimal() for part in (low, high) if part):
+            raise self.error("bad repetition")
+        self.pos = end
+        if not comma:
+            return int(low), int(low)
+        return int(low or 0), int(high) if high else None
+
+    def atom(self) -> List[Label]:
+        """ Label of a literal, escape, '.' or class at pos
+
+        Classes become a single CharSet label, so [a-z] is one transition.
+        """
+        ch = self.pattern[self.pos]
+        if ch == '.':
+            return self.restrict(ANY_CHAR)
+        if ch == '[':
+            return self.restrict(self.char_class())
+        if ch == '\\':
+            chars = self.escape()
+            if isinstance(chars, CharSet):
+                return self.restrict(chars)
+        else:
+            chars = ch
+        if self.alphabet is not None and chars not in self.alphabet:
+            raise self.error(f"symbol {chars!r} not in alphabet")
+        self.used.add(chars)
+        return [chars]
+
+    def escape(self) -> Label:
+        self.pos += 1
+        if self.pos >= len(self.pattern):
+            raise self.error("trailing '\\'")
+        ch = self.pattern[self.pos]
+        if ch in ESCAPE_CLASSES:
+            return ESCAPE_CLASSES[ch]
+        if ch in ESCAPE_CHARS:
+            return ESCAPE_CHARS[ch]
+        if ch == 'x':
+            digits = self.pattern[self.pos + 1:self.pos + 3]
+            if len(digits) < 2 or \
+                    not all(d in '0123456789abcdefABCDEF' for d in digits):
+                raise self.error("bad escape '\\x'")
+            self.pos += 2
+            return chr(int(digits, 16))
+        if ch.isalnum():
+            raise self.error(f"unsupported escape '\\{ch}'")
+        return ch
+
+    def char_class(self) -> CharSet:
+        pattern = self.pattern
+        self.pos += 1
+        negate = self.pos < len(pattern) and pattern[self.pos] == '^'
+        if negate:
+            self.pos += 1
+        intervals = []
+        first = True
+        while True:
+            if self.pos >= len(pattern):
+                raise self.error("missing ']'")
+            ch = pattern[self.pos]
+            if ch == ']' and not first:
+                break
+            first = False
+            lo = self.escape() if ch == '\\' else ch
+            if isinstance(lo, CharSet):
+                intervals.extend(lo.intervals)
+            elif pattern[self.pos + 1:self.pos + 2] == '-' \
+                    and pattern[self.pos + 2:self.pos + 3] not in ('', ']'):
+                self.pos += 2
+                hi = self.escape() if pattern[self.pos] == '\\' \
+                    else pattern[self.pos]
+                if isinstance(hi, CharSet) or ord(hi) < ord(lo):
+                    raise self.error("bad character range")
+                intervals.append((ord(lo), ord(hi)))
+            else:
+                intervals.append((ord(lo), ord(lo)))
+            self.pos += 1
+        chars = CharSet(intervals)
+        return chars.complement() if negate else chars
+
+
+def compile(pattern: str, alphabet: Optional[List[str]] = None) -> NFA:
+    """ Regular expression to NFA (Thompson construction)
+
+    Args:
+        pattern (str): The regular expression
+        alphabet (List[str], optional): Alphabet of the NFA. Defaults to
+            the (sorted) symbols used by the pattern.
+
+    Returns:
+        NFA: NFA with a single accepting state
+    """
+    parser = RegexParser(pattern, alphabet)
+    fragment = parser.parse()
+    fragment.end.acc = True
+    if alphabet is None:
+        alphabet = sorted(parser.used)
+    return NFA(list(alphabet), fragment.start,
+               StateCollection(fragment.states))
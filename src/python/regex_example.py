@@ -0,0 +1,10 @@
+from src.python.regex import compile
+
+
+if __name__ == "__main__":
+    # (a|b)*abb from a pattern instead of hand-wired states
+    nfa = compile("(a|b)*abb")
+    nfa.print_as_gvfile()
+    dfa = nfa.to_DFA()
+    minimized_dfa = dfa.minimize()
+    minimized_dfa.print_as_gvfile()
@@ -0,0 +1,134 @@
+import mmap
+import struct
+import sys
+from array import array
+from typing import Union
+from src.python.compact import CompactDFA
+from src.python.finite_automaton import DFA
+from src.python.matcher import CompiledDFA
+
+# Binary format of a compiled DFA (all integers little-endian)
+#
+#   header     magic, version, flags, states n, classes k, intervals m,
+#              start state (-1 if nothing can match)
+#   classes    int32 starts[m], ends[m], class ids[m]: disjoint codepoint
+#              intervals of the symbol classes (alphabet class map)
+#   accepting  bitmap of n bits, padded to 4 bytes
+#   table      int32[n * k]: table[s * k + c] is the target or -1
+#
+# load() memory-maps the file and matches directly off the buffer. No
+# State objects are built; a row of the table is only decoded when a scan
+# first reaches its state.
+
+MAGIC = b'IPSDFA\x00\x00'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<8sIIIIIi')
+
+
+def _align(size: int) -> int:
+    return (size + 3) & ~3
+
+
+def dumps(dfa: Union[DFA, CompactDFA, CompiledDFA]) -> bytes:
+    """ Binary image of a (usually minimized) DFA """
+    compiled = dfa if isinstance(dfa, CompiledDFA) else CompiledDFA(dfa)
+    n, k = len(compiled.accepting), compiled.num_classes
+    intervals = compiled.intervals
+
+    accepting = bytearray(_align((n + 7) // 8))
+    for s, acc in enumerate(compiled.accepting):
+        if acc:
+            accepting[s >> 3] |= 1 << (s & 7)
+
+    sections = [array('i', [lo for lo, _, _ in intervals]),
+                array('i', [hi for _, hi, _ in intervals]),
+                array('i', [c for _, _, c in intervals]),
+                accepting,
+                array('i', [t for s in range(n) for t in compiled.rows[s]])]
+    if sys.byteorder != 'little':
+        for a in sections:
+            if isinstance(a, array):
+                a.byteswap()
+    header = HEADER.pack(MAGIC, FORMAT_VERSION, 0, n, k, len(intervals),
+                         compiled.start)
+    return header + b''.join(bytes(a) for a in sections)
+
+
+def save(dfa: Union[DFA, CompactDFA, CompiledDFA], path: str) -> None:
+    with open(path, 'wb') as f:
+        f.write(dumps(dfa))
+
+
+class Rows(dict):
+    """ rows[s] of a flat int32 table, decoded on first access """
+
+    def __init__(self, table: memoryview, k: int) -> None:
+        super().__init__()
+        self.table = table
+        self.k = k
+
+    def __missing__(self, s: int) -> list:
+        row = self[s] = self.table[s * self.k:(s + 1) * self.k].tolist()
+        return row
+
+
+class MappedDFA(CompiledDFA):
+    """ CompiledDFA running off a serialized buffer (e.g. an mmap)
+
+    Has the matching API of CompiledDFA (fullmatch, match, search,
+    finditer, stream). In memory are only the symbol class lookup tables
+    and the decoded rows of the states that scans have visited, so no
+    prefilter or reverse DFA is built from the table (max_derived).
+    """
+    max_derived = 0
+
+    def __init__(self, buffer) -> None:
+        self.buffer = buffer
+        view = memoryview(buffer)
+        if len(view) < HEADER.size:
+            raise Exception("Load Error: file too short.")
+        magic, version, _, n, k, m, start = HEADER.unpack_from(view)
+        if magic != MAGIC:
+            raise Exception("Load Error: not a compiled DFA.")
+        if version != FORMAT_VERSION:
+            raise Exception(f"Load Error: unsupported version {version}.")
+        accept_size = _align((n + 7) // 8)
+        if len(view) != HEADER.size + 12 * m + accept_size + 4 * n * k:
+            raise Exception("Load Error: file has wrong size.")
+
+        pos = HEADER.size
+        ints = self._ints(view[pos:pos + 12 * m])
+        starts, ends, classes = ints[:m], ints[m:2 * m], ints[2 * m:]
+        pos += 12 * m
+        accepting = view[pos:pos + accept_size]
+        pos += accept_size
+        table = self._ints(view[pos:])
+
+        self.compact = None
+        self.num_classes = k
+        self.rows = Rows(table, k)
+        self.accepting = [bool(accepting[s >> 3] >> (s & 7) & 1)
+                          for s in range(n)]
+        self.start = start
+        self.intervals = list(zip(starts, ends, classes))
+        self._index_classes()
+
+    @staticmethod
+    def _ints(view: memoryview):
+        """ int32 view of little-endian data (a copy on big-endian) """
+        if sys.byteorder == 'little':
+            return view.cast('i')
+        a = array('i', bytes(view))
+        a.byteswap()
+        return a
+
+
+def loads(data: bytes) -> MappedDFA:
+    return MappedDFA(data)
+
+
+def load(path: str) -> MappedDFA:
+    """ Memory-map a file written by save() """
+    with open(path, 'rb') as f:
+        buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return MappedDFA(buffer)
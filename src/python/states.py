@@ -1,14 +1,24 @@
-from typing import Iterable, List, Set
+from typing import FrozenSet, Iterable, List, Set, Tuple
+from src.python.charset import label_intervals, split_intervals
 from src.python.transitions import Transition, TransitionCollection
 
 
+NO_ACCEPT_IDS = frozenset()
+
+
 class State:
 
-    def __init__(self, name: str, acc=False, origin: str = '') -> None:
+    __slots__ = ('transitions', 'name', 'acc', 'origin', 'accept_ids')
+
+    def __init__(self, name: str, acc=False, origin: str = '',
+                 accept_ids: Iterable[int] = ()) -> None:
         self.transitions = TransitionCollection()  # initialize collection
         self.name = name
         self.acc = acc  # accepting or non-accepting state
         self.origin = origin  # to print original states after minimize
+        # ids of the patterns an accepting state accepts (multi-pattern)
+        self.accept_ids = frozenset(accept_ids) if accept_ids \
+            else NO_ACCEPT_IDS
 
     # Methods
     def add_transition(self, to_state: 'State', label: str = '') -> None:
@@ -21,16 +31,15 @@ class State:
         trans = self.transitions.get_label_transitions(label)
         return [t.to_state for t in trans]
 
-    def epsilon_closure(self, visited_states:
-                        List['State'] = []) -> Set['State']:
-        res = [self]
-        eps_trans = self.get_epsilon_transitions()
-        for state in eps_trans:
-            if not visited_states or state not in visited_states:
-                # * Avoid loop by 'marking' visited states
-                update_visited_states = eps_trans + visited_states
-                res.extend(state.epsilon_closure(update_visited_states))
-        return set(res)
+    def epsilon_closure(self) -> Set['State']:
+        res = {self}
+        stack = [self]
+        while stack:  # iterative, deep epsilon chains cannot overflow
+            for state in stack.pop().get_epsilon_transitions():
+                if state not in res:
+                    res.add(state)
+                    stack.append(state)
+        return res
 
     def __repr__(self):
         return self.name
@@ -44,8 +53,116 @@ class State:
         return output.strip()
 
 
+class EpsilonClosures:
+    """ Epsilon-closures from the condensation of the epsilon graph
+
+    Built with an iterative Tarjan SCC search. All states of a strongly
+    connected component share one closure, so a closure is a search over
+    the (acyclic) component graph. Closures of single states are memoized;
+    closures are only materialized when asked for, which keeps long epsilon
+    chains linear.
+    """
+
+    def __init__(self, roots: Iterable[State] = []) -> None:
+        self.component = {}  # state -> component id
+        self.members = []  # component id -> states in the component
+        self.successors = []  # component id -> successor component ids
+        self.closures = {}  # component id -> memoized closure
+        self.add(roots)
+
+    def add(self, roots: Iterable[State]) -> None:
+        """ Add the components of all states reachable from roots """
+        index = {}
+        low = {}
+        stack = []
+        on_stack = set()
+
+        for root in roots:
+            if root in self.component or root in index:
+                continue
+            index[root] = low[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work = [(root, iter(root.get_epsilon_transitions()))]
+
+            while work:
+                v, successors = work[-1]
+                for w in successors:
+                    if w in self.component:
+                        continue  # finished component
+                    if w not in index:
+                        index[w] = low[w] = len(index)
+                        stack.append(w)
+                        on_stack.add(w)
+                        work.append((w, iter(w.get_epsilon_transitions())))
+                        break
+                    if w in on_stack:
+                        low[v] = min(low[v], index[w])
+                else:
+                    work.pop()
+                    if work:
+                        u = work[-1][0]
+                        low[u] = min(low[u], low[v])
+                    if low[v] == index[v]:
+                        self._pop_component(v, stack, on_stack)
+
+    def _pop_component(self, v: State, stack: List[State],
+                       on_stack: Set[State]) -> None:
+        cid = len(self.members)
+        members = []
+        while True:
+            w = stack.pop()
+            on_stack.discard(w)
+            members.append(w)
+            self.component[w] = cid
+            if w is v:
+                break
+        successors = set()
+        for w in members:
+            for x in w.get_epsilon_transitions():
+                if self.component[x] != cid:
+                    successors.add(self.component[x])
+        self.members.append(members)
+        self.successors.append(successors)
+
+    def closure(self, state: State) -> FrozenSet[State]:
+        """ Epsilon-closure of a single state (memoized) """
+        if state not in self.component:
+            self.add([state])
+        cid = self.component[state]
+        if cid not in self.closures:
+            self.closures[cid] = frozenset(self.closure_of([state]))
+        return self.closures[cid]
+
+    def closure_of(self, states: Iterable[State]) -> Set[State]:
+        """ Epsilon-closure of a set of states """
+        res = set()
+        seen = set()
+        stack = []
+        for state in states:
+            if state not in self.component:
+                self.add([state])
+            cid = self.component[state]
+            if cid not in seen:
+                seen.add(cid)
+                stack.append(cid)
+        while stack:
+            cid = stack.pop()
+            if cid in self.closures:
+                res.update(self.closures[cid])
+                continue
+            res.update(self.members[cid])
+            for succ in self.successors[cid]:
+                if succ not in seen:
+                    seen.add(succ)
+                    stack.append(succ)
+        return res
+
+
 class StateCollection:
 
+    __slots__ = ('states_by_name', 'accepting')
+
     def __init__(self, states: Iterable[State] = []) -> None:
         self.states_by_name = {}
         self.accepting = []
@@ -71,6 +188,22 @@ class StateCollection:
             res.update(state.get_label_transitions(label))
         return StateCollection(res)
 
+    def move_ranges(self) -> List[Tuple[int, int, FrozenSet[State]]]:
+        """ move() for all characters at once
+
+        Returns disjoint (lo, hi, states) codepoint intervals, where states
+        are the states reachable from the collection on every character in
+        lo..hi. Labels are split at every interval boundary.
+        """
+        items = []
+        for _, state in self.states_by_name.items():
+            for label, transitions in state.transitions.tbl.items():
+                for t in transitions:
+                    if not t.epsilon:
+                        for lo, hi in label_intervals(label):
+                            items.append((lo, hi, t.to_state))
+        return split_intervals(items)
+
     def ec(self):
         new_states = []
         for _, state in self.states_by_name.items():
@@ -86,6 +219,13 @@ class StateCollection:
                 return True
         return False
 
+    def any_ranges(self) -> bool:
+        """ Does any state have CharSet transition labels? """
+        for _, state in self.states_by_name.items():
+            if state.transitions.ranges:
+                return True
+        return False
+
     def any_ambiguous_transitions(self) -> bool:
         for _, state in self.states_by_name.items():
             if state.transitions.any_ambiguous_transitions():
@@ -98,6 +238,17 @@ class StateCollection:
         else:
             return False
 
+    def accept_ids(self) -> FrozenSet[int]:
+        """ Pattern ids accepted by any state of the set """
+        res = set()
+        for state in self.accepting:
+            res.update(state.accept_ids)
+        return frozenset(res)
+
+    def key(self) -> frozenset:
+        """ Hashable key of the set (frozenset of state names) """
+        return frozenset(self.states_by_name)
+
     def state_names(self):
         """ Set of states represented by their names (sorted) """
         res = []
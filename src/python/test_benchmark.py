@@ -0,0 +1,44 @@
+import json
+from src.python.benchmark import compare, main
+
+
+def results(*records) -> dict:
+    return dict(version=1, python='3', platform='test', scale=0,
+                results=[dict(name=name, **metrics)
+                         for name, metrics in records])
+
+
+def test_compare(tmp_path, capsys):
+    old = results(("faster", dict(seconds=2.0, peak_bytes=1000)),
+                  ("slower", dict(seconds=1.0, peak_bytes=1000)),
+                  ("bigger", dict(seconds=1.0, peak_bytes=1000)),
+                  ("within", dict(seconds=1.0, peak_bytes=1000)),
+                  ("zero", dict(seconds=0.0)),
+                  ("no_memory", dict(seconds=1.0, peak_bytes=1000)),
+                  ("removed", dict(seconds=1.0)))
+    new = results(("faster", dict(seconds=1.0, peak_bytes=1000)),
+                  ("slower", dict(seconds=2.0, peak_bytes=1000)),
+                  ("bigger", dict(seconds=1.0, peak_bytes=1500)),
+                  ("within", dict(seconds=1.2, peak_bytes=1200)),
+                  ("zero", dict(seconds=5.0)),
+                  ("no_memory", dict(seconds=1.0)),
+                  ("added", dict(seconds=9.0)))
+    flagged = [(r['name'], r['metric']) for r in compare(old, new, 1.25)]
+    assert flagged == [("slower", 'seconds'), ("bigger", 'peak_bytes')]
+    assert [r['name'] for r in compare(old, new, 1.1)] == \
+        ["slower", "bigger", "within", "within"]
+    assert compare(old, old, 1.25) == []
+
+    # the command line: regressions as JSON, exit status 1
+    old_path, new_path = tmp_path / "old.json", tmp_path / "new.json"
+    old_path.write_text(json.dumps(old))
+    new_path.write_text(json.dumps(new))
+    capsys.readouterr()
+    assert main(['--compare', str(old_path), str(new_path)]) == 1
+    regressions = json.loads(capsys.readouterr().out)
+    assert regressions[0] == dict(name="slower", metric='seconds', old=1.0,
+                                  new=2.0, ratio=2.0)
+    assert main(['--compare', str(old_path), str(old_path)]) == 0
+    assert json.loads(capsys.readouterr().out) == []
+    assert main(['--compare', str(old_path), str(new_path),
+                 '--threshold', '3']) == 0
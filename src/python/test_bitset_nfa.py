@@ -0,0 +1,60 @@
+import random
+import re
+from src.python.bitset_nfa import NFASimulator
+from src.python.regex import compile
+from src.python.fixtures import match_spans, out_of_alphabet_nfa
+
+
+def test_against_re():
+    rng = random.Random(14)
+    for pattern in ["(a|b)*abb", "a(b|c)*d?", "(ab|a)*(ba|b)+", "[^a]*a",
+                    "\\w+x", "(a|b)*a(a|b){12}"]:
+        sim = NFASimulator(compile(pattern))
+        regex = re.compile(pattern)
+        for _ in range(200):
+            text = ''.join(rng.choice('abcdx')
+                           for _ in range(rng.randint(0, 16)))
+            assert sim.fullmatch(text) == bool(regex.fullmatch(text))
+            ends = [k for k in range(len(text) + 1)
+                    if regex.fullmatch(text[:k])]
+            assert sim.match(text) == ((0, ends[-1]) if ends else None)
+
+
+def test_no_blowup():
+    # the DFA would have 2^40 states
+    pattern = "(a|b)*a(a|b){39}"
+    sim = NFASimulator(compile(pattern))
+    regex = re.compile(pattern)
+    rng = random.Random(15)
+    for _ in range(10):
+        text = ''.join(rng.choice('ab') for _ in range(rng.randint(30, 200)))
+        assert sim.fullmatch(text) == bool(regex.fullmatch(text))
+
+
+def test_out_of_alphabet_label():
+    sim = NFASimulator(out_of_alphabet_nfa())
+    assert sim.fullmatch("z") and sim.fullmatch("a")
+    assert sim.search("xxz") == (2, 3)
+
+
+def test_search_and_bytes():
+    sim = NFASimulator(compile("ab+"))
+    assert sim.search("xxabbyab") == (2, 5)
+    assert list(sim.finditer(b"ab abb aabx")) == [(0, 2), (3, 6), (8, 10)]
+
+
+def test_search_one_pass():
+    rng = random.Random(16)
+    for pattern in ["(a|b)*abb", "ab+", "a|a*b", "b*", "(ab|a)(c|bcd)",
+                    "[^a]*a", "[a-c]x|c", "(a|b)*a(a|b){5}"]:
+        sim = NFASimulator(compile(pattern))
+        for _ in range(50):
+            text = ''.join(rng.choice('abcdx')
+                           for _ in range(rng.randint(0, 30)))
+            expected = match_spans(sim, text)
+            assert list(sim.finditer(text)) == expected, (pattern, text)
+            assert sim.search(text) == (expected[0] if expected else None)
+    # no simulation from every position (was quadratic)
+    sim = NFASimulator(compile("a*b|c"))
+    assert sim.search("a" * 20000 + "c") == (20000, 20001)
+    assert list(sim.finditer("a" * 20000)) == []
@@ -0,0 +1,58 @@
+import os
+import random
+from src.python.cache import CompileCache, canonical_key
+from src.python.regex import compile
+from src.python.fixtures import example2_nfa, isomorphic
+
+
+def test_canonical_key():
+    # same structure, different names and construction order
+    assert canonical_key(compile("(a|b)*abb")) == \
+        canonical_key(compile("(a|b)*abb"))
+    nfa = example2_nfa()
+    for state in nfa.sc:
+        state.name = "x" + state.name
+    assert canonical_key(nfa) == canonical_key(example2_nfa())
+    assert canonical_key(compile("ab")) != canonical_key(compile("ba"))
+    assert canonical_key(compile("[a-c]")) != canonical_key(compile("[a-d]"))
+    # names shuffled, so unnumbered targets do not keep their name order
+    rng = random.Random(18)
+    for pattern in ["(a|b)*abb", "(ab|a)*(ba|b)+", "a(b|c)*d?|ab"]:
+        expected = canonical_key(compile(pattern))
+        for _ in range(10):
+            nfa = compile(pattern)
+            names = [state.name for state in nfa.sc]
+            rng.shuffle(names)
+            for state, name in zip(nfa.sc, names):
+                state.name = name
+            assert canonical_key(nfa) == expected, pattern
+
+
+def test_memory_and_disk_tiers(tmp_path):
+    cache = CompileCache(str(tmp_path), max_entries=2)
+    patterns = ["(a|b)*abb", "\\w+x", "a(b|c)*d"]
+    first = [cache.compile_regex(p) for p in patterns]
+    assert cache.stats['misses'] == 3
+    assert len(cache.memory) == 2
+    assert len(os.listdir(tmp_path)) == 3
+
+    again = cache.compile_regex(patterns[2])
+    assert cache.stats['memory_hits'] == 1
+    assert again is not first[2] and isomorphic(again, first[2])
+
+    # a new process: everything comes from disk
+    cache = CompileCache(str(tmp_path))
+    for p, dfa in zip(patterns, first):
+        cached = cache.compile_regex(p)
+        assert isomorphic(cached, dfa)
+        minimal = compile(p).to_DFA(verbose=False).minimize(verbose=False)
+        assert isomorphic(cached, minimal)
+    assert cache.stats['disk_hits'] == 3
+    assert cached.accepts("xyzx") == minimal.accepts("xyzx")
+
+
+def test_size_eviction(tmp_path):
+    cache = CompileCache(str(tmp_path), max_bytes=1)
+    cache.compile_regex("ab+")
+    cache.compile_regex("cd+")
+    assert os.listdir(tmp_path) == []
@@ -0,0 +1,59 @@
+import random
+import re
+from src.python.charset import CharSet, MAX_CODEPOINT, split_intervals
+from src.python.lazy_dfa import LazyDFA
+from src.python.matcher import CompiledDFA
+from src.python.regex import compile
+
+
+def test_charset():
+    s = CharSet([(ord('x'), ord('z')), (ord('a'), ord('c')),
+                 (ord('d'), ord('f'))])
+    assert s.intervals == ((ord('a'), ord('f')), (ord('x'), ord('z')))
+    assert 'e' in s and 'g' not in s and len(s) == 9
+    assert str(s) == "[a-fx-z]"
+    assert s.intersection(CharSet.from_chars("cdy!")) == \
+        CharSet.from_chars("cdy")
+    assert s.complement().complement() == s
+    assert len(s.complement()) == MAX_CODEPOINT + 1 - 9
+    assert CharSet.from_chars("q").label() == 'q'
+
+
+def test_split_intervals():
+    pieces = split_intervals([(0, 9, 'a'), (5, 14, 'b'), (20, 20, 'a')])
+    assert pieces == [(0, 4, frozenset('a')), (5, 9, frozenset('ab')),
+                      (10, 14, frozenset('b')), (20, 20, frozenset('a'))]
+
+
+def test_one_edge_per_class():
+    nfa = compile("[a-z0-9]")
+    labels = [label for state in nfa.sc for label in state.transitions.tbl]
+    assert labels == [CharSet([(ord('0'), ord('9')), (ord('a'), ord('z'))])]
+
+    # \w over all of Unicode: the DFA size depends on the ranges only
+    dfa = compile("[^a]*\\w+x").to_DFA(verbose=False).minimize(verbose=False)
+    assert len(dfa.sc.states_by_name) == 5
+    edges = sum(len(state.transitions.tbl) for state in dfa.sc)
+    assert edges == 15
+
+
+def test_against_re():
+    rng = random.Random(12)
+    chars = "abxyz09_ -\né中"
+    for pattern in ["[a-y]+z", "\\w+", "[^a-c]*[a\\d]", "a.x|[x-z]+",
+                    "\\s[0-9a-b]{2}", "[^\\w]+"]:
+        nfa = compile(pattern)
+        dfa = nfa.to_DFA(verbose=False).minimize(verbose=False)
+        matcher = CompiledDFA(dfa)
+        lazy = LazyDFA(nfa)
+        regex = re.compile(pattern, re.ASCII)
+        for _ in range(200):
+            text = ''.join(rng.choice(chars)
+                           for _ in range(rng.randint(0, 8)))
+            expected = bool(regex.fullmatch(text))
+            assert dfa.accepts(text) == expected, (pattern, text)
+            assert matcher.fullmatch(text) == expected, (pattern, text)
+            assert lazy.fullmatch(text) == expected, (pattern, text)
+            if text.isascii():
+                data = text.encode()
+                assert matcher.fullmatch(data) == expected, (pattern, text)
@@ -0,0 +1,51 @@
+import random
+from src.python.compact import CompactDFA, CompactNFA
+from src.python.fixtures import example2_nfa, example_dfa, random_dfa
+
+
+def edges(fa) -> set:
+    return {(state.name, label, t.to_state.name)
+            for state in fa.sc
+            for label, transitions in state.transitions.tbl.items()
+            for t in transitions}
+
+
+def same_graph(fa1, fa2) -> bool:
+    return (fa1.alphabet == fa2.alphabet
+            and fa1.start.name == fa2.start.name
+            and [(s.name, s.acc, s.origin) for s in fa1.sc]
+            == [(s.name, s.acc, s.origin) for s in fa2.sc]
+            and edges(fa1) == edges(fa2))
+
+
+def test_dfa_roundtrip():
+    rng = random.Random(3)
+    for _ in range(20):
+        dfa = random_dfa(rng, rng.randint(1, 30), ['a', 'b', 'c'], 0.8)
+        compact = CompactDFA.from_dfa(dfa)
+        assert len(compact.table) == compact.num_states * 3
+        assert same_graph(dfa, compact.to_dfa())
+
+
+def test_minimized_dfa_roundtrip():
+    minimized = example_dfa().minimize(verbose=False)
+    back = CompactDFA.from_dfa(minimized).to_dfa()
+    assert same_graph(minimized, back)
+    assert back.to_graphviz() == minimized.to_graphviz()
+
+
+def test_nfa_roundtrip():
+    nfa = example2_nfa()
+    compact = CompactNFA.from_nfa(nfa)
+    assert compact.num_edges == len(edges(nfa))
+    back = compact.to_nfa()
+    assert same_graph(nfa, back)
+    assert len(back.to_DFA(verbose=False).sc.states_by_name) == 4
+
+
+def test_label_outside_alphabet():
+    dfa = random_dfa(random.Random(4), 5, ['a', 'b'])
+    dfa.start.add_transition(dfa.start, 'z')
+    compact = CompactDFA.from_dfa(dfa)
+    assert compact.labels == ['a', 'b', 'z']
+    assert same_graph(dfa, compact.to_dfa())
@@ -0,0 +1,99 @@
+import random
+import re
+from src.python.states import StateCollection, State
+from src.python.finite_automaton import DFA
+from src.python.regex import compile
+from src.python.fixtures import isomorphic, random_dfa
+
+
+def dfa_of(pattern: str, alphabet=None) -> DFA:
+    return compile(pattern, alphabet).to_DFA(verbose=False)
+
+
+def test_minimized_equivalent():
+    rng = random.Random(5)
+    for _ in range(50):
+        n = rng.randint(1, 25)
+        alphabet = ['a', 'b', 'c'][:rng.randint(1, 3)]
+        dfa = random_dfa(rng, n, alphabet, rng.choice([1.0, 0.7]))
+        assert dfa.equivalent(dfa)
+        for minimized in (dfa.minimize(verbose=False),
+                          dfa.minimize(verbose=False, trim=True)):
+            assert dfa.equivalent(minimized)
+            assert minimized.equivalent(dfa)
+            assert dfa.is_subset(minimized) and minimized.is_subset(dfa)
+
+
+def test_counterexample():
+    rng = random.Random(6)
+    found = 0
+    for _ in range(100):
+        alphabet = ['a', 'b']
+        dfa1 = random_dfa(rng, rng.randint(1, 15), alphabet, 0.8)
+        dfa2 = random_dfa(rng, rng.randint(1, 15), alphabet, 0.8)
+        word = dfa1.counterexample(dfa2)
+        # equivalent iff the minimal DFAs are isomorphic
+        assert (word is None) == isomorphic(
+            dfa1.minimize(verbose=False, trim=True),
+            dfa2.minimize(verbose=False, trim=True))
+        if word is not None:
+            found += 1
+            assert dfa1.accepts(word) != dfa2.accepts(word)
+        word = dfa1.counterexample(dfa2, subset=True)
+        if word is not None:
+            assert dfa1.accepts(word) and not dfa2.accepts(word)
+    assert found > 50
+
+
+def test_regex_languages():
+    cases = [("ab", "a(b|c)"), ("a*", "(a|b)*"), ("(ab)*", "(a|b)*"),
+             ("a(b|c)", "ab|ac"), ("[b-y]x", "[a-z]x"),
+             ("a*", "(a|b)*abb|a*")]
+    for small, large in cases:
+        dfa1, dfa2 = dfa_of(small), dfa_of(large)
+        assert dfa1.is_subset(dfa2), (small, large)
+        word = dfa2.counterexample(dfa1, subset=True)
+        same = dfa2.is_subset(dfa1)
+        assert dfa1.equivalent(dfa2) == same
+        if not same:
+            assert re.fullmatch(large, word) and \
+                not re.fullmatch(small, word), (small, large, word)
+    assert dfa_of("ab").counterexample(dfa_of("a(b|c)")) == "ac"
+    assert dfa_of("(a|b)*abb").counterexample(dfa_of("a*")) == ""
+    assert dfa_of("(a|b)*abb").counterexample(dfa_of("a*"),
+                                              subset=True) == "abb"
+
+
+def test_ranges_against_characters():
+    # CharSet labels on one side, single characters on the other
+    ranges = dfa_of("[a-c]+d")
+    chars = dfa_of("(a|b|c)+d")
+    assert ranges.equivalent(chars) and chars.equivalent(ranges)
+    other = dfa_of("(a|b)+d")
+    assert other.is_subset(ranges)
+    assert ranges.counterexample(other) == "cd"
+
+
+def test_empty_language():
+    dfa = dfa_of("a|b")
+    empty = DFA(['a', 'b'], None, StateCollection())
+    assert empty.is_subset(dfa) and not dfa.is_subset(empty)
+    assert empty.equivalent(empty)
+    assert dfa.counterexample(empty) == "a"
+    dead = DFA(['a'], State('x'), StateCollection())
+    assert dead.equivalent(empty) and empty.equivalent(dead)
+
+
+def test_long_chains():
+    # long chains: no recursion, near-linear number of pairs
+    n = 20000
+    chain1 = [State(f"p{i}", acc=i % 7 == 0) for i in range(n)]
+    chain2 = [State(f"q{i}", acc=i % 7 == 0) for i in range(n)]
+    for i in range(n - 1):
+        chain1[i].add_transition(chain1[i + 1], 'a')
+        chain2[i].add_transition(chain2[i + 1], 'a')
+    dfa1 = DFA(['a'], chain1[0], StateCollection(chain1))
+    dfa2 = DFA(['a'], chain2[0], StateCollection(chain2))
+    assert dfa1.equivalent(dfa2)
+    chain2[-1].acc = not chain2[-1].acc
+    assert dfa1.counterexample(dfa2) == 'a' * (n - 1)
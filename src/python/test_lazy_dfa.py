@@ -0,0 +1,59 @@
+import random
+import re
+from src.python.lazy_dfa import LazyDFA
+from src.python.regex import compile
+from src.python.fixtures import match_spans
+
+
+def test_against_re():
+    rng = random.Random(7)
+    for pattern in ["(a|b)*abb", "a(b|c)*d?", "(ab|a)*(ba|b)+", "[^a]*a"]:
+        lazy = LazyDFA(compile(pattern, ['a', 'b', 'c', 'd']))
+        regex = re.compile(pattern)
+        for _ in range(200):
+            text = ''.join(rng.choice('abcd')
+                           for _ in range(rng.randint(0, 10)))
+            assert lazy.fullmatch(text) == bool(regex.fullmatch(text))
+            ends = [k for k in range(len(text) + 1)
+                    if regex.fullmatch(text[:k])]
+            assert lazy.match(text) == ((0, ends[-1]) if ends else None)
+
+
+def test_bounded_cache_on_blowup():
+    # the full DFA has 2^21 states
+    pattern = "(a|b)*a(a|b){20}"
+    lazy = LazyDFA(compile(pattern), max_states=64)
+    regex = re.compile(pattern)
+    rng = random.Random(8)
+    for _ in range(20):
+        text = ''.join(rng.choice('ab') for _ in range(rng.randint(15, 300)))
+        assert lazy.fullmatch(text) == bool(regex.fullmatch(text))
+        assert len(lazy.cache) <= 64
+    assert lazy.stats['evictions'] > 0
+    assert lazy.stats['fallbacks'] > 0
+
+
+def test_search_and_bytes():
+    lazy = LazyDFA(compile("ab+"))
+    assert lazy.search("xxabbyab") == (2, 5)
+    assert list(lazy.finditer(b"ab abb aabx")) == [(0, 2), (3, 6), (8, 10)]
+
+
+def test_search_two_phase():
+    rng = random.Random(9)
+    for pattern in ["(a|b)*abb", "ab+", "a|a*b", "b*", "(ab|a)(c|bcd)",
+                    "[^a]*a", "[a-c]x|c", "abcd|c"]:
+        lazy = LazyDFA(compile(pattern))
+        for _ in range(50):
+            text = ''.join(rng.choice('abcdx')
+                           for _ in range(rng.randint(0, 30)))
+            for pos in [0, 2]:
+                expected = match_spans(lazy, text, pos)
+                assert list(lazy.finditer(text, pos)) == expected, \
+                    (pattern, text)
+                assert lazy.search(text, pos) == \
+                    (expected[0] if expected else None)
+    # no scan from every position (was quadratic)
+    lazy = LazyDFA(compile("a*b|c"))
+    assert lazy.search("a" * 20000 + "c") == (20000, 20001)
+    assert list(lazy.finditer("a" * 20000)) == []
@@ -0,0 +1,74 @@
+import random
+from src.python.literals import Prefilter, literal_prefixes, \
+    required_substring
+from src.python.matcher import CompiledDFA
+from src.python.regex import compile
+from src.python.fixtures import spans
+
+
+def dfa_of(pattern: str):
+    return compile(pattern).to_DFA(verbose=False).minimize(verbose=False)
+
+
+def test_literal_prefixes():
+    assert literal_prefixes(compile("ERROR: [0-9]+")) == ["ERROR: "]
+    assert literal_prefixes(dfa_of("ERROR: [0-9]+")) == ["ERROR: "]
+    assert literal_prefixes(dfa_of("(foo|bar)x")) == ["barx", "foox"]
+    assert literal_prefixes(dfa_of("[ab]c|d")) == ["ac", "bc", "d"]
+    # a prefix of another literal is enough
+    assert literal_prefixes(dfa_of("ab|abc")) == ["ab"]
+    assert literal_prefixes(dfa_of("a*b")) == ["a", "b"]
+    assert literal_prefixes(dfa_of("x?y")) == ["xy", "y"]
+    assert literal_prefixes(dfa_of("[a-z]+")) == []
+    assert literal_prefixes(dfa_of("(ab)?")) == []
+    assert literal_prefixes(dfa_of("a{40}"), length=4) == ["aaaa"]
+    # too many literals: the fewest of a shorter length
+    assert literal_prefixes(dfa_of("x[a-e][a-e]")) == ["x"]
+    assert literal_prefixes(dfa_of("[a-e][a-e]x"), limit=5) == \
+        ["a", "b", "c", "d", "e"]
+
+
+def test_required_substring():
+    assert required_substring(dfa_of("[a-z]+@example\\.com")) == \
+        "@example.com"
+    assert required_substring(dfa_of("[0-9]+ ERROR [a-z]*")) == " ERROR "
+    assert required_substring(dfa_of("(ab|cd)x")) == "x"
+    assert required_substring(dfa_of("a|b")) == ""
+    assert required_substring(dfa_of("x*")) == ""
+    assert required_substring(dfa_of("a(bc)*d")) == "d"
+
+
+def test_prefilter():
+    prefilter = Prefilter.of(dfa_of("[a-z]+@example\\.com"))
+    assert prefilter.prefixes == [] and prefilter.required == "@example.com"
+    assert prefilter.finder("no address here") is None
+    assert Prefilter.of(dfa_of("[a-z]*")) is None
+    find = Prefilter(["ab", "ba"]).finder(b"xxbaxab")
+    assert [find(p) for p in range(8)] == [2, 2, 2, 5, 5, 5, -1, -1]
+    assert Prefilter(["€"]).finder(b"abc") is None
+
+
+def test_prefiltered_finditer():
+    rng = random.Random(24)
+    for pattern in ["ab+", "(ab|a)(c|bcd)", "ab|bc|d!", "x(a|é)+[b-z]",
+                    "x[a-d]*é", "[a-d]+x", "d!|ca"]:
+        matcher = CompiledDFA(dfa_of(pattern))
+        assert matcher._prefilter_of() is not None
+        for _ in range(50):
+            text = ''.join(rng.choice('abcdxé!')
+                           for _ in range(rng.randint(0, 30)))
+            assert list(matcher.finditer(text)) == spans(matcher, text)
+            expected = spans(matcher, text)
+            assert matcher.search(text) == (expected[0] if expected
+                                            else None)
+            assert list(matcher.finditer(text, 3)) == \
+                [(3 + s, 3 + e) for s, e in spans(matcher, text[3:])]
+            data = text.encode('latin-1', 'replace')
+            assert list(matcher.finditer(data)) == spans(matcher, data)
+            assert list(matcher.finditer(memoryview(data))) == \
+                spans(matcher, data)
+    # failing scans from every literal: two phases take over
+    matcher = CompiledDFA(compile("x[a-z]*y").to_DFA(verbose=False))
+    text = "x" * 50000 + "!y"
+    assert list(matcher.finditer(text)) == []
+    assert list(matcher.finditer(text + "xy")) == [(50002, 50004)]
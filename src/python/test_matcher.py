@@ -0,0 +1,181 @@
+import io
+import mmap
+import random
+import re
+import tracemalloc
+from src.python.fixtures import abb_nfa, ab_plus_dfa, spans
+from src.python.compact import UNDEFINED
+from src.python.matcher import CompiledDFA
+from src.python.regex import compile
+
+
+def test_accepts():
+    dfa = abb_nfa().to_DFA(verbose=False)
+    assert dfa.accepts("ababb")
+    assert not dfa.accepts("abab")
+    assert not dfa.accepts("abbc")
+
+
+def test_against_re():
+    matcher = CompiledDFA(abb_nfa().to_DFA(verbose=False).minimize(
+        verbose=False))
+    pattern = re.compile("(a|b)*abb")
+    rng = random.Random(5)
+    for _ in range(200):
+        text = ''.join(rng.choice('ab') for _ in range(rng.randint(0, 12)))
+        assert matcher.fullmatch(text) == bool(pattern.fullmatch(text))
+        assert matcher.fullmatch(text.encode()) == \
+            bool(pattern.fullmatch(text))
+
+
+def test_match_search_finditer():
+    matcher = CompiledDFA(ab_plus_dfa())
+    assert matcher.match("abbbc") == (0, 4)
+    assert matcher.match("cab") is None
+    assert matcher.match("cab", 1) == (1, 3)
+    assert matcher.search("xxabbyab") == (2, 5)
+    assert matcher.search(b"xxabbyab") == (2, 5)
+    assert matcher.search("aaaa") is None
+    assert list(matcher.finditer("ab abb aabx")) == [(0, 2), (3, 6), (8, 10)]
+    assert list(matcher.finditer(b"ab abb aabx")) == [(0, 2), (3, 6), (8, 10)]
+    assert list(matcher.finditer(bytearray(b"zab"))) == [(1, 3)]
+
+
+def test_finditer_two_phase():
+    rng = random.Random(23)
+    for pattern in ["(a|b)*abb", "ab+", "a|a*b", "b*", "(ab|a)(c|bcd)",
+                    "[^a]*a", "[a-c]x|c", "(a|é)+[b-z]"]:
+        matcher = CompiledDFA(compile(pattern).to_DFA(verbose=False)
+                              .minimize(verbose=False))
+        for _ in range(50):
+            text = ''.join(rng.choice('abcdxé!')
+                           for _ in range(rng.randint(0, 30)))
+            assert list(matcher.finditer(text)) == spans(matcher, text)
+            assert list(matcher.finditer(text, 2)) == \
+                [(2 + s, 2 + e) for s, e in spans(matcher, text[2:])]
+    # no scan from the positions where no match starts (was quadratic)
+    matcher = CompiledDFA(compile("a[a-z]*b").to_DFA(verbose=False))
+    assert list(matcher.finditer("a" * 50000 + "b")) == [(0, 50001)]
+    assert list(matcher.finditer("a" * 50000)) == []
+
+
+def test_search_one_pass():
+    rng = random.Random(23)
+    for pattern in ["(a|b)*abb", "ab+", "a|a*b", "b*", "(ab|a)(c|bcd)",
+                    "[^a]*a", "[a-c]x|c", "a*b|c", "(a|é)+[b-z]"]:
+        matcher = CompiledDFA(compile(pattern).to_DFA(verbose=False)
+                              .minimize(verbose=False))
+        for _ in range(50):
+            text = ''.join(rng.choice('abcdxé!')
+                           for _ in range(rng.randint(0, 30)))
+            expected = spans(matcher, text)
+            assert matcher.search(text) == (expected[0] if expected
+                                            else None)
+            expected = spans(matcher, text[3:])
+            assert matcher.search(text, 3) == \
+                ((3 + expected[0][0], 3 + expected[0][1]) if expected
+                 else None)
+    # no scan from every position (was quadratic)
+    matcher = CompiledDFA(compile("a*b|c").to_DFA(verbose=False))
+    assert matcher.search("a" * 50000 + "c") == (50000, 50001)
+    matcher = CompiledDFA(compile("[a-z]*b|c").to_DFA(verbose=False))
+    assert matcher.search("a" * 50000 + "c") == (50000, 50001)
+    assert matcher.search("a" * 50000) is None
+
+
+def test_reverse_over_budget():
+    # [ab]{8}a: 10 states forward, 2^8 and more reversed
+    dfa = compile("[ab]{8}a").to_DFA(verbose=False).minimize(verbose=False)
+    matcher = CompiledDFA(dfa)
+    matcher.max_derived = 64
+    rng = random.Random(26)
+    for _ in range(50):
+        text = ''.join(rng.choice('abx') for _ in range(rng.randint(0, 60)))
+        assert list(matcher.finditer(text)) == spans(matcher, text)
+    assert matcher._reverse is None
+    assert CompiledDFA(dfa)._reverse_matcher() is not None
+
+
+def test_empty_language():
+    # minimize returns a DFA without states for the empty language
+    dfa = compile("a").to_DFA(verbose=False).intersect(
+        compile("b").to_DFA(verbose=False), minimize=True)
+    assert dfa.start is None
+    assert not dfa.accepts("") and not dfa.accepts("a")
+    matcher = CompiledDFA(dfa)
+    assert matcher.rows == [[]] and matcher.start == UNDEFINED
+    assert not matcher.fullmatch("") and not matcher.fullmatch(b"a")
+    assert matcher.match("a") is None and matcher.search("ab") is None
+    assert list(matcher.finditer("ab")) == []
+    assert list(matcher.stream([b"ab"])) == []
+
+
+def test_accelerate():
+    rng = random.Random(25)
+    for pattern in [".*foo", "[^x]*x", ".*", "(.|\n)*ab", "a[^b]*b.*",
+                    "(ab|a)(c|bcd)", "[^a]*é", "[a-f]+|x.*o"]:
+        dfa = compile(pattern).to_DFA(verbose=False).minimize(verbose=False)
+        fast, slow = CompiledDFA(dfa), CompiledDFA(dfa, accelerate=False)
+        for _ in range(50):
+            text = ''.join(rng.choice('abfox\né')
+                           for _ in range(rng.randint(0, 40)))
+            for t in [text, text.encode('latin-1')]:
+                assert fast.fullmatch(t) == slow.fullmatch(t)
+                assert fast.match(t, 2) == slow.match(t, 2)
+                assert fast.search(t) == slow.search(t)
+                assert list(fast.finditer(t)) == list(slow.finditer(t))
+    # .*foo: the start state loops on all but newline and f
+    matcher = CompiledDFA(compile(".*foo").to_DFA(verbose=False)
+                          .minimize(verbose=False))
+    assert matcher.escapes[str][matcher.start] == ['\n', 'f']
+    assert matcher.escapes[bytes][matcher.start] == [b'\n', b'f']
+    line = "x" * 100000 + "foo"
+    assert matcher.fullmatch(line) and matcher.match(line + "\nfoo") == \
+        (0, 100003)
+    assert CompiledDFA(compile("ab").to_DFA(verbose=False)).escapes[bytes] \
+        .any() is False
+
+
+def test_stream():
+    rng = random.Random(15)
+    for pattern in ["(a|b)*abb", "ab+", "a|a*b", "b*", "(ab|a)(c|bcd)",
+                    "[^a]*a"]:
+        matcher = CompiledDFA(compile(pattern).to_DFA(verbose=False))
+        for _ in range(50):
+            data = bytes(rng.choice(b'abcd')
+                         for _ in range(rng.randint(0, 40)))
+            expected = list(matcher.finditer(data))
+            chunks, i = [], 0
+            while i < len(data):
+                n = rng.randint(1, 5)
+                chunks.append(data[i:i + n])
+                i += n
+            assert list(matcher.stream(chunks)) == expected, (pattern, data)
+            assert list(matcher.stream(io.BytesIO(data), 3)) == expected
+            assert list(matcher.stream(data, 7)) == expected
+
+
+def test_stream_memory():
+    # chunks the scan has passed are dropped, also with a pending match
+    for pattern, count in [("ab", 0), ("a[^x]*x", 0), ("ac", 512)]:
+        matcher = CompiledDFA(compile(pattern).to_DFA(verbose=False))
+        peaks = []
+        for n in [4, 32]:
+            tracemalloc.start()
+            assert sum(1 for _ in matcher.stream(
+                b'ac' * 512 for _ in range(n))) == count * n
+            peaks.append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+        assert peaks[1] < 2 * peaks[0], (pattern, peaks)
+
+
+def test_stream_mmap(tmp_path):
+    path = tmp_path / "log.txt"
+    path.write_bytes(b"xx abbb ab\n" * 1000)
+    matcher = CompiledDFA(ab_plus_dfa())
+    with open(path, 'rb') as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+            spans = list(matcher.stream(m, chunk_size=4096))
+    assert len(spans) == 2000
+    assert spans[:2] == [(3, 7), (8, 10)]
+    assert spans[-1] == (10997, 10999)
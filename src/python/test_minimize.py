@@ -0,0 +1,178 @@
+import random
+from src.python.states import StateCollection, State
+from src.python.finite_automaton import DFA
+from src.python.fixtures import deadstate_dfa, example_dfa, isomorphic, \
+    random_dfa
+from src.python.regex import compile
+from src.python.tracing import JsonTracer
+
+
+def test_example():
+    hopcroft = example_dfa().minimize(verbose=False)
+    table = example_dfa().minimize(verbose=False, algorithm='table-filling')
+    assert len(hopcroft.sc.states_by_name) == 4
+    assert isomorphic(hopcroft, table)
+
+
+def test_deadstate_removal():
+    hopcroft = deadstate_dfa().minimize(verbose=False)
+    table = deadstate_dfa().minimize(verbose=False, algorithm='table-filling')
+    assert len(hopcroft.sc.states_by_name) == 1
+    assert isomorphic(hopcroft, table)
+
+
+def test_random_cross_check():
+    rng = random.Random(1)
+    for _ in range(50):
+        n = rng.randint(1, 25)
+        alphabet = ['a', 'b', 'c'][:rng.randint(1, 3)]
+        density = rng.choice([1.0, 0.7])
+        seed = rng.random()
+        dfa1 = random_dfa(random.Random(seed), n, alphabet, density)
+        dfa2 = random_dfa(random.Random(seed), n, alphabet, density)
+        hopcroft = dfa1.minimize(dead_state_removal=False, verbose=False)
+        table = dfa2.minimize(dead_state_removal=False, verbose=False,
+                              algorithm='table-filling')
+        assert isomorphic(hopcroft, table)
+
+
+def test_minimize_is_idempotent():
+    rng = random.Random(2)
+    for _ in range(20):
+        dfa = random_dfa(rng, 40, ['a', 'b'])
+        once = dfa.minimize(verbose=False)
+        twice = once.minimize(verbose=False)
+        assert isomorphic(once, twice)
+
+
+def test_dead_state_on_cycle():
+    # s1 is alive through s0, which is still undecided when s1 is checked
+    s0 = State("s0")
+    s1 = State("s1")
+    s2 = State("s2", acc=True)
+    s0.add_transition(s1, 'a')
+    s0.add_transition(s2, 'b')
+    s1.add_transition(s0, 'a')
+    dfa = DFA(['a', 'b'], s0, StateCollection([s0, s1, s2]))
+    assert dfa.dead_states() == []
+    for algorithm in ['hopcroft', 'table-filling']:
+        minimized = dfa.minimize(verbose=False, algorithm=algorithm)
+        assert minimized.accepts("aab")
+
+
+def test_random_cross_check_dead_state_removal():
+    rng = random.Random(6)
+    for _ in range(50):
+        n = rng.randint(1, 25)
+        seed = rng.random()
+        dfa1 = random_dfa(random.Random(seed), n, ['a', 'b'], 0.6)
+        dfa2 = random_dfa(random.Random(seed), n, ['a', 'b'], 0.6)
+        hopcroft = dfa1.minimize(verbose=False)
+        table = dfa2.minimize(verbose=False, algorithm='table-filling')
+        assert isomorphic(hopcroft, table)
+
+
+def test_trim():
+    rng = random.Random(9)
+    for _ in range(50):
+        dfa = random_dfa(rng, rng.randint(1, 30), ['a', 'b'], 0.6)
+        trimmed = dfa.trim()
+        useful = dfa.reachable() & dfa.coaccessible()
+        assert set(trimmed.sc.states_by_name) == \
+            {state.name for state in useful} | {dfa.start.name}
+        assert not trimmed.dead_states() or \
+            trimmed.dead_states() == [trimmed.start]
+        assert isomorphic(trimmed.minimize(verbose=False),
+                          dfa.minimize(verbose=False, trim=True))
+
+
+def test_trim_long_chain():
+    n = 100000
+    states = [State(f"s{i}", acc=(i == n - 1)) for i in range(n)]
+    for i in range(n - 1):
+        states[i].add_transition(states[i + 1], 'a')
+    states.append(State("dead"))
+    states[0].add_transition(states[-1], 'b')
+    dfa = DFA(['a', 'b'], states[0], StateCollection(states))
+    assert [state.name for state in dfa.dead_states()] == ["dead"]
+    assert len(dfa.trim().sc.states_by_name) == n
+
+
+def test_brzozowski_cross_check():
+    rng = random.Random(19)
+    for _ in range(50):
+        dfa = random_dfa(rng, rng.randint(1, 25), ['a', 'b'],
+                         rng.choice([1.0, 0.6]))
+        # brzozowski drops unreachable states as well
+        assert isomorphic(dfa.minimize(verbose=False, trim=True),
+                          dfa.minimize(verbose=False,
+                                       algorithm='brzozowski'))
+    for pattern in ["(a|b)*a(a|b){6}(a|b)*", "(ab|a)*(ba|b)+", "a*b*|c"]:
+        dfa = compile(pattern, ['a', 'b', 'c']).to_DFA(verbose=False)
+        assert isomorphic(dfa.minimize(verbose=False),
+                          dfa.minimize(verbose=False,
+                                       algorithm='brzozowski'))
+
+
+def extend(rng: random.Random, dfa: DFA, new_states: int) -> None:
+    """ Add states and transitions on labels that have none yet """
+    states = list(dfa.sc)
+    for i in range(new_states):
+        state = State(f"n{i}", acc=rng.random() < 0.3)
+        dfa.sc.add(state)
+        states.append(state)
+    for _ in range(new_states + 1):
+        state = rng.choice(states)
+        for c in dfa.alphabet:
+            if not state.get_label_transitions(c):
+                state.add_transition(rng.choice(states), c)
+                break
+
+
+def test_incremental_cross_check():
+    rng = random.Random(20)
+    for _ in range(50):
+        minimal = random_dfa(rng, rng.randint(1, 40), ['a', 'b'],
+                             0.6).minimize(verbose=False)
+        if minimal.start is None:
+            continue
+        assert minimal.changed_states() == []
+        extend(rng, minimal, rng.randint(0, 3))
+        incremental = minimal.minimize(verbose=False,
+                                       algorithm='incremental')
+        assert isomorphic(incremental, minimal.minimize(verbose=False))
+        # the result can be extended and re-minimized again
+        extend(rng, incremental, 2)
+        assert isomorphic(
+            incremental.minimize(verbose=False, algorithm='incremental'),
+            incremental.minimize(verbose=False))
+
+
+def test_auto_engine():
+    tracer = JsonTracer()
+    dfa = compile("(a|b)*a(a|b){8}(a|b)*", ['a', 'b']).to_DFA(verbose=False)
+    minimal = dfa.minimize(algorithm='auto', tracer=tracer)
+    assert minimal.minimized_by == 'brzozowski'
+    assert tracer.events[0]['event'] == 'engine'
+    assert isomorphic(minimal, dfa.minimize(verbose=False))
+
+    # a new word only affects the states of its prefix
+    rng = random.Random(22)
+    words = {''.join(rng.choice('abcd') for _ in range(rng.randint(3, 9)))
+             for _ in range(60)}
+    minimal = compile('|'.join(sorted(words))).to_DFA(
+        verbose=False).minimize(verbose=False)
+    state = minimal.start
+    while all(state.get_label_transitions(c) for c in 'abcd'):
+        state = state.get_label_transitions('a')[0]
+    new_state = State("new", acc=True)
+    minimal.sc.add(new_state)
+    state.add_transition(new_state, next(
+        c for c in 'abcd' if not state.get_label_transitions(c)))
+    incremental = minimal.minimize(verbose=False, algorithm='auto')
+    assert incremental.minimized_by == 'incremental'
+    assert isomorphic(incremental, minimal.minimize(verbose=False))
+
+    small = compile("ab*", ['a', 'b']).to_DFA(verbose=False)
+    assert small.minimize(verbose=False, algorithm='auto').minimized_by \
+        == 'hopcroft'
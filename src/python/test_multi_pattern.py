@@ -0,0 +1,58 @@
+import random
+import re
+from src.python.compact import CompactDFA
+from src.python.multi_pattern import MultiPattern, union
+from src.python.parallel import parallel_to_DFA
+from src.python.regex import compile
+from src.python.fixtures import isomorphic
+
+PATTERNS = ["ab+", "b+c", "[a-c]d", "abc|d", "a(b|c)*a", "\\d+"]
+ALPHABET = list("abcd0123456789")
+
+
+def test_union_accept_ids():
+    nfa = union([compile(p, ALPHABET) for p in PATTERNS],
+                ids=[10, 11, 12, 13, 14, 15])
+    for algorithm in ['hopcroft', 'table-filling']:
+        dfa = nfa.to_DFA(verbose=False).minimize(verbose=False,
+                                                  algorithm=algorithm)
+        for text, ids in [("abb", {10}), ("bc", {11}), ("d", {13}),
+                          ("abc", {13}), ("ad", {12}), ("aba", {14}),
+                          ("42", {15}), ("ac", set())]:
+            state = dfa.start
+            for c in text:
+                state = state.get_label_transitions(c)[0]
+            assert state.accept_ids == ids, (algorithm, text)
+            assert state.acc == bool(ids)
+
+
+def test_ids_keep_states_apart():
+    # a and b accept the same language; only the ids tell them apart
+    dfa = union([compile("a"), compile("b")]).to_DFA(verbose=False)
+    assert len(dfa.minimize(verbose=False).sc.states_by_name) == 3
+    plain = compile("a|b").to_DFA(verbose=False)
+    assert len(plain.minimize(verbose=False).sc.states_by_name) == 2
+
+    hopcroft = dfa.minimize(verbose=False)
+    table = dfa.minimize(verbose=False, algorithm='table-filling')
+    assert isomorphic(hopcroft, table)
+
+    ids = {state.name: state.accept_ids for state in hopcroft.sc}
+    copy = CompactDFA.from_dfa(hopcroft).to_dfa()
+    assert {state.name: state.accept_ids for state in copy.sc} == ids
+    parallel = parallel_to_DFA(union([compile("a"), compile("b")]), 2,
+                               min_batch=1)
+    assert [state.accept_ids for state in parallel.sc] == \
+        [state.accept_ids for state in dfa.sc]
+
+
+def test_scan_against_re():
+    rng = random.Random(16)
+    multi = MultiPattern(PATTERNS)
+    regexes = [re.compile(p) for p in PATTERNS]
+    for _ in range(300):
+        text = ''.join(rng.choice('abcd1 ')
+                       for _ in range(rng.randint(0, 12)))
+        expected = {i for i, r in enumerate(regexes) if r.search(text)}
+        assert multi.scan(text) == expected, text
+        assert multi.scan(text.encode()) == expected, text
@@ -0,0 +1,36 @@
+from src.python.finite_automaton import DFA
+from src.python.parallel import parallel_to_DFA
+from src.python.regex import compile
+from src.python.fixtures import example2_nfa, nth_from_last_nfa, \
+    out_of_alphabet_nfa
+
+
+def table(dfa: DFA) -> dict:
+    """ state name -> (accepting, {label: target name}) """
+    return {state.name: (state.acc,
+                         {label: [t.to_state.name for t in transitions]
+                          for label, transitions
+                          in state.transitions.tbl.items()})
+            for state in dfa.sc}
+
+
+def test_same_as_sequential():
+    nfas = [example2_nfa(), nth_from_last_nfa(10), out_of_alphabet_nfa(),
+            compile("(a|b)*a(a|b){6}c?"), compile("[a-y]+z|\\w*x[^a-c]"),
+            compile("(ab|c)*(a|[b-d]){4}", ['a', 'b', 'c', 'd', 'e'])]
+    for nfa in nfas:
+        sequential = nfa.to_DFA(verbose=False)
+        for min_batch in [1, 64]:
+            parallel = parallel_to_DFA(nfa, workers=2, min_batch=min_batch)
+            assert parallel.start.name == sequential.start.name
+            assert table(parallel) == table(sequential)
+
+
+def test_to_DFA_workers():
+    dfa = nth_from_last_nfa(8).to_DFA(verbose=False, workers=2)
+    assert len(dfa.sc.states_by_name) == 2 ** 8
+
+
+def test_out_of_alphabet_label():
+    assert out_of_alphabet_nfa().to_DFA(verbose=False).accepts("z")
+    assert parallel_to_DFA(out_of_alphabet_nfa(), workers=2).accepts("z")
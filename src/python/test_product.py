@@ -0,0 +1,73 @@
+import itertools
+import random
+from src.python.states import StateCollection
+from src.python.finite_automaton import DFA
+from src.python.regex import compile
+from src.python.fixtures import random_dfa
+
+OPERATIONS = {'intersect': lambda a, b: a and b,
+              'union': lambda a, b: a or b,
+              'difference': lambda a, b: a and not b}
+
+
+def words(alphabet, max_len: int):
+    for n in range(max_len + 1):
+        for t in itertools.product(alphabet, repeat=n):
+            yield ''.join(t)
+
+
+def dfa_of(pattern: str, alphabet=None) -> DFA:
+    return compile(pattern, alphabet).to_DFA(verbose=False)
+
+
+def test_random_cross_check():
+    rng = random.Random(9)
+    for _ in range(30):
+        dfa1 = random_dfa(rng, rng.randint(1, 8), ['a', 'b'], 0.8)
+        dfa2 = random_dfa(rng, rng.randint(1, 8), ['a', 'b'], 0.8)
+        for name, op in OPERATIONS.items():
+            res = getattr(dfa1, name)(dfa2)
+            minimized = getattr(dfa1, name)(dfa2, minimize=True)
+            assert res.equivalent(minimized)
+            for w in words('ab', 6):
+                assert res.accepts(w) == op(dfa1.accepts(w), dfa2.accepts(w))
+        complement = dfa1.complement()
+        for w in words('ab', 6):
+            assert complement.accepts(w) != dfa1.accepts(w)
+        assert complement.complement().equivalent(dfa1)
+
+
+def test_char_sets():
+    letters, digits_x = dfa_of("[a-z]+"), dfa_of("[0-9a-c]x")
+    union = letters.union(digits_x)
+    assert union.accepts("zz") and union.accepts("1x") and \
+        not union.accepts("1")
+    assert letters.intersect(digits_x).equivalent(dfa_of("[a-c]x"))
+    assert letters.difference(digits_x, minimize=True).equivalent(
+        dfa_of("[a-z]|[a-z][a-wyz]|[d-z]x|[a-z][a-z][a-z]+"))
+    complement = letters.complement()
+    assert complement.accepts("") and complement.accepts("A") and \
+        complement.accepts("a1") and not complement.accepts("ab")
+
+
+def test_one_pass_filter():
+    # "matches A but not B" as one DFA, mixing CharSet and character labels
+    a = dfa_of("[a-z]*error[a-z]*")
+    b = dfa_of("(a|b|c|d|e|f|g|h|i|j|k|l|m|n|o|p|q|r|s|t|u|v|w|x|y|z)*"
+               "errors(a|b|c|d|e|f|g|h|i|j|k|l|m|n|o|p|q|r|s|t|u|v|w|x|y|z)*")
+    f = a.difference(b, minimize=True)
+    assert f.accepts("someerror") and not f.accepts("noerrorshere")
+    assert f.counterexample(a, subset=True) is None
+    assert f.intersect(b).minimize(verbose=False).start is None
+
+
+def test_empty_and_names():
+    empty = DFA(['a'], None, StateCollection())
+    a = dfa_of("a")
+    res = a.intersect(empty)
+    assert len(res.sc.states_by_name) == 1 and not res.start.acc
+    assert a.union(empty).equivalent(a)
+    res = a.difference(dfa_of("b"))
+    assert [s.name for s in res.sc] == ['P1', 'P2']
+    assert res.start.origin == f"({a.start.name},{dfa_of('b').start.name})"
+    assert res.sc.get('P2').origin.endswith(",-)")
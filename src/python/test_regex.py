@@ -0,0 +1,78 @@
+import itertools
+import re
+from src.python.matcher import CompiledDFA
+from src.python.regex import compile
+
+PATTERNS = [
+    "(a|b)*abb",
+    "a(b|c)*d?",
+    "(ab|a)*(ba|b)+",
+    "[abc]+d",
+    "[^a]*a",
+    "a.c",
+    "(a|)b",
+    "((a|b)(c|d))*",
+    "a{3}",
+    "(ab){1,3}c",
+    "a{2,}b?",
+    "\\.a\\|",
+    "[a-c]{0,2}d",
+    "\\D\\W?",
+    "\\S\\x61{,2}",
+    "[\\Wa]+",
+]
+ALPHABET = ['a', 'b', 'c', 'd', '.', '|']
+
+
+def test_against_re():
+    texts = [''.join(t) for n in range(6)
+             for t in itertools.product('abcd.|', repeat=n)]
+    for pattern in PATTERNS:
+        nfa = compile(pattern, ALPHABET)
+        matcher = CompiledDFA(nfa.to_DFA(verbose=False).minimize(
+            verbose=False))
+        regex = re.compile(pattern)
+        for text in texts:
+            assert matcher.fullmatch(text) == bool(regex.fullmatch(text)), \
+                (pattern, text)
+
+
+def test_alphabet_from_pattern():
+    nfa = compile("(b|a)*c")
+    assert nfa.alphabet == ['a', 'b', 'c']
+    assert len(nfa.sc.accepting) == 1
+
+
+def test_minimize_keeps_language():
+    # classes outside the alphabet of the pattern ([ab] next to b): to_DFA
+    # gives single-character labels the alphabet does not list
+    texts = [''.join(t) for n in range(4)
+             for t in itertools.product('abc', repeat=n)]
+    for pattern in ["[ab]|b", "(b|(([ab])?|(c)+))", "[a-c]c*|c"]:
+        dfa = compile(pattern).to_DFA(verbose=False)
+        for algorithm in ['hopcroft', 'table-filling', 'brzozowski']:
+            minimized = dfa.minimize(verbose=False, algorithm=algorithm)
+            for text in texts:
+                assert minimized.accepts(text) == dfa.accepts(text), \
+                    (pattern, algorithm, text)
+    matcher = CompiledDFA(compile("(b|(([ab])?|(c)+))").to_DFA(
+        verbose=False).minimize(verbose=False))
+    assert matcher.match("abc") == (0, 1)
+
+
+def test_errors():
+    for pattern in ["(a", "a)", "*a", "[ab", "a\\", "a{3,1}", "[b-a]",
+                    "a\\b", "\\Z", "(a)\\1", "\\x4", "a{", "a{x}", "a{,}",
+                    "a{1,2,3}", "{2}"]:
+        try:
+            compile(pattern)
+        except Exception as e:
+            assert str(e).startswith("Regex Error")
+        else:
+            assert False, pattern
+
+
+def test_linear_size():
+    # Thompson construction: O(1) states per symbol and operator
+    nfa = compile("(ab|c)*" * 1000)
+    assert len(nfa.sc.states_by_name) <= 10 * 1000
@@ -0,0 +1,52 @@
+import random
+from src.python.finite_automaton import DFA
+from src.python.matcher import CompiledDFA
+from src.python.regex import compile
+from src.python.serialize import MappedDFA, dumps, loads
+
+
+def test_roundtrip(tmp_path):
+    rng = random.Random(17)
+    for pattern in ["(a|b)*abb", "ab+|c", "\\w+@[a-z]+\\.com", "[^a]*a",
+                    "x*"]:
+        dfa = compile(pattern).to_DFA(verbose=False).minimize(verbose=False)
+        path = tmp_path / "dfa.bin"
+        dfa.save(str(path))
+        mapped = DFA.load(str(path))
+        assert isinstance(mapped, MappedDFA)
+        compiled = CompiledDFA(dfa)
+        for _ in range(100):
+            text = ''.join(rng.choice("abcx@.moé")
+                           for _ in range(rng.randint(0, 12)))
+            assert mapped.fullmatch(text) == compiled.fullmatch(text)
+            assert list(mapped.finditer(text)) == \
+                list(compiled.finditer(text))
+            data = text.encode()
+            assert list(mapped.stream([data])) == \
+                list(compiled.finditer(data))
+
+
+def test_format():
+    data = dumps(compile("ab+").to_DFA(verbose=False).minimize(verbose=False))
+    assert data[:8] == b'IPSDFA\x00\x00'
+    assert loads(data).match("abbbc") == (0, 4)
+    for bad in [data[:-4], b'X' + data[1:], data[:8] + b'\x09' + data[9:]]:
+        try:
+            loads(bad)
+        except Exception as e:
+            assert str(e).startswith("Load Error")
+        else:
+            assert False
+
+
+def test_mapped_stays_lazy():
+    # x[ab]*a[ab]{9}: 1025 states, a prefilter on x for CompiledDFA
+    dfa = compile("x[ab]*a[ab]{9}").to_DFA(verbose=False).minimize(
+        verbose=False)
+    mapped, compiled = loads(dumps(dfa)), CompiledDFA(dfa)
+    text = "ab" * 50 + "xb" + "a" * 20 + "xyz"
+    assert mapped.search(text) == compiled.search(text) == (100, 122)
+    assert list(mapped.finditer(text)) == list(compiled.finditer(text))
+    assert mapped._prefilter is None and mapped._reverse is None
+    assert compiled._prefilter is not None
+    assert len(mapped.rows) < 30
@@ -0,0 +1,131 @@
+from src.python.states import StateCollection, State
+from src.python.finite_automaton import NFA
+from src.python.fixtures import example2_nfa, nth_from_last_nfa
+
+
+def test_example2():
+    dfa = example2_nfa().to_DFA(verbose=False)
+    # figure 1.9: four DFA states, one of them accepting
+    assert len(dfa.sc.states_by_name) == 4
+    assert len(dfa.sc.accepting) == 1
+
+
+def test_subset_blowup():
+    dfa = nth_from_last_nfa(8).to_DFA(verbose=False)
+    assert len(dfa.sc.states_by_name) == 2 ** 8
+    assert len(dfa.minimize(verbose=False).sc.states_by_name) == 2 ** 8
+
+
+def test_epsilon_closures():
+    # 1 -> 2 -> 3 -> 1 (cycle) and 3 -> 4
+    s = [State(str(i)) for i in range(5)]
+    s[1].add_transition(s[2])
+    s[2].add_transition(s[3])
+    s[3].add_transition(s[1])
+    s[3].add_transition(s[4])
+    s[0].add_transition(s[1], 'a')
+    nfa = NFA(['a'], s[0], StateCollection(s))
+    closures = nfa.epsilon_closures()
+    assert closures.closure(s[0]) == {s[0]}
+    assert closures.closure(s[1]) is closures.closure(s[2])
+    assert closures.closure(s[1]) == {s[1], s[2], s[3], s[4]}
+    assert closures.closure(s[4]) == {s[4]}
+    for state in s:
+        assert closures.closure(state) == state.epsilon_closure()
+    assert nfa.ec([s[0], s[4]]).key() == {'0', '4'}
+
+    # adding a transition invalidates the table
+    s[4].add_transition(s[0])
+    assert nfa.epsilon_closures().closure(s[4]) == {s[4], s[0]}
+
+
+class CountingStates(StateCollection):
+    """ StateCollection that counts iterations over its states """
+    __slots__ = ()
+    iterations = 0
+
+    def __iter__(self):
+        CountingStates.iterations += 1
+        return super().__iter__()
+
+
+def test_closures_kept_in_to_dfa():
+    # epsilon edges to both ends of the nth_from_last chain
+    nfa = nth_from_last_nfa(8)
+    states = list(nfa.sc)
+    other = State("other")
+    states[0].add_transition(other)
+    other.add_transition(states[0])
+    nfa.sc.add(other)
+    closures = nfa.epsilon_closures()
+    nfa.sc.__class__ = CountingStates
+    dfa = nfa.to_DFA(verbose=False)
+    assert len(dfa.sc.states_by_name) == 2 ** 8
+    # no rebuild and no scan of the NFA states per ec()
+    assert nfa.epsilon_closures() is closures
+    assert CountingStates.iterations < 10
+
+    # an epsilon transition elsewhere: one scan, then no rebuild
+    State("x").add_transition(State("y"))
+    assert nfa.epsilon_closures() is closures
+    # an epsilon transition of the NFA: rebuilt
+    states[-1].add_transition(states[0])
+    assert nfa.epsilon_closures() is not closures
+
+
+def test_deep_epsilon_chain():
+    n = 50000
+    states = [State(f"q{i}", acc=(i == n - 1)) for i in range(n)]
+    for i in range(n - 1):
+        states[i].add_transition(states[i + 1])
+    states[-1].add_transition(states[0], 'a')
+    nfa = NFA(['a'], states[0], StateCollection(states))
+    assert len(states[0].epsilon_closure()) == n
+    dfa = nfa.to_DFA(verbose=False)
+    assert len(dfa.sc.states_by_name) == 1
+    assert dfa.accepts("aaa")
+
+
+def test_alphabet_classes():
+    from src.python.regex import compile
+    alphabet = [chr(c) for c in range(ord('a'), ord('z') + 1)] + ['0', '1']
+    nfa = compile("[a-w]+x[yz01]", alphabet)
+    classes = nfa.alphabet_classes()
+    assert sorted(map(sorted, classes)) == sorted(
+        [list('abcdefghijklmnopqrstuvw'), ['x'], ['0', '1', 'y', 'z']])
+    dfa = nfa.to_DFA(verbose=False)
+    assert sorted(map(sorted, dfa.alphabet_classes())) == \
+        sorted(map(sorted, classes))
+    minimized = dfa.minimize(verbose=False)
+    assert len(minimized.sc.states_by_name) == 4
+    assert minimized.accepts("abx0") and not minimized.accepts("abx")
+
+
+def test_lean_transitions():
+    import pickle
+    from src.python.charset import CharSet
+    from src.python.transitions import EPSILON
+    s = [State(str(i)) for i in range(4)]
+    s[0].add_transition(s[1])
+    s[0].add_transition(s[2], 'ε')  # a character, not an epsilon
+    s[0].add_transition(s[3], CharSet([(48, 57)]))
+    s[1].add_transition(s[3], CharSet([(48, 57)]))
+    assert s[0].get_epsilon_transitions() == [s[1]]
+    assert not hasattr(s[0], '__dict__')
+    # equal labels are one object, the epsilon label survives pickling
+    label0, = s[0].transitions.ranges
+    label1, = s[1].transitions.ranges
+    assert label0 is label1
+    copy = pickle.loads(pickle.dumps(s[0]))
+    assert copy.transitions.tbl[EPSILON][0].label is EPSILON
+    assert [state.name for state in copy.get_epsilon_transitions()] == ['1']
+
+
+def test_reverse():
+    from src.python.regex import compile
+    nfa = compile("ab*c|[x-z]d")
+    reverse = nfa.reverse().to_DFA(verbose=False)
+    forward = nfa.to_DFA(verbose=False)
+    for word in ["ac", "abbc", "xd", "zd", "ca", "ab", "d", ""]:
+        assert reverse.accepts(word[::-1]) == forward.accepts(word)
+    assert reverse.reverse().to_DFA(verbose=False).equivalent(forward)
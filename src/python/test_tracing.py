@@ -0,0 +1,44 @@
+import json
+from src.python.regex import compile
+from src.python.tracing import JsonTracer
+from src.python.fixtures import deadstate_dfa, example2_nfa
+
+
+def test_silent(capsys):
+    dfa = example2_nfa().to_DFA(verbose=False)
+    for algorithm in ['hopcroft', 'table-filling']:
+        dfa.minimize(verbose=False, algorithm=algorithm)
+        deadstate_dfa().minimize(verbose=False, algorithm=algorithm)
+    assert capsys.readouterr().out == ''
+
+
+def test_verbose(capsys):
+    example2_nfa().to_DFA()
+    out = capsys.readouterr().out
+    assert "NFA to DFA" in out
+    assert "start = ec({1}) = {1, 2, 5, 6, 7} = s0 (non-acc)" in out
+
+
+def test_json_tracer(capsys):
+    tracer = JsonTracer()
+    example2_nfa().to_DFA(tracer=tracer)
+    deadstate_dfa().minimize(tracer=tracer, algorithm='table-filling')
+    assert capsys.readouterr().out == ''
+
+    events = json.loads(tracer.to_json())
+    kinds = [e['event'] for e in events]
+    assert kinds[0] == 'begin' and kinds.count('end') == 2
+    assert sum(1 for e in events if e['event'] == 'dfa_move' and e['new']) \
+        == 3
+    dead = [e for e in events if e['event'] == 'dead_states'][0]
+    assert dead['states'] == ['s3']
+
+
+def test_json_tracer_charset_labels():
+    tracer = JsonTracer()
+    dfa = compile("[a-c]x").to_DFA(tracer=tracer)
+    for algorithm in ['hopcroft', 'table-filling']:
+        dfa.minimize(tracer=tracer, algorithm=algorithm)
+    events = json.loads(tracer.to_json())
+    assert {e['label'] for e in events if e['event'] == 'dfa_move'} == \
+        {'[a-c]', 'x'}
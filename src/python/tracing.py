@@ -0,0 +1,160 @@
+import json
+from typing import List, Optional
+
+
+class Tracer:
+    """ Receives the steps of an algorithm as structured events
+
+    Algorithms only build event data when a tracer is given, so the silent
+    path does no formatting at all. The base class ignores every event.
+    """
+
+    def event(self, kind: str, **data) -> None:
+        pass
+
+
+class JsonTracer(Tracer):
+    """ Records all events, e.g. to inspect a run later """
+
+    def __init__(self) -> None:
+        self.events = []
+
+    def event(self, kind: str, **data) -> None:
+        self.events.append(dict(event=kind, **data))
+
+    def to_json(self, indent: Optional[int] = None) -> str:
+        return json.dumps(self.events, indent=indent)
+
+    def dump(self, path: str) -> None:
+        with open(path, 'w') as f:
+            f.write(self.to_json(indent=2))
+
+
+def set_str(names: List[str]) -> str:
+    """ Set of state names as printed in the text output """
+    return "{" + ", ".join(sorted(names)) + "}"
+
+
+class TextTracer(Tracer):
+    """ Textbook-style printout of NFA to DFA and DFA minimization """
+
+    def __init__(self) -> None:
+        self.output = []
+
+    def event(self, kind: str, **data) -> None:
+        getattr(self, 'on_' + kind)(**data)
+
+    # -- common ------------------------------------------------------------ #
+    def on_begin(self, title: str) -> None:
+        self.output = ['-'*80 + f"\n{title}\n" + '-'*80 + "\n"]
+
+    def on_end(self) -> None:
+        print(''.join(self.output))
+
+    def table_header(self, title: str, alphabet: List[str]) -> None:
+        # 'pseudo'-array header
+        header = f"{title}  " + '  '.join([c for c in alphabet])
+        self.output += [
+            f"\n{header}\n",
+            "-"*(len(header)+1)  # pretty printing array line
+        ]
+
+    # -- NFA to DFA -------------------------------------------------------- #
+    def on_dfa_start(self, nfa_start: str, nfa_set: List[str], state: str,
+                     accepting: bool) -> None:
+        self.output += [
+            f"start = ec({{{nfa_start}}}) = ",
+            f"{set_str(nfa_set)} = {state} ",
+            f"({'accepting' if accepting else 'non-acc'})\n"
+        ]
+
+    def on_dfa_dequeue(self, state: str) -> None:
+        self.output += ["\n"]
+
+    def on_dfa_move(self, state: str, label: str, move_set: List[str],
+                    nfa_set: List[str], to_state: Optional[str], new: bool,
+                    accepting: bool) -> None:
+        self.output += [f"move({state},{label}) = "]
+        if not move_set:
+            self.output += [f"ec({{}}) = undefined\n"]
+        elif new:
+            self.output += [
+                f"ec({set_str(move_set)}) = ",
+                f"{set_str(nfa_set)} = ",
+                f"{to_state} ({'accepting' if accepting else 'non-acc'})\n"
+            ]
+        else:
+            self.output += [f"ec({set_str(move_set)}) = {to_state}\n"]
+
+    # -- minimization ------------------------------------------------------ #
+    def on_engine(self, name: str, reason: str) -> None:
+        # before 'begin', which starts a new printout
+        print(f"Minimization engine: {name} ({reason})")
+
+    def on_dead_states(self, states: List[str], dummy: Optional[str]) -> None:
+        if not states:
+            self.output += ["No dead states detected.\n\n"]
+            return
+        self.output += [f"Dead states detected: {set_str(states)}\n"]
+        if dummy:
+            self.output += [
+                f"Make move() total: adding dummy state {{{dummy}}}\n\n"
+            ]
+        else:
+            self.output += ["\n"]
+
+    def on_initial_groups(self, groups: List[dict]) -> None:
+        for g in groups:
+            kind = 'accepting' if g['accepting'] else 'non-accepting'
+            self.output += [
+                f"{g['name']} = {set_str(g['states']):<13} {kind}\n"
+            ]
+
+    def on_check_group(self, group: str, alphabet: List[str],
+                       rows: List[list]) -> None:
+        self.output += [f"\nChecking {group}:\n"]
+        self.table_header(group, alphabet)
+        for state, row in rows:
+            self.output += [f"\n{state}  {row}"]
+        self.output += ["\n"]
+
+    def on_consistent(self, group: str) -> None:
+        self.output += [f"\n{group} is consistent!\n"]
+
+    def on_split(self, group: str, new_groups: List[dict]) -> None:
+        self.output += [f"\nNot consistent! Split {group} into:\n\n"]
+        for g in new_groups:
+            self.output += [
+                f"{g['name']} = {set_str(g['states'])}\t(row {g['row']})\n"
+            ]
+        self.output += [
+            f"\nMarking {group} obsolete!\n",
+            "Reset queue (unmark groups)\n",
+            "\n--\n"
+        ]
+
+    def on_refined(self, states: int, groups: int) -> None:
+        self.output += [f"{states} states refined into {groups} groups\n"]
+
+    def on_singletons(self, alphabet: List[str], groups: List[dict]) -> None:
+        for g in groups:
+            if g['state'] is not None:
+                self.output += [f"\nFinal table for {g['name']}:\n"]
+                self.table_header(g['name'], alphabet)
+                self.output += [f"\n{g['state']}  {g['row']}"]
+            self.output += ["\n"]
+
+    def on_final_table(self, alphabet: List[str], rows: List[dict],
+                       removed: Optional[str]) -> None:
+        self.output += [f"\nFinal transition table:\n"]
+        self.table_header("  ", alphabet)
+        for r in rows:
+            start = "start, " if r['start'] else ''
+            acc = 'acc' if r['accepting'] else 'non-acc'
+            origin = f"    {r['origin']}" if r.get('origin') else ''
+            self.output += [
+                f"\n{r['name']}  {r['row']}    {start}{acc}{origin}"
+            ]
+        if removed:
+            self.output += [f"\n\nRemoved {removed}"]
+        self.output += ["\n"]
@@ -1,61 +1,119 @@
-from typing import List, Set
+import sys
+from typing import List, Union
+from weakref import WeakValueDictionary
+from src.python.charset import CharSet, label_intervals
+
+
+class Epsilon(str):
+    """ Type of the epsilon label, equal to 'ε' but identified by identity,
+    so a character label 'ε' is not an epsilon transition """
+    __slots__ = ()
+
+    def __reduce__(self):
+        return 'EPSILON'  # pickled by reference, stays the sentinel
+
+
+EPSILON = Epsilon('ε')  # label of every epsilon transition
+
+_charsets = WeakValueDictionary()  # interned CharSet labels
+
+
+def intern_label(label: Union[str, CharSet]) -> Union[str, CharSet]:
+    """ Shared object for equal labels (CharSets of DFAs are often equal) """
+    if isinstance(label, CharSet):
+        return _charsets.setdefault(label, label)
+    return sys.intern(label)
 
 
 class Transition:
 
+    __slots__ = ('to_state', 'label')
+
     def __init__(self, to_state: 'State', label: str = '') -> None:
-        self.epsilon = False
         if to_state is None:
             raise Exception("Transition Error: State cannot be None.")
         self.to_state = to_state
-        self.label = label  # transition label (character)
         if not label:
-            self.label = 'ε'
-            self.epsilon = True
+            label = EPSILON
+        elif isinstance(label, CharSet) or len(label) > 1:
+            # (single characters are shared by Python already)
+            label = intern_label(label)
+        self.label = label  # transition label (character or CharSet)
+
+    @property
+    def epsilon(self) -> bool:
+        return self.label is EPSILON
 
 
 class TransitionCollection:
     """ Transitions for a given state
+
+    The transitions with one label (a bucket) are a tuple while there is a
+    single one, which is by far the most common case, and a list after
+    that.
     """
 
+    __slots__ = ('tbl', 'ranges', 'modified')
+
+    # bumped on every added transition (see DFA.changed_states)
+    version = 0
+    # version of the last added epsilon transition (only those change
+    # epsilon-closures)
+    epsilon_version = 0
+
     def __init__(self, transitions: List[Transition] = []) -> None:
         self.tbl = {}  # transitions by label
+        self.ranges = ()  # CharSet labels in tbl (a list once there are any)
+        self.modified = 0  # version of the last added transition
         for transition in transitions:
             self.add(transition)
 
     # Methods
     def add(self, transition: Transition):
         """ Add new transition to collection """
-        try:
-            self.tbl[transition.label].add(transition)
-        except KeyError:
-            self.tbl[transition.label] = set([transition])
+        TransitionCollection.version += 1
+        self.modified = TransitionCollection.version
+        label = transition.label
+        if label is EPSILON:
+            TransitionCollection.epsilon_version = self.modified
+        bucket = self.tbl.get(label)
+        if bucket is None:
+            self.tbl[label] = (transition,)
+            if isinstance(label, CharSet):
+                if self.ranges:
+                    self.ranges.append(label)
+                else:
+                    self.ranges = [label]
+        elif isinstance(bucket, tuple):
+            self.tbl[label] = [bucket[0], transition]
+        else:
+            bucket.append(transition)
 
     def get_epsilon_transitions(self) -> List['State']:
         """ Get all epsilon transitions from the state """
-        eps_trans = []
-        for _, transitions in self.tbl.items():
-            for transition in transitions:
-                if transition.epsilon:
-                    eps_trans.append(transition.to_state)
-        return eps_trans
+        return [t.to_state for t in self.tbl.get(EPSILON, ()) if t.epsilon]
 
-    def get_label_transitions(self, label: str) -> Set['State']:
-        try:
-            return self.tbl[label]
-        except KeyError:
-            return set()
+    def get_label_transitions(self, label: str) -> List[Transition]:
+        """ Transitions on label, including CharSet labels containing it """
+        res = self.tbl.get(label, ())
+        for charset in self.ranges:
+            if label in charset:
+                res = list(res) + list(self.tbl[charset])
+        return res
 
     # Conditions not allowed in DFA
     def any_epsilon(self) -> bool:
-        for _, transitions in self.tbl.items():
-            for transition in transitions:
-                if transition.epsilon:
-                    return True
-        return False
+        return any(t.epsilon for t in self.tbl.get(EPSILON, ()))
 
     def any_ambiguous_transitions(self) -> bool:
         for _, transitions in self.tbl.items():
             if len(transitions) > 1:
                 return True
+        if self.ranges:
+            # labels must not overlap
+            intervals = sorted(interval for label in self.tbl
+                               for interval in label_intervals(label))
+            for (_, hi), (lo, _) in zip(intervals, intervals[1:]):
+                if lo <= hi:
+                    return True
         return False